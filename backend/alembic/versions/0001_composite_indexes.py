@@ -0,0 +1,66 @@
+"""composite time indexes on logs / analysis_results
+
+Every hot query filters on tenant (+ project) and a received_at / timestamp
+range and orders by time; the tables only had single-column indexes.
+Indexes are built CONCURRENTLY (no write lock) and IF NOT EXISTS, so this
+also applies cleanly to databases created by `init_db()` (create_all).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    # (name, table, columns, INCLUDE columns)
+    ("ix_logs_tenant_project_timestamp", "logs", ["tenant_id", "project_id", "timestamp"], None),
+    ("ix_logs_tenant_project_received_at", "logs", ["tenant_id", "project_id", "received_at"], None),
+    ("ix_logs_received_at", "logs", ["received_at"], None),
+    ("ix_analysis_results_tenant_project_received_at", "analysis_results",
+     ["tenant_id", "project_id", "received_at"], None),
+    ("ix_analysis_results_tenant_received_at", "analysis_results",
+     ["tenant_id", "received_at"], ["severity", "confidence"]),
+    ("ix_analysis_results_received_at", "analysis_results", ["received_at"], None),
+]
+
+# Single-column tenant indexes are prefixes of the composites above.
+REDUNDANT = [
+    ("ix_logs_tenant_id", "logs", ["tenant_id"]),
+    ("ix_analysis_results_tenant_id", "analysis_results", ["tenant_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns, include in INDEXES:
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                postgresql_include=include or [],
+                if_not_exists=True,
+            )
+        for name, table, _ in REDUNDANT:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in REDUNDANT:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
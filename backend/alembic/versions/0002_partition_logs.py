@@ -0,0 +1,41 @@
+"""optional time-range partitioning of logs / analysis_results
+
+Only acts when DB_PARTITIONING (daily | weekly) is set at upgrade time;
+otherwise a no-op — enable later with `python -m scripts.partitions convert`.
+The conversion copies each table into a partitioned parent under an
+exclusive lock: run it in a maintenance window. See src/db/partitions.py.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    from src.db.partitions import PARTITIONED_TABLES, convert_to_partitioned
+
+    granularity = os.getenv("DB_PARTITIONING")
+    if not granularity:
+        return
+    conn = op.get_bind()
+    for table in PARTITIONED_TABLES:
+        convert_to_partitioned(conn, table, granularity)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Un-partitioning means another full copy; left to a manual procedure.
+    pass
@@ -0,0 +1,51 @@
+"""keyset index for the pattern list
+
+GET /patterns pages on (total_count, last_seen, id) DESC per tenant; with
+only ix_patterns_tenant_id every page sorted all of the tenant's patterns.
+Built CONCURRENTLY and IF NOT EXISTS like 0001.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    # (name, table, columns)
+    ("ix_patterns_tenant_total_count_last_seen_id", "patterns", ["tenant_id", "total_count", "last_seen", "id"]),
+]
+
+# The single-column tenant index is a prefix of the composite above.
+REDUNDANT = [
+    ("ix_patterns_tenant_id", "patterns", ["tenant_id"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in REDUNDANT:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, columns in REDUNDANT:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
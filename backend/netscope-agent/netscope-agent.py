@@ -1,22 +1,65 @@
 #!/usr/bin/env python3
-"""NETSCOPE log agent — tails a log file and POSTs interesting lines to /ingest.
+"""NETSCOPE log agent — tails log files and POSTs interesting lines to /ingest.
 
 Config via env (CLI flags override):
     NETSCOPE_API_URL     default http://127.0.0.1:8000/ingest
     NETSCOPE_API_KEY     sent as X-API-Key (required if backend INGEST_API_KEY set)
     NETSCOPE_OFFSET_DIR  default ~/.netscope-agent
 
-Reliability: the byte offset only advances after a SUCCESSFUL POST, so a backend
-outage no longer loses logs — the same range is retried on the next tick.
+One process tails any number of files / globs (`--path` is repeatable). On
+Linux the reader sleeps on inotify (via ctypes) and wakes when a watched
+directory changes — appends, or a created / renamed file, which also
+re-expands the globs. Elsewhere, or with `--no-inotify`, it polls every
+`--poll` seconds and re-expands the globs every few seconds.
+
+    reader ─▶ Batcher ─▶ Spool (segment files) ─▶ N sender threads ─▶ POST /ingest
+    (chunked reads)  (lines / bytes / linger)   (oldest first, acked)  (gzip, pooled
+                                                                        keep-alive session,
+                                                                        backoff + jitter,
+                                                                        Retry-After)
+
+Reliability: every sealed batch is appended (gzip-encoded, fsync'd) to the
+on-disk spool (`--spool-dir`, default `<offset dir>/spool`) and the file
+offsets advance right after — each log range is read and filtered exactly
+once, whatever the backend does. Senders drain the spool oldest first and
+acknowledge each batch on 2xx; fully acknowledged segments are deleted, and
+the acknowledged prefix of each segment is persisted, so a restart resends
+only unacknowledged batches. During a long outage the spool grows on disk,
+not in memory; past `--spool-max-mb` the oldest segments are dropped and
+counted (`spool.stats`).
+
+With `--aggregate` lines are masked locally (the rules of the backend's
+learning/masking.py) and repeats within a batch's linger window collapse into
+one `{template, sample, count, first_ts, last_ts}` record — an error storm of
+thousands of identical lines per second ships as a handful of records.
+
+Offsets are stored as `<inode> <offset>`: a rename-rotated file is drained to
+its end through the open handle before the agent switches to the new file
+(also across restarts — the old inode is looked up next to the path), and a
+copy-truncated file (same inode, smaller size) restarts at 0.
 """
 import argparse
+import ctypes
+import ctypes.util
+import glob
+import gzip
+import json
 import os
+import random
 import re
+import select
 import socket
+import struct
+import sys
+import threading
 import time
+from collections import OrderedDict
+from functools import lru_cache
+from dataclasses import dataclass, field
 from datetime import datetime, UTC
 
 import requests
+from requests.adapters import HTTPAdapter
 
 # =========================
 # CONFIG (env, CLI overrides)
@@ -31,6 +74,23 @@ DEFAULT_OFFSET_DIR = os.getenv(
 CONTROL_CHARS = re.compile(r"[\x00-\x1F\x7F-\x9F]")
 LEVEL_REGEX = re.compile(r"\b(ERROR|WARN|INFO)\b", re.IGNORECASE)
 
+# One scan for the whole filter (same single-alternation approach as the
+# backend's analysis/keyword_matcher.py; the agent ships as a single file):
+#   level   — first ERROR/WARN/INFO word decides the level (= detect_level)
+#   timeout — TIMEOUT / TIMED OUT
+#   5xx     — bare 5xx status code
+INTERESTING_REGEX = re.compile(
+    r"\b(?:(?P<level>ERROR|WARN|INFO)|(?P<timeout>TIMEOUT|TIMED\s+OUT)|(?P<status>5\d\d))\b",
+    re.IGNORECASE,
+)
+
+RESCAN_SECONDS = 5.0          # polling: glob re-expansion interval
+IDLE_WAKEUP = 60.0            # inotify: glob re-expansion / longest sleep without events
+BACKOFF_BASE = 0.5            # seconds; doubles per failed attempt
+BACKOFF_CAP = 30.0
+# The backend will never accept these payloads — retrying would block the file forever.
+PERMANENT_STATUSES = {400, 413, 415, 422}
+
 
 # =========================
 # UTIL
@@ -61,112 +121,752 @@ def _offset_path(offset_dir: str, log_path: str) -> str:
     return os.path.join(offset_dir, f"{safe_name}.offset")
 
 
-def load_offset(offset_dir: str, log_path: str) -> int:
+def load_offset(offset_dir: str, log_path: str) -> tuple[int | None, int]:
+    """(inode, offset); inode is None for a missing or pre-inode offset file."""
     try:
         with open(_offset_path(offset_dir, log_path), "r") as f:
-            return int(f.read().strip())
-    except (FileNotFoundError, ValueError):
-        return 0
+            parts = f.read().split()
+        if len(parts) == 1:              # legacy "<offset>"
+            return None, int(parts[0])
+        return int(parts[0]), int(parts[1])
+    except (FileNotFoundError, ValueError, IndexError):
+        return None, 0
+
 
+def save_offset(offset_dir: str, log_path: str, inode: int, offset: int) -> None:
+    path = _offset_path(offset_dir, log_path)
+    with open(f"{path}.tmp", "w") as f:
+        f.write(f"{inode} {offset}")
+    os.replace(f"{path}.tmp", path)
 
-def save_offset(offset_dir: str, log_path: str, offset: int) -> None:
-    with open(_offset_path(offset_dir, log_path), "w") as f:
-        f.write(str(offset))
+
+# =========================
+# MASKING (--aggregate)
+# =========================
+# Same masks, same order as backend/src/learning/masking.py — keep in sync.
+# The backend re-masks the sample itself; the agent only needs the masked
+# line as the dedup key.
+_MASKS: list[tuple[re.Pattern, str]] = [
+    (re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"), "<UUID>"),
+    (re.compile(r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?\b"), "<TS>"),
+    (re.compile(r"\b\d{10,13}\b"), "<TS>"),
+    (re.compile(r"\b(?:[0-9a-fA-F]{1,4}:){7}[0-9a-fA-F]{1,4}\b"), "<IP>"),
+    (re.compile(r"\b\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}(?::\d+)?\b"), "<IP>"),
+    (re.compile(r"\b[\w.+-]+@[\w-]+\.[\w.-]+\b"), "<EMAIL>"),
+    (re.compile(r"(?:/[\w._-]+){2,}"), "<PATH>"),
+    (re.compile(r"\b[A-Za-z0-9+/]{16,}={0,2}\b"), "<B64>"),
+    (re.compile(r"\b0x[0-9a-fA-F]{8,}\b"), "<HEX>"),
+    (re.compile(r"\b\d{3,}\b"), "<NUM>"),
+    (re.compile(r'"[^"]{2,}"'), "<STR>"),
+    (re.compile(r"'[^']{2,}'"), "<STR>"),
+]
+ISO_TS_REGEX = _MASKS[1][0]
+
+
+@lru_cache(maxsize=4096)
+def mask_line(line: str) -> str:
+    for pattern, token in _MASKS:
+        line = pattern.sub(token, line)
+    return line
+
+
+def line_time(line: str, default: datetime) -> datetime:
+    """The line's own ISO-8601 timestamp (UTC), else `default` (read time)."""
+    m = ISO_TS_REGEX.search(line)
+    if m:
+        try:
+            ts = datetime.fromisoformat(m.group(0))
+            return ts.replace(tzinfo=UTC) if ts.tzinfo is None else ts.astimezone(UTC)
+        except ValueError:
+            pass
+    return default
 
 
 def is_interesting(line: str) -> bool:
-    """Agent-side Rule Engine v0."""
-    if detect_level(line) in ("ERROR", "WARN"):
-        return True
-    if re.search(r"\bTIMEOUT\b|\bTIMED\s+OUT\b", line, re.IGNORECASE):
-        return True
-    if re.search(r"\b5\d\d\b", line):
-        return True
+    """Agent-side Rule Engine v0 — ERROR/WARN level, timeout or 5xx (one scan)."""
+    level_seen = False
+    for m in INTERESTING_REGEX.finditer(line):
+        kind = m.lastgroup
+        if kind == "level":
+            if not level_seen and m.group("level").upper() in ("ERROR", "WARN"):
+                return True
+            level_seen = True
+        else:
+            return True
     return False
 
 
 # =========================
-# SEND
+# BATCHING
 # =========================
-def send_logs(*, api_url: str, api_key: str | None, lines: list[str],
-              tenant_id: str, project_id: str) -> bool:
-    """POST /ingest — returns True only on a 2xx response."""
-    headers = {
-        "X-Tenant-ID": tenant_id,
-        "X-Project-ID": project_id,
-        "X-Agent-ID": hostname(),
-    }
-    if api_key:
-        headers["X-API-Key"] = api_key
-
-    print(f"\n[AGENT] ▶ POST {api_url}  ({len(lines)} lines)")
-    try:
-        r = requests.post(api_url, json={"logs": lines}, headers=headers, timeout=5)
-        r.raise_for_status()
-        print("[AGENT] status:", r.status_code)
-        for l in lines:
-            print(f"[SENT] {l[:120]}")
-        return True
-    except Exception as e:
-        print("[FAILED]", repr(e), "→ offset 유지, 다음 틱에 재시도")
-        return False
+@dataclass
+class Batch:
+    lines: list[str] = field(default_factory=list)
+    records: dict[str, list] = field(default_factory=dict)   # template -> [sample, count, first, last]
+    count: int = 0                                           # lines in the batch (aggregated or not)
+    nbytes: int = 0
+    marks: dict[str, tuple[int, int]] = field(default_factory=dict)   # path -> (inode, offset) reached
+    started: float = 0.0
+
+    def payload(self) -> dict:
+        if not self.records:
+            return {"logs": self.lines}
+        return {"records": [
+            {"template": template, "sample": sample, "count": n,
+             "first_ts": first.isoformat(), "last_ts": last.isoformat()}
+            for template, (sample, n, first, last) in self.records.items()
+        ]}
+
+
+class Batcher:
+    """
+    Accumulates filtered lines; seals a batch on size, line count or linger
+    into the spool, then commits the offsets the batch reached. With
+    `aggregate`, lines are keyed by their masked form and `max_lines` bounds
+    the distinct records instead.
+    """
+
+    def __init__(self, spool: "Spool", offset_dir: str, *, compress: bool,
+                 max_lines: int, max_bytes: int, linger: float, aggregate: bool = False):
+        self.spool = spool
+        self.offset_dir = offset_dir
+        self.compress = compress
+        self.aggregate = aggregate
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.linger = linger
+        self._batch = Batch()
+
+    def add(self, path: str, inode: int, lines: list[str], start: int, end: int) -> None:
+        """Lines read from `path` (file `inode`) between byte offsets `start` and `end`."""
+        read_at = datetime.now(UTC) if self.aggregate and lines else None
+        for line in lines:
+            b = self._batch
+            if not b.marks:
+                b.started = time.monotonic()
+            # A batch split off mid-chunk commits only `start`; `end` goes
+            # with the part that holds the chunk's last line.
+            b.marks.setdefault(path, (inode, start))
+            b.count += 1
+            if self.aggregate:
+                template = mask_line(line)
+                at = line_time(line, read_at)
+                record = b.records.get(template)
+                if record is None:
+                    b.records[template] = [line, 1, at, at]
+                    b.nbytes += len(line) + len(template) + 100
+                else:
+                    record[1] += 1
+                    record[2] = min(record[2], at)
+                    record[3] = max(record[3], at)
+                size = len(b.records)
+            else:
+                b.lines.append(line)
+                b.nbytes += len(line) + 1
+                size = len(b.lines)
+            if size >= self.max_lines or b.nbytes >= self.max_bytes:
+                self.seal()
+        b = self._batch
+        if not b.marks:
+            b.started = time.monotonic()
+        b.marks[path] = (inode, end)
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._batch.marks)
+
+    def linger_left(self) -> float:
+        return self._batch.started + self.linger - time.monotonic()
+
+    def due(self) -> bool:
+        return self.pending and self.linger_left() <= 0
+
+    def seal(self) -> None:
+        b = self._batch
+        if not b.marks:
+            return
+        self._batch = Batch()
+        if b.count:
+            self.spool.append(encode_batch(b.payload(), self.compress), b.count, self.compress)
+        # Durable in the spool (or nothing to send): the range never has to be read again.
+        for path, (inode, offset) in b.marks.items():
+            save_offset(self.offset_dir, path, inode, offset)
+
+
+def encode_batch(payload: dict, compress: bool) -> bytes:
+    body = json.dumps(payload, ensure_ascii=False).encode()
+    return gzip.compress(body, compresslevel=5) if compress else body
 
 
 # =========================
-# TAIL
+# SPOOL
 # =========================
-def tail_file(*, path: str, source: str, tenant_id: str, project_id: str,
-              api_url: str, api_key: str | None, offset_dir: str):
-    print("[BOOT] NETSCOPE AGENT STARTED")
-    print("[BOOT] watching:", path)
-    print("[BOOT] source:", source, "| tenant:", tenant_id, "| project:", project_id)
-    print("[BOOT] api:", api_url, "| auth:", "on" if api_key else "off")
+# Segment file: records of  >I body length | >I line count | >B gzip flag | body
+_RECORD = struct.Struct(">IIB")
+_SEGMENT_PREFIX = "seg-"
+
+
+@dataclass
+class _Segment:
+    id: int
+    path: str
+    records: int = 0          # complete records written
+    lines: int = 0
+    bytes: int = 0
+    handed: int = 0           # records given to senders (read in order)
+    handed_lines: int = 0
+    read_pos: int = 0         # file offset of record `handed`
+    acked: set = field(default_factory=set)
+    prefix: int = 0           # records 0..prefix-1 acknowledged (persisted in .ack)
+    acked_lines: int = 0
+
+
+class Spool:
+    """
+    Write-ahead spool of encoded batches in append-only segment files.
+
+    `append` is called by the reader, `next` / `ack` by the senders. Records
+    are handed out oldest first; a segment is deleted once it is no longer
+    being written and every record in it was acknowledged. Over `max_bytes`
+    the oldest segments are dropped (even unsent); the never-sent records are
+    counted in `stats`.
+    """
+
+    def __init__(self, directory: str, *, max_bytes: int, segment_bytes: int):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self._cond = threading.Condition()
+        self._segments: OrderedDict[int, _Segment] = OrderedDict()
+        self._fh = None
+        self._next_id = 1
+        self.total_bytes = 0
+        self.stats = self._load_stats()
+        self._recover()
+        self._roll()
+
+    # ---- files
+    def _seg_path(self, seg_id: int) -> str:
+        return os.path.join(self.directory, f"{_SEGMENT_PREFIX}{seg_id:012d}.spool")
+
+    def _load_stats(self) -> dict:
+        try:
+            with open(os.path.join(self.directory, "spool.stats")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"dropped_batches": 0, "dropped_lines": 0}
+
+    def _save_stats(self) -> None:
+        with open(os.path.join(self.directory, "spool.stats"), "w") as f:
+            json.dump(self.stats, f)
+
+    def _recover(self) -> None:
+        names = sorted(n for n in os.listdir(self.directory)
+                       if n.startswith(_SEGMENT_PREFIX) and n.endswith(".spool"))
+        for name in names:
+            seg = _Segment(int(name[len(_SEGMENT_PREFIX):-len(".spool")]), os.path.join(self.directory, name))
+            try:
+                with open(f"{seg.path[:-len('.spool')]}.ack") as f:
+                    seg.prefix = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                seg.prefix = 0
+            with open(seg.path, "r+b") as f:
+                pos = 0
+                while True:
+                    header = f.read(_RECORD.size)
+                    if len(header) < _RECORD.size:
+                        break
+                    length, nlines, _ = _RECORD.unpack(header)
+                    f.seek(length, os.SEEK_CUR)
+                    if f.tell() > os.fstat(f.fileno()).st_size:
+                        break                          # torn write at crash time
+                    if seg.records < seg.prefix:
+                        seg.acked_lines += nlines
+                        seg.read_pos = f.tell()
+                    seg.records += 1
+                    seg.lines += nlines
+                    pos = f.tell()
+                f.truncate(pos)
+            seg.bytes = pos
+            seg.prefix = seg.handed = min(seg.prefix, seg.records)
+            seg.handed_lines = seg.acked_lines
+            self._segments[seg.id] = seg
+            self._next_id = seg.id + 1
+            self.total_bytes += seg.bytes
+            self._maybe_delete(seg, active=False)
+        pending = list(self._segments.values())
+        if pending:
+            print(f"[SPOOL] {sum(s.records - s.prefix for s in pending)} batches "
+                  f"({sum(s.lines - s.acked_lines for s in pending)} lines) pending from the previous run")
+
+    def _roll(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            active = next(reversed(self._segments.values()))
+            self._fh = None
+            self._maybe_delete(active, active=False)
+        # Ids never repeat: a sender may still hold a record of a deleted segment.
+        seg = _Segment(self._next_id, self._seg_path(self._next_id))
+        self._next_id += 1
+        self._fh = open(seg.path, "ab")
+        self._segments[seg.id] = seg
+
+    def _maybe_delete(self, seg: _Segment, *, active: bool) -> None:
+        if active or seg.prefix < seg.records:
+            return
+        for path in (seg.path, f"{seg.path[:-len('.spool')]}.ack"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._segments.pop(seg.id, None)
+        self.total_bytes -= seg.bytes
+
+    def _is_active(self, seg: _Segment) -> bool:
+        return self._fh is not None and seg.id == next(reversed(self._segments))
+
+    # ---- reader side
+    def append(self, body: bytes, nlines: int, gz: bool) -> None:
+        with self._cond:
+            seg = next(reversed(self._segments.values()))
+            record = _RECORD.pack(len(body), nlines, int(gz)) + body
+            self._fh.write(record)
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            seg.records += 1
+            seg.lines += nlines
+            seg.bytes += len(record)
+            self.total_bytes += len(record)
+            if seg.bytes >= self.segment_bytes:
+                self._roll()
+            self._enforce_cap()
+            self._cond.notify()
+
+    def _enforce_cap(self) -> None:
+        while self.total_bytes > self.max_bytes and len(self._segments) > 1:
+            seg = next(iter(self._segments.values()))
+            # Only never-sent records are lost; ones already handed out are
+            # still delivered by their sender (the late ack is ignored).
+            batches = seg.records - seg.handed
+            lines = seg.lines - seg.handed_lines
+            seg.prefix = seg.records
+            self._maybe_delete(seg, active=False)
+            self.stats["dropped_batches"] += batches
+            self.stats["dropped_lines"] += lines
+            self._save_stats()
+            print(f"[SPOOL] over {self.max_bytes // (1 << 20)} MiB: dropped oldest segment "
+                  f"({batches} batches, {lines} lines; total dropped {self.stats['dropped_lines']} lines)")
+
+    # ---- sender side
+    def next(self, stop: threading.Event) -> tuple | None:
+        """Oldest record not yet handed out: (segment id, index, body, lines, gzip). Blocks."""
+        with self._cond:
+            while not stop.is_set():
+                for seg in self._segments.values():
+                    if seg.handed < seg.records:
+                        with open(seg.path, "rb") as f:
+                            f.seek(seg.read_pos)
+                            length, nlines, gz = _RECORD.unpack(f.read(_RECORD.size))
+                            body = f.read(length)
+                        index = seg.handed
+                        seg.handed += 1
+                        seg.handed_lines += nlines
+                        seg.read_pos += _RECORD.size + length
+                        return seg.id, index, body, nlines, bool(gz)
+                self._cond.wait(1.0)
+            return None
+
+    def ack(self, record: tuple) -> None:
+        seg_id, index, _, nlines, _ = record
+        with self._cond:
+            seg = self._segments.get(seg_id)
+            if seg is None or index < seg.prefix:
+                return                      # dropped by the disk cap meanwhile
+            seg.acked.add(index)
+            seg.acked_lines += nlines
+            advanced = False
+            while seg.prefix in seg.acked:
+                seg.acked.discard(seg.prefix)
+                seg.prefix += 1
+                advanced = True
+            if advanced:
+                # tmp + rename: a crash mid-write must not leave an empty / torn prefix
+                ack_path = f"{seg.path[:-len('.spool')]}.ack"
+                with open(f"{ack_path}.tmp", "w") as f:
+                    f.write(str(seg.prefix))
+                os.replace(f"{ack_path}.tmp", ack_path)
+                self._maybe_delete(seg, active=self._is_active(seg))
+
+    def wake(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        with self._cond:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    @property
+    def pending_batches(self) -> int:
+        with self._cond:
+            return sum(s.records - s.prefix - len(s.acked) for s in self._segments.values())
 
-    last_size = load_offset(offset_dir, path)
-    print(f"[BOOT] resume offset: {last_size} bytes\n")
 
+# =========================
+# SEND
+# =========================
+class Sender:
+    """POST /ingest with a shared keep-alive session, gzip, backoff + jitter."""
+
+    def __init__(self, *, api_url: str, api_key: str | None, tenant_id: str,
+                 project_id: str, pool_size: int, timeout: float):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers.update({
+            "X-Tenant-ID": tenant_id,
+            "X-Project-ID": project_id,
+            "X-Agent-ID": hostname(),
+            "Content-Type": "application/json",
+        })
+        if api_key:
+            self.session.headers["X-API-Key"] = api_key
+
+    def send(self, label: str, body: bytes, nlines: int, gz: bool, stop: threading.Event) -> bool | None:
+        """Retry until a 2xx (True) or a permanent rejection (False) — or shutdown (None)."""
+        headers = {"Content-Encoding": "gzip"} if gz else None
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            retry_after = 0.0
+            try:
+                r = self.session.post(self.api_url, data=body, headers=headers, timeout=self.timeout)
+                if r.status_code < 300:
+                    ms = (time.monotonic() - started) * 1000
+                    print(f"[SENT] batch {label}: {nlines} lines, "
+                          f"{len(body) // 1024} KiB, {r.status_code} in {ms:.0f}ms")
+                    return True
+                if r.status_code in PERMANENT_STATUSES:
+                    print(f"[DROPPED] batch {label}: {r.status_code} {r.text[:200]}")
+                    return False
+                retry_after = _retry_after(r.headers.get("Retry-After"))
+                reason = f"HTTP {r.status_code}"
+            except requests.RequestException as e:
+                reason = repr(e)
+
+            delay = max(retry_after, random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)))
+            attempt += 1
+            print(f"[FAILED] batch {label}: {reason} → 스풀에 보관, {delay:.1f}s 후 재시도 (#{attempt})")
+            if stop.wait(delay):
+                return None
+
+
+def _retry_after(value: str | None) -> float:
+    try:
+        return min(float(value), BACKOFF_CAP) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+def sender_loop(sender: Sender, spool: Spool, stop: threading.Event) -> None:
     while True:
+        record = spool.next(stop)
+        if record is None:
+            return
+        seg_id, index, body, nlines, gz = record
+        if sender.send(f"{seg_id}.{index}", body, nlines, gz, stop) is not None:
+            spool.ack(record)          # sent, or permanently rejected: move on
+
+
+# =========================
+# TAIL
+# =========================
+class FileTailer:
+    """
+    Incremental reader for one path: bounded chunks, whole lines only.
+
+    Reads through an open handle, so after a rename rotation the old file is
+    still reachable: it is read to its end, then the tailer reopens the path
+    (new inode) at offset 0.
+    """
+
+    def __init__(self, path: str, offset_dir: str):
+        self.path = path
+        self.f = None
+        self.inode = 0
+        self.offset = 0
+        inode, offset = load_offset(offset_dir, path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        if inode is None or inode == st.st_ino:
+            self._open(path, offset if offset <= st.st_size else 0)
+            return
+        # Rotated while the agent was down: finish the old file first if it is still around.
+        rotated = _find_inode(path, inode)
+        if rotated is not None:
+            print(f"[ROTATE] {path}: draining {rotated} (rotated while stopped) from {offset}")
+            self._open(rotated, offset)
+        else:
+            self._open(path, 0)
+
+    def _open(self, path: str, offset: int) -> None:
+        if self.f is not None:
+            self.f.close()
+        self.f = open(path, "rb")
+        self.inode = os.fstat(self.f.fileno()).st_ino
+        self.offset = offset
+
+    def close(self) -> None:
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+
+    def read(self, max_bytes: int) -> tuple[int, list[str], int, int] | None:
+        """Next complete lines (raw) as (inode, lines, start, end); None if nothing new."""
+        if self.f is None:
+            try:
+                self._open(self.path, 0)   # (re)appeared
+            except OSError:
+                return None
+
+        size = os.fstat(self.f.fileno()).st_size
+        if size < self.offset:
+            # copytruncate: same inode, shorter file — the rest was rewritten from 0
+            print(f"[ROTATE] {self.path} truncated, resetting offset")
+            self.offset = 0
+        if size > self.offset:
+            chunk = self._read_lines(max_bytes, final=False)
+            if chunk is not None:
+                return chunk
+
+        # At the end of our handle — has the path moved on to a new file?
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None                       # renamed away, new file not created yet
+        if st.st_ino == self.inode:
+            return None
+        tail = self._read_lines(max_bytes, final=True)   # unterminated last line of the old file
+        if tail is not None:
+            return tail
+        print(f"[ROTATE] {self.path}: new file (inode {st.st_ino}), old one fully read")
+        self._open(self.path, 0)
+        return self._read_lines(max_bytes, final=False)
+
+    def _read_lines(self, max_bytes: int, *, final: bool):
+        self.f.seek(self.offset)
+        data = self.f.read(max_bytes)
+        if not data:
+            return None
+        end = data.rfind(b"\n")
+        if end < 0:
+            if len(data) < max_bytes and not final:
+                return None            # partial last line — wait for its newline
+            end = len(data) - 1        # a single line longer than a chunk: cut it
+        data = data[:end + 1]
+        start = self.offset
+        self.offset += len(data)
+        return self.inode, data.decode("utf-8", errors="ignore").splitlines(), start, self.offset
+
+
+def _find_inode(path: str, inode: int) -> str | None:
+    """A file next to `path` with the given inode (e.g. app.log.1 after logrotate)."""
+    directory, base = os.path.split(os.path.abspath(path))
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return None
+    for name in sorted(names):
+        if not name.startswith(base) or name.endswith(".gz"):
+            continue
+        candidate = os.path.join(directory, name)
         try:
-            if not os.path.exists(path):
-                print("[WAIT] log file not found")
-                time.sleep(1)
-                continue
+            if os.stat(candidate).st_ino == inode:
+                return candidate
+        except OSError:
+            continue
+    return None
 
-            current_size = os.path.getsize(path)
 
-            # Log rotation: file truncated
-            if current_size < last_size:
-                print("[ROTATE] file truncated, resetting offset")
-                last_size = 0
-                save_offset(offset_dir, path, 0)
+# =========================
+# WAKEUPS
+# =========================
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+_IN_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
 
-            if current_size > last_size:
-                with open(path, "r", errors="ignore") as f:
-                    f.seek(last_size)
-                    new_data = f.read()
 
-                batch = []
-                for raw_line in new_data.splitlines():
-                    line = normalize(raw_line)
-                    if line and is_interesting(line):
-                        batch.append(line)
+class PollWatcher:
+    """Fallback: wake up every `interval` seconds."""
 
-                # 전송 성공 시에만 offset 전진 (실패하면 다음 틱에 같은 범위 재시도)
-                sent_ok = True
-                if batch:
-                    sent_ok = send_logs(
-                        api_url=api_url, api_key=api_key, lines=batch,
-                        tenant_id=tenant_id, project_id=project_id,
-                    )
+    def __init__(self, interval: float):
+        self.interval = interval
 
-                if sent_ok:
-                    last_size = current_size
-                    save_offset(offset_dir, path, last_size)
+    def watch(self, directory: str) -> None:
+        pass
+
+    def wait(self, timeout: float) -> int:
+        time.sleep(min(self.interval, timeout))
+        return 0
 
-        except Exception as e:
-            print("[AGENT ERROR]", repr(e))
 
-        time.sleep(1)
+class InotifyWatcher:
+    """
+    Linux inotify through libc (ctypes). Watches directories — that covers
+    appends to the files in them as well as create / rename / delete from
+    rotation. Events only wake the reader; it then reads every tailer.
+    """
+
+    _EVENT = struct.Struct("iIII")   # wd, mask, cookie, len (+ name[len])
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._dirs: set[str] = set()
+
+    def watch(self, directory: str) -> None:
+        directory = os.path.abspath(directory)
+        if directory in self._dirs:
+            return
+        if self._libc.inotify_add_watch(self.fd, os.fsencode(directory), _IN_MASK) < 0:
+            err = ctypes.get_errno()
+            print(f"[WATCH] {directory}: {os.strerror(err)}")
+            return
+        self._dirs.add(directory)
+
+    def wait(self, timeout: float) -> int:
+        """OR of the masks of the events that arrived within `timeout` (0 = none)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return 0
+        mask = 0
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return mask
+            pos = 0
+            while pos + self._EVENT.size <= len(buf):
+                _, event_mask, _, name_len = self._EVENT.unpack_from(buf, pos)
+                mask |= event_mask
+                pos += self._EVENT.size + name_len
+
+
+def make_watcher(poll: float, use_inotify: bool = True):
+    if use_inotify and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError) as e:
+            print(f"[BOOT] inotify unavailable ({e!r}), polling every {poll}s")
+    return PollWatcher(poll)
+
+
+def expand_paths(patterns: list[str]) -> list[str]:
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths += [p for p in matches if p not in paths]
+    return paths
+
+
+def run_agent(*, patterns: list[str], source: str, tenant_id: str, project_id: str,
+              api_url: str, api_key: str | None, offset_dir: str, senders: int = 2,
+              batch_lines: int = 1000, batch_bytes: int = 1 << 20, linger: float = 1.0,
+              read_chunk: int = 256 << 10, poll: float = 0.5, compress: bool = True,
+              timeout: float = 10.0, use_inotify: bool = True, spool_dir: str | None = None,
+              spool_max_bytes: int = 512 << 20, spool_segment_bytes: int = 4 << 20,
+              aggregate: bool = False):
+    print("[BOOT] NETSCOPE AGENT STARTED")
+    print("[BOOT] watching:", ", ".join(patterns))
+    print("[BOOT] source:", source, "| tenant:", tenant_id, "| project:", project_id)
+    print("[BOOT] api:", api_url, "| auth:", "on" if api_key else "off",
+          "| gzip:", "on" if compress else "off", "| senders:", senders,
+          "| aggregate:", "on" if aggregate else "off")
+
+    watcher = make_watcher(poll, use_inotify)
+    print("[BOOT] wakeups:", "inotify" if isinstance(watcher, InotifyWatcher) else f"poll {poll}s")
+    spool_dir = spool_dir or os.path.join(offset_dir, "spool")
+    spool = Spool(spool_dir, max_bytes=spool_max_bytes, segment_bytes=spool_segment_bytes)
+    print(f"[BOOT] spool: {spool_dir} (cap {spool_max_bytes >> 20} MiB, "
+          f"dropped so far {spool.stats['dropped_lines']} lines)")
+    batcher = Batcher(spool, offset_dir, compress=compress,
+                      max_lines=batch_lines, max_bytes=batch_bytes, linger=linger, aggregate=aggregate)
+    sender = Sender(api_url=api_url, api_key=api_key, tenant_id=tenant_id, project_id=project_id,
+                    pool_size=senders, timeout=timeout)
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=sender_loop, args=(sender, spool, stop),
+                         name=f"sender-{i}", daemon=True)
+        for i in range(senders)
+    ]
+    for t in threads:
+        t.start()
+
+    tailers: dict[str, FileTailer] = {}
+    rescan = IDLE_WAKEUP if isinstance(watcher, InotifyWatcher) else RESCAN_SECONDS
+    next_scan = 0.0
+    try:
+        while True:
+            try:
+                if time.monotonic() >= next_scan:
+                    next_scan = time.monotonic() + rescan
+                    for pattern in patterns:
+                        directory = os.path.dirname(os.path.abspath(pattern))
+                        if not glob.has_magic(directory) and os.path.isdir(directory):
+                            watcher.watch(directory)
+                    for path in expand_paths(patterns):
+                        if path not in tailers and os.path.exists(path):
+                            tailers[path] = FileTailer(path, offset_dir)
+                            watcher.watch(os.path.dirname(os.path.abspath(path)))
+                            print(f"[BOOT] tailing {path} from offset {tailers[path].offset}")
+                    if not tailers:
+                        print("[WAIT] log file not found")
+
+                busy = False
+                for tailer in list(tailers.values()):
+                    chunk = tailer.read(read_chunk)
+                    if chunk is None:
+                        continue
+                    busy = True
+                    inode, raw_lines, start, end = chunk
+                    lines = [line for line in map(normalize, raw_lines) if line and is_interesting(line)]
+                    batcher.add(tailer.path, inode, lines, start, end)
+
+                if batcher.due():
+                    batcher.seal()
+            except Exception as e:
+                print("[AGENT ERROR]", repr(e))
+                busy = False
+
+            if not busy:
+                # Sleep until a file event, the pending batch's linger, or the next glob rescan.
+                wait = next_scan - time.monotonic()
+                if batcher.pending:
+                    wait = min(wait, batcher.linger_left())
+                if watcher.wait(max(0.0, wait)) & (IN_CREATE | IN_MOVED_TO):
+                    next_scan = 0.0       # a file appeared: re-expand the globs now
+    except KeyboardInterrupt:
+        print("[AGENT] shutting down")
+        batcher.seal()
+        stop.set()
+        spool.wake()
+        for t in threads:
+            t.join(timeout=timeout)
+        spool.close()
+        print(f"[AGENT] {spool.pending_batches} batches left in the spool for the next start")
 
 
 # =========================
@@ -174,23 +874,51 @@ def tail_file(*, path: str, source: str, tenant_id: str, project_id: str,
 # =========================
 def main():
     parser = argparse.ArgumentParser("NETSCOPE Agent (tail mode)")
-    parser.add_argument("--path", required=True, help="log file path")
+    parser.add_argument("--path", required=True, action="append",
+                        help="log file path or glob (repeatable, e.g. '/var/log/nginx/*.log')")
     parser.add_argument("--source", default="unknown-service", help="service name")
     parser.add_argument("--tenant", required=True, help="tenant id")
     parser.add_argument("--project", required=True, help="project id")
     parser.add_argument("--api-url", default=DEFAULT_API_URL, help="ingest URL (env NETSCOPE_API_URL)")
     parser.add_argument("--api-key", default=DEFAULT_API_KEY, help="X-API-Key (env NETSCOPE_API_KEY)")
     parser.add_argument("--offset-dir", default=DEFAULT_OFFSET_DIR, help="offset dir (env NETSCOPE_OFFSET_DIR)")
+    parser.add_argument("--senders", type=int, default=2, help="concurrent sender threads")
+    parser.add_argument("--batch-lines", type=int, default=1000, help="max lines per POST")
+    parser.add_argument("--batch-bytes", type=int, default=1 << 20, help="max raw bytes per POST")
+    parser.add_argument("--linger", type=float, default=1.0, help="seconds a partial batch may wait")
+    parser.add_argument("--read-chunk", type=int, default=256 << 10, help="max bytes read per file per pass")
+    parser.add_argument("--poll", type=float, default=0.5, help="idle poll interval without inotify (seconds)")
+    parser.add_argument("--no-inotify", action="store_true", help="poll instead of waiting on inotify")
+    parser.add_argument("--timeout", type=float, default=10.0, help="HTTP timeout (seconds)")
+    parser.add_argument("--no-gzip", action="store_true", help="send uncompressed JSON (backends without gzip /ingest)")
+    parser.add_argument("--aggregate", action="store_true",
+                        help="mask lines and send repeats as counted records (backend must accept `records`)")
+    parser.add_argument("--spool-dir", default=None, help="batch spool dir (default <offset dir>/spool)")
+    parser.add_argument("--spool-max-mb", type=int, default=512, help="spool disk cap; oldest batches dropped beyond it")
+    parser.add_argument("--spool-segment-kb", type=int, default=4096, help="spool segment file size")
     args = parser.parse_args()
 
-    tail_file(
-        path=args.path,
+    run_agent(
+        patterns=args.path,
         source=args.source,
         tenant_id=args.tenant,
         project_id=args.project,
         api_url=args.api_url,
         api_key=args.api_key,
         offset_dir=args.offset_dir,
+        senders=max(1, args.senders),
+        batch_lines=args.batch_lines,
+        batch_bytes=args.batch_bytes,
+        linger=args.linger,
+        read_chunk=args.read_chunk,
+        poll=args.poll,
+        compress=not args.no_gzip,
+        timeout=args.timeout,
+        use_inotify=not args.no_inotify,
+        spool_dir=args.spool_dir,
+        spool_max_bytes=args.spool_max_mb << 20,
+        spool_segment_bytes=args.spool_segment_kb << 10,
+        aggregate=args.aggregate,
     )
 
 
@@ -0,0 +1,134 @@
+"""
+SSE broker fan-out benchmark.
+
+Starts N subscriber coroutines spread over T tenants, publishes E events from
+a worker thread (like the ingest path does) and reports delivery latency and
+CPU time. `--legacy` runs the same load against the old model — every
+subscriber wakes on a fixed interval and scans the whole shared buffer — for
+comparison.
+
+Usage:
+    python -m scripts.bench_broker --subscribers 500 --tenants 50 --events 2000
+    python -m scripts.bench_broker --backend redis --redis-url redis://localhost:6379/0
+    python -m scripts.bench_broker --legacy
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from collections import deque
+
+from src.realtime.broker import create_broker
+
+
+class _LegacyPollingBroker:
+    """Old behaviour: one shared deque, subscribers poll + scan it."""
+
+    def __init__(self, maxlen: int = 1000, interval: float = 1.5):
+        self._events: deque = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self._n = 0
+        self.interval = interval
+
+    def publish(self, event: dict) -> str:
+        with self._lock:
+            self._n += 1
+            self._events.append((self._n, event))
+            return str(self._n)
+
+    async def resume_cursor(self, tenant_id, last_event_id):
+        with self._lock:
+            return str(self._n)
+
+    async def wait(self, tenant_id, cursor, timeout):
+        await asyncio.sleep(self.interval)
+        last = int(cursor)
+        with self._lock:
+            return [(str(i), e) for i, e in self._events
+                    if i > last and e.get("tenant_id") == tenant_id]
+
+    def close(self):
+        pass
+
+
+async def _run(args) -> None:
+    if args.legacy:
+        broker = _LegacyPollingBroker(maxlen=args.buffer)
+    else:
+        broker = create_broker(args.backend, redis_url=args.redis_url, maxlen=args.buffer)
+
+    tenants = [f"bench-{i}" for i in range(args.tenants)]
+    per_tenant = args.events // args.tenants
+    expected = per_tenant * args.tenants
+    latencies: list[float] = []
+    done = asyncio.Event()
+    received = 0
+
+    async def subscriber(tenant_id: str):
+        nonlocal received
+        cursor = await broker.resume_cursor(tenant_id, None)
+        got = 0
+        while got < per_tenant:
+            for eid, evt in await broker.wait(tenant_id, cursor, 1.0):
+                cursor = eid
+                got += 1
+                latencies.append(time.perf_counter() - evt["sent"])
+        received += got
+        if received >= expected * subs_per_tenant:
+            done.set()
+
+    subs_per_tenant = max(1, args.subscribers // args.tenants)
+    tasks = [
+        asyncio.create_task(subscriber(t))
+        for t in tenants
+        for _ in range(subs_per_tenant)
+    ]
+    await asyncio.sleep(0.2)  # let every subscriber register
+
+    def producer():
+        for i in range(per_tenant):
+            for t in tenants:
+                broker.publish({"tenant_id": t, "n": i, "sent": time.perf_counter()})
+            if args.rate:
+                time.sleep(1.0 / args.rate)
+
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    threading.Thread(target=producer, daemon=True).start()
+    try:
+        await asyncio.wait_for(done.wait(), args.timeout)
+    except asyncio.TimeoutError:
+        print(f"[bench] timed out — {received} deliveries so far")
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    for t in tasks:
+        t.cancel()
+    broker.close()
+
+    label = "legacy-poll" if args.legacy else args.backend
+    print(f"[bench] backend={label} subscribers={len(tasks)} tenants={args.tenants} "
+          f"events={expected}")
+    print(f"[bench] deliveries={len(latencies)} wall={wall:.2f}s cpu={cpu:.2f}s")
+    if latencies:
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if len(latencies) >= 100 else latencies[-1]
+        print(f"[bench] latency p50={statistics.median(latencies) * 1000:.1f}ms "
+              f"p99={p99 * 1000:.1f}ms max={latencies[-1] * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE broker fan-out benchmark")
+    parser.add_argument("--backend", default="memory", choices=["memory", "redis"])
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--legacy", action="store_true", help="old poll-and-scan model")
+    parser.add_argument("--subscribers", type=int, default=200)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--buffer", type=int, default=1000)
+    parser.add_argument("--rate", type=float, default=0, help="publish rounds/sec (0 = unthrottled)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
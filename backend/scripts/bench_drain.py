@@ -0,0 +1,157 @@
+"""
+Drain throughput benchmark — lines/sec before vs. after the indexed leaf.
+
+Generates a `test-log/shell.log`-style corpus (ISO timestamp, level, service,
+message with variable parts) — or reads a real file — masks every line once,
+then times `DrainTree.add` against `LegacyDrainTree` (the previous
+scan-every-cluster implementation, kept here as the baseline) and checks both
+assign every line to the same template.
+
+Usage:
+    python -m scripts.bench_drain --lines 200000
+    python -m scripts.bench_drain --file ../test-log/shell.log
+    python -m scripts.bench_drain --lines 30000 --templates 3000 --sim 0.9   # crowded leaves
+"""
+import argparse
+import hashlib
+import random
+import time
+
+from src.learning.drain import DrainTree
+from src.learning.masking import mask_variables
+
+
+class LegacyDrainTree:
+    """The pre-index DrainTree.add (linear leaf scan, sort-on-evict, no id cache)."""
+
+    def __init__(self, depth: int = 4, sim_threshold: float = 0.4, max_clusters: int = 10_000):
+        self.depth = depth
+        self.sim_threshold = sim_threshold
+        self.max_clusters = max_clusters
+        self._root: dict = {}
+        self._cluster_count = 0
+
+    def add(self, masked_message: str) -> str:
+        """Returns the assigned cluster id (re-hashed every call, as before)."""
+        tokens = masked_message.split() or ["<EMPTY>"]
+        length = len(tokens)
+        node = self._root.setdefault(length, ({}, []))
+        for i in range(min(self.depth, length)):
+            token = tokens[i]
+            if token.startswith("<") and token.endswith(">"):
+                token = "<*>"
+            node = node[0].setdefault(token, ({}, []))
+        clusters = node[1]
+
+        best, best_sim = None, 0.0
+        for cluster in clusters:
+            sim = sum(1 for a, b in zip(tokens, cluster[0]) if a == b) / length
+            if sim > best_sim:
+                best_sim, best = sim, cluster
+        if best is not None and best_sim >= self.sim_threshold:
+            best[0] = [t if t == n else "<*>" for t, n in zip(best[0], tokens)]
+            best[1] += 1
+            return _cluster_id(best[0])
+
+        if self._cluster_count >= self.max_clusters and clusters:
+            clusters.sort(key=lambda c: c[1])
+            clusters.pop(0)
+            self._cluster_count -= 1
+        new = [list(tokens), 1]
+        clusters.append(new)
+        self._cluster_count += 1
+        return _cluster_id(new[0])
+
+
+def _cluster_id(tokens: list[str]) -> str:
+    return hashlib.sha1(" ".join(tokens).encode()).hexdigest()[:12]
+
+
+_SERVICES = ["gateway", "payment-gw", "auth", "orders", "worker", "db-proxy", "cache"]
+_LEVELS = ["INFO"] * 6 + ["WARN"] * 2 + ["ERROR"] * 2
+_WORDS = (
+    "request user session order payment token cache query upstream retry "
+    "connection handshake worker job queue shard replica timeout refused "
+    "completed started failed expired accepted rejected slow"
+).split()
+
+
+def synth_corpus(lines: int, templates: int, seed: int = 7) -> list[str]:
+    """shell.log-style lines: `<ISO ts> <LEVEL> <service> <message>`."""
+    rng = random.Random(seed)
+    shapes = []
+    for _ in range(templates):
+        words = rng.sample(_WORDS, rng.randint(3, 8))
+        # Variable slots: ids, durations, IPs, counters.
+        for _ in range(rng.randint(1, 3)):
+            words.insert(rng.randint(1, len(words)), rng.choice(["{n}", "{ms}ms", "{ip}", "id={hex}"]))
+        shapes.append((rng.choice(_SERVICES), " ".join(words)))
+
+    out = []
+    for i in range(lines):
+        service, shape = shapes[min(int(rng.paretovariate(1.2)) - 1, templates - 1)]
+        msg = shape.format(
+            n=rng.randint(0, 99999),
+            ms=rng.randint(1, 30000),
+            ip=f"10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)}",
+            hex=f"{rng.getrandbits(40):010x}",
+        )
+        ts = f"2026-01-02T{(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d}Z"
+        out.append(f"{ts} {rng.choice(_LEVELS)} {service} {msg}")
+    return out
+
+
+def _read(path: str) -> list[str]:
+    raw = open(path, "rb").read()
+    for enc in ("utf-8", "utf-16"):
+        try:
+            return raw.decode(enc).splitlines()
+        except UnicodeDecodeError:
+            continue
+    return raw.decode("utf-8", errors="replace").splitlines()
+
+
+def _time(tree, masked: list[str], new_api: bool) -> tuple[float, list[str]]:
+    ids = []
+    start = time.perf_counter()
+    if new_api:
+        for m in masked:
+            ids.append(tree.add(m).cluster_id)
+    else:
+        for m in masked:
+            ids.append(tree.add(m))
+    return time.perf_counter() - start, ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain lines/sec benchmark")
+    parser.add_argument("--file", help="log file to replay (utf-8 or utf-16)")
+    parser.add_argument("--lines", type=int, default=100_000)
+    parser.add_argument("--templates", type=int, default=500)
+    parser.add_argument("--sim", type=float, default=0.4)
+    parser.add_argument("--max-clusters", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=1, help="replay the corpus N times")
+    args = parser.parse_args()
+
+    corpus = _read(args.file) if args.file else synth_corpus(args.lines, args.templates)
+    corpus = corpus * args.repeat
+    masked = [mask_variables(line) for line in corpus]
+
+    legacy = LegacyDrainTree(sim_threshold=args.sim, max_clusters=args.max_clusters)
+    indexed = DrainTree(sim_threshold=args.sim, max_clusters=args.max_clusters)
+    legacy_s, legacy_ids = _time(legacy, masked, new_api=False)
+    new_s, new_ids = _time(indexed, masked, new_api=True)
+
+    n = len(masked)
+    print(f"[bench] lines={n} templates_seen={len(set(new_ids))}")
+    print(f"[bench] legacy  {n / legacy_s:>12,.0f} lines/sec  ({legacy_s:.2f}s)")
+    print(f"[bench] indexed {n / new_s:>12,.0f} lines/sec  ({new_s:.2f}s)  x{legacy_s / new_s:.2f}")
+    # Eviction now keeps leaf order instead of re-sorting it, so once
+    # max_clusters is hit, tie-breaks (and thus assignments) may differ.
+    evicting = indexed._cluster_count >= args.max_clusters
+    print(f"[bench] identical assignments: {legacy_ids == new_ids}"
+          + (" (max_clusters reached — tie order may differ)" if evicting else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Drain cold-start benchmark — snapshot restore vs. re-mining vs. pickle.
+
+Builds a tree with ~`--clusters` clusters from the synthetic `bench_drain`
+corpus, then reports snapshot size and `to_bytes` / `from_bytes` time next
+to re-mining the same corpus (what a restart used to cost, assuming the raw
+lines were even still available) and pickle as a reference.
+
+Usage:
+    python -m scripts.bench_drain_snapshot --clusters 10000
+"""
+import argparse
+import pickle
+import time
+
+from scripts.bench_drain import synth_corpus
+from src.learning.drain import DrainTree
+from src.learning.masking import mask_variables
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain snapshot cold-start benchmark")
+    parser.add_argument("--clusters", type=int, default=10_000)
+    args = parser.parse_args()
+
+    masked = [mask_variables(line) for line in synth_corpus(args.clusters * 6, args.clusters + args.clusters // 5)]
+    start = time.perf_counter()
+    tree = DrainTree(sim_threshold=0.9, max_clusters=args.clusters)
+    for m in masked:
+        tree.add(m)
+    mine_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    data = tree.to_bytes()
+    dump_s = time.perf_counter() - start
+    start = time.perf_counter()
+    restored = DrainTree.from_bytes(data)
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pickled = pickle.dumps(tree)
+    pickle.loads(pickled)
+    pickle_s = time.perf_counter() - start
+
+    same = [c.cluster_id for c in restored.all_clusters()] == [c.cluster_id for c in tree.all_clusters()]
+    print(f"[bench] clusters={tree._cluster_count} lines_mined={len(masked)}")
+    print(f"[bench] re-mine        {mine_s * 1000:>8.0f} ms")
+    print(f"[bench] snapshot dump  {dump_s * 1000:>8.0f} ms  size={len(data) / 1024:,.0f} KiB")
+    print(f"[bench] snapshot load  {load_s * 1000:>8.0f} ms  identical={same}")
+    print(f"[bench] pickle rt      {pickle_s * 1000:>8.0f} ms  size={len(pickled) / 1024:,.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
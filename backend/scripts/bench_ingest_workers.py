@@ -0,0 +1,59 @@
+"""
+Ingest CPU-stage benchmark — inline (threads, one GIL) vs. sharded processes.
+
+Runs `compute_batch` (parse + mask + Drain + rules, no DB) for B batches spread
+over T tenants from a thread pool, the way the API threadpool / ingest queue
+would, first inline and then through `ShardedWorkerPool(P)`.
+
+Usage:
+    python -m scripts.bench_ingest_workers --processes 4 --tenants 32 --batches 400
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts.bench_drain import synth_corpus
+from src.ingest.workers import ShardedWorkerPool, compute_batch
+
+
+def _run(fn, jobs, threads) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as ex:
+        list(ex.map(lambda job: fn(*job), jobs))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ingest CPU stage: inline vs processes")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--tenants", type=int, default=32)
+    parser.add_argument("--batches", type=int, default=400)
+    parser.add_argument("--batch-lines", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    corpus = synth_corpus(args.batch_lines * 20, 300)
+    jobs = []
+    for i in range(args.batches):
+        start = (i * args.batch_lines) % (len(corpus) - args.batch_lines)
+        jobs.append((f"bench-{i % args.tenants}", corpus[start:start + args.batch_lines]))
+    lines = args.batches * args.batch_lines
+
+    inline_s = _run(compute_batch, jobs, args.threads)
+    pool = ShardedWorkerPool(args.processes)
+    pool.start()
+    _run(pool.run, jobs[: args.processes * 2], args.threads)  # warm up the workers
+    try:
+        pool_s = _run(pool.run, jobs, args.threads)
+    finally:
+        pool.stop()
+
+    print(f"[bench] lines={lines} tenants={args.tenants} threads={args.threads}")
+    print(f"[bench] inline          {lines / inline_s:>10,.0f} lines/sec  ({inline_s:.2f}s)")
+    print(f"[bench] processes={args.processes:<4} {lines / pool_s:>10,.0f} lines/sec  ({pool_s:.2f}s)  "
+          f"x{inline_s / pool_s:.2f}")
+
+
+if __name__ == "__main__":
+    main()
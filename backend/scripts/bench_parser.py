@@ -0,0 +1,177 @@
+"""
+Parser throughput benchmark — per-line format chain vs. the batch fast path.
+
+Builds one homogeneous batch per format (json / kv / syslog / plain) plus a
+mixed one, parses each with `LegacyParser` (the previous implementation: every
+line tries json → syslog → kv → plain, stdlib json, known-key sets rebuilt per
+call, non-slotted records) and with `parse_log_lines`, and checks both produce
+the same fields.
+
+Usage:
+    python -m scripts.bench_parser --lines 100000
+    python -m scripts.bench_parser --file ../test-log/shell.log --repeat 1000
+"""
+import argparse
+import json
+import random
+import re
+import time
+from dataclasses import dataclass, field
+
+from scripts.bench_drain import _read
+from src.ingest.parser import orjson, parse_log_lines
+
+
+@dataclass
+class _LegacyParsedLog:
+    message: str
+    level: str = "INFO"
+    source: str = "unknown"
+    timestamp: str | None = None
+    host: str | None = None
+    extra: dict = field(default_factory=dict)
+    format: str = "plain"
+
+
+class LegacyParser:
+    """The pre-batch parse_log_line, kept as the baseline."""
+
+    _KV_RE = re.compile(r'(\w+)\s*=\s*(?:"([^"]*?)"|(\S+))')
+    _SYSLOG_RE = re.compile(
+        r"^(?:<\d+>)?(\w{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2})\s+(\S+)\s+(\S+?)(?:\[\d+\])?:\s+(.+)$"
+    )
+    _LEVEL_RE = re.compile(r"\b(ERROR|WARN|INFO|DEBUG|FATAL|CRITICAL)\b", re.IGNORECASE)
+    _LEADING_ISO_RE = re.compile(
+        r"^\s*(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?)(?=\s|$)"
+    )
+
+    def parse(self, line: str) -> _LegacyParsedLog:
+        if not line or not line.strip():
+            return _LegacyParsedLog(message="", format="plain")
+        return self._json(line) or self._syslog(line) or self._kv(line) or self._plain(line)
+
+    def _json(self, line):
+        stripped = line.strip()
+        if not stripped.startswith("{"):
+            return None
+        try:
+            obj = json.loads(stripped)
+        except ValueError:
+            return None
+        if not isinstance(obj, dict):
+            return None
+        message = obj.get("message") or obj.get("msg") or obj.get("log") or obj.get("text") or stripped
+        level = obj.get("level") or obj.get("severity") or obj.get("loglevel") or "INFO"
+        source = obj.get("source") or obj.get("service") or obj.get("app") or obj.get("logger") or "unknown"
+        timestamp = obj.get("timestamp") or obj.get("time") or obj.get("ts")
+        host = obj.get("host") or obj.get("hostname")
+        known_keys = {
+            "message", "msg", "log", "text", "level", "severity", "loglevel",
+            "source", "service", "app", "logger", "timestamp", "time", "ts",
+            "host", "hostname",
+        }
+        return _LegacyParsedLog(
+            message=str(message), level=str(level).upper(), source=str(source),
+            timestamp=str(timestamp) if timestamp else None, host=str(host) if host else None,
+            extra={k: v for k, v in obj.items() if k not in known_keys}, format="json",
+        )
+
+    def _kv(self, line):
+        pairs = self._KV_RE.findall(line)
+        if len(pairs) < 2:
+            return None
+        kv = {k.lower(): (v1 or v2) for k, v1, v2 in pairs}
+        known_keys = {
+            "message", "msg", "level", "severity", "source", "service",
+            "timestamp", "time", "host", "hostname",
+        }
+        return _LegacyParsedLog(
+            message=str(kv.get("message") or kv.get("msg") or line),
+            level=str(kv.get("level") or kv.get("severity") or "INFO").upper(),
+            source=str(kv.get("source") or kv.get("service") or "unknown"),
+            timestamp=kv.get("timestamp") or kv.get("time"),
+            host=kv.get("host") or kv.get("hostname"),
+            extra={k: v for k, v in kv.items() if k not in known_keys}, format="kv",
+        )
+
+    def _syslog(self, line):
+        m = self._SYSLOG_RE.match(line.strip())
+        if not m:
+            return None
+        ts_str, host, app, message = m.groups()
+        level_m = self._LEVEL_RE.search(message)
+        return _LegacyParsedLog(
+            message=message, level=level_m.group(1).upper() if level_m else "INFO",
+            source=app, timestamp=ts_str, host=host, format="syslog",
+        )
+
+    def _plain(self, line):
+        level_m = self._LEVEL_RE.search(line)
+        ts_m = self._LEADING_ISO_RE.match(line)
+        return _LegacyParsedLog(
+            message=line.strip(), level=level_m.group(1).upper() if level_m else "INFO",
+            timestamp=ts_m.group(1) if ts_m else None, format="plain",
+        )
+
+
+def fields(p) -> tuple:
+    return (p.message, p.level, p.source, p.timestamp, p.host, p.extra, p.format)
+
+
+_LEVELS = ["INFO", "INFO", "INFO", "WARN", "ERROR", "DEBUG"]
+_SERVICES = ["gateway", "payment-gw", "auth", "orders", "worker"]
+_MESSAGES = [
+    "upstream timeout after {n}ms", "connection refused from 10.0.{a}.{b}",
+    "user {n} logged in", "cache miss for key order:{n}", "retrying job {n} (attempt 3)",
+]
+
+
+def synth_batch(fmt: str, lines: int, seed: int = 5) -> list[str]:
+    rng = random.Random(seed)
+    out = []
+    for i in range(lines):
+        level, service = rng.choice(_LEVELS), rng.choice(_SERVICES)
+        msg = rng.choice(_MESSAGES).format(n=rng.randint(1, 99999), a=rng.randint(0, 255), b=rng.randint(0, 255))
+        ts = f"2026-01-02T{(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d}Z"
+        kind = rng.choice(["json", "kv", "syslog", "plain"]) if fmt == "mixed" else fmt
+        if kind == "json":
+            out.append(json.dumps({"timestamp": ts, "level": level, "service": service,
+                                   "message": msg, "host": "node-1", "trace_id": f"{rng.getrandbits(32):08x}"}))
+        elif kind == "kv":
+            out.append(f'ts={ts} level={level} service={service} host=node-1 msg="{msg}"')
+        elif kind == "syslog":
+            out.append(f"<134>Jan  2 {(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d} node-1 "
+                       f"{service}[{rng.randint(100, 9999)}]: {level} {msg}")
+        else:
+            out.append(f"{ts} {level} {service} {msg}")
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="parser lines/sec benchmark")
+    parser.add_argument("--file", help="log file to replay (utf-8 or utf-16)")
+    parser.add_argument("--lines", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=1, help="replay the file N times")
+    args = parser.parse_args()
+
+    batches = (
+        {args.file: _read(args.file) * args.repeat} if args.file
+        else {fmt: synth_batch(fmt, args.lines) for fmt in ("json", "kv", "syslog", "plain", "mixed")}
+    )
+    legacy = LegacyParser()
+    print(f"[bench] orjson={'yes' if orjson is not None else 'no'}")
+    for name, lines in batches.items():
+        start = time.perf_counter()
+        old = [legacy.parse(line) for line in lines]
+        old_s = time.perf_counter() - start
+        start = time.perf_counter()
+        new = parse_log_lines(lines)
+        new_s = time.perf_counter() - start
+        same = all(fields(a) == fields(b) for a, b in zip(old, new))
+        n = len(lines)
+        print(f"[bench] {name:<7} legacy {n / old_s:>10,.0f}/s  batch {n / new_s:>10,.0f}/s  "
+              f"x{old_s / new_s:.2f}  identical={same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Load test — dashboard reads and agent ingest against a running API.
+
+D dashboard clients poll the read endpoints (overview, reports list,
+confidence trend, patterns) while I ingest clients post log batches, all at
+once for `--seconds`. Reports p50 / p95 / p99 latency per endpoint group and
+every non-2xx status — 503 is a pool-checkout timeout (DB_POOL_TIMEOUT), the
+case pool sizing and DB_ASYNC_READS are meant to keep at zero.
+
+The access token is minted locally, so SECRET_KEY must match the server's.
+Run it twice (DB_ASYNC_READS=false / true, or different DB_POOL_SIZE) and
+compare the dashboard p99 under the same ingest load.
+
+Usage:
+    python -m scripts.loadtest --url http://localhost:8000 --tenant t1 --project p1
+    python -m scripts.loadtest --dashboard 50 --ingest 20 --batch-lines 500 --seconds 60
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from scripts.bench_drain import synth_corpus
+from src.core.jwt import create_access_token
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Recorder:
+    def __init__(self):
+        self.latency: dict[str, list[float]] = defaultdict(list)
+        self.status: dict[str, Counter] = defaultdict(Counter)
+
+    async def call(self, group: str, request) -> None:
+        start = time.perf_counter()
+        try:
+            resp = await request
+            code = resp.status_code
+        except httpx.HTTPError as e:
+            code = type(e).__name__
+        self.latency[group].append((time.perf_counter() - start) * 1000)
+        self.status[group][code] += 1
+
+    def report(self, seconds: float) -> None:
+        print(f"[load] {'group':<10} {'reqs':>7} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8}  status")
+        for group in sorted(self.latency):
+            samples = self.latency[group]
+            codes = " ".join(f"{c}={n}" for c, n in sorted(self.status[group].items(), key=str))
+            print(
+                f"[load] {group:<10} {len(samples):>7} {len(samples) / seconds:>7.1f} "
+                + " ".join(f"{_percentile(samples, q):>6.0f}ms" for q in (0.50, 0.95, 0.99))
+                + f"  {codes}"
+            )
+        errors = sum(n for c in self.status.values() for code, n in c.items() if not isinstance(code, int) or code >= 500)
+        print(f"[load] 5xx / transport errors: {errors}")
+
+
+async def _dashboard(client: httpx.AsyncClient, rec: Recorder, project: str, deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        await asyncio.gather(
+            rec.call("overview", client.get("/projects/overview")),
+            rec.call("reports", client.get(f"/projects/{project}/reports", params={"limit": 20})),
+            rec.call("trend", client.get(f"/projects/{project}/reports/trend/confidence")),
+            rec.call("patterns", client.get("/patterns", params={"limit": 50})),
+        )
+
+
+async def _ingest(client: httpx.AsyncClient, rec: Recorder, batches: list[list[str]], deadline: float) -> None:
+    i = 0
+    while time.perf_counter() < deadline:
+        await rec.call("ingest", client.post("/ingest", json={"logs": batches[i % len(batches)]}))
+        i += 1
+
+
+async def run(args) -> None:
+    token = create_access_token("loadtest", args.tenant)
+    corpus = synth_corpus(args.batch_lines * 20, 300)
+    batches = [corpus[i:i + args.batch_lines] for i in range(0, len(corpus), args.batch_lines)]
+    ingest_headers = {"X-Tenant-ID": args.tenant, "X-Project-ID": args.project, "X-Agent-ID": "loadtest"}
+    if args.api_key:
+        ingest_headers["X-API-Key"] = args.api_key
+
+    limits = httpx.Limits(max_connections=args.dashboard * 4 + args.ingest)
+    rec = Recorder()
+    async with (
+        httpx.AsyncClient(base_url=args.url, headers={"Authorization": f"Bearer {token}"},
+                          limits=limits, timeout=args.timeout) as dash,
+        httpx.AsyncClient(base_url=args.url, headers=ingest_headers,
+                          limits=limits, timeout=args.timeout) as ing,
+    ):
+        deadline = time.perf_counter() + args.seconds
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(_dashboard(dash, rec, args.project, deadline) for _ in range(args.dashboard)),
+            *(_ingest(ing, rec, batches, deadline) for _ in range(args.ingest)),
+        )
+        elapsed = time.perf_counter() - start
+
+    print(f"[load] {args.url} dashboard={args.dashboard} ingest={args.ingest}x{args.batch_lines} lines "
+          f"{elapsed:.0f}s")
+    rec.report(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="concurrent dashboard + ingest load test")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--tenant", default="loadtest")
+    parser.add_argument("--project", default="loadtest")
+    parser.add_argument("--api-key", default=None, help="X-API-Key for /ingest (INGEST_API_KEY)")
+    parser.add_argument("--dashboard", type=int, default=20, help="concurrent dashboard clients")
+    parser.add_argument("--ingest", type=int, default=8, help="concurrent ingest clients")
+    parser.add_argument("--batch-lines", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Partition maintenance for logs / analysis_results (PostgreSQL).
+
+Usage:
+    # One-off: convert the existing tables (maintenance window — exclusive lock while copying)
+    python -m scripts.partitions convert --granularity weekly
+
+    # Create the current and upcoming partitions (the API also does this at startup)
+    python -m scripts.partitions ensure
+
+    # Show partitions with estimated row counts
+    python -m scripts.partitions list
+"""
+import argparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.core.config import settings
+from src.db.partitions import (
+    GRANULARITIES,
+    PARTITIONED_TABLES,
+    convert_to_partitioned,
+    ensure_all,
+    is_partitioned,
+    list_partitions,
+)
+from src.db.session import maintenance_engine
+
+
+def main():
+    parser = argparse.ArgumentParser("Netscope partition maintenance")
+    parser.add_argument("command", choices=["convert", "ensure", "list"])
+    parser.add_argument(
+        "--granularity", choices=sorted(GRANULARITIES), default=settings.DB_PARTITIONING,
+        help="daily | weekly (default: DB_PARTITIONING)",
+    )
+    args = parser.parse_args()
+
+    if args.command in ("convert", "ensure") and not args.granularity:
+        parser.error("--granularity is required (or set DB_PARTITIONING)")
+
+    with maintenance_engine.begin() as conn:
+        if args.command == "convert":
+            for table in PARTITIONED_TABLES:
+                copied = convert_to_partitioned(conn, table, args.granularity)
+                print(f"[partitions] {table}: {copied} rows copied")
+            print("[partitions] set DB_PARTITIONING so the API keeps creating partitions ahead")
+        elif args.command == "ensure":
+            created = ensure_all(conn, args.granularity)
+            print(f"[partitions] created: {', '.join(created) or 'none'}")
+        else:
+            for table in PARTITIONED_TABLES:
+                if not is_partitioned(conn, table):
+                    print(f"[partitions] {table}: not partitioned")
+                    continue
+                for name, rows in list_partitions(conn, table):
+                    print(f"[partitions] {table}: {name:<32s} ~{int(rows)} rows")
+
+
+if __name__ == "__main__":
+    main()
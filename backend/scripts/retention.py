@@ -1,7 +1,20 @@
 """
-7-day retention cleanup job.
+Retention cleanup job.
 
-Deletes logs and analysis_results older than the retention period.
+Deletes logs, analysis_results, weekly_reports and hourly_rollups buckets
+older than the retention period, stale `patterns` candidates and orphaned
+`pattern_feedback` rows.
+The engine (src/db/retention.py) deletes in small committed slices with a
+pause between them, so it can run next to live ingest; an interrupted run
+resumes from its checkpoint file with the same cutoffs.
+
+When `logs` / `analysis_results` are partitioned (DB_PARTITIONING, see
+src/db/partitions.py) whole expired partitions are detached and dropped —
+no row-by-row DELETE, no table bloat, no long locks. A partition is dropped
+once its entire range is older than the cutoff, so rows are kept for at
+least `--days` and at most one partition period longer.
+
+Per-tenant periods come from RETENTION_TENANT_DAYS or `--tenant-days`.
 
 Usage:
     # Via Docker
@@ -9,75 +22,96 @@ Usage:
 
     # Standalone
     python -m scripts.retention --days 7 --dry-run
+    python -m scripts.retention --tenant-days acme=30 --tenant-days trial=1
 
     # Cron (daily at 03:00)
     0 3 * * * cd /app && python -m scripts.retention
 """
 import argparse
-from datetime import datetime, timedelta, UTC
+import logging
+import os
+import tempfile
 
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from sqlalchemy import delete
-from src.db.session import SessionLocal
-from src.model.log import Log
-from src.model.analysis_result import AnalysisResult
-from src.model.weekly_report import WeeklyReport
-
-
-TARGETS = [
-    ("logs", Log, Log.received_at),
-    ("analysis_results", AnalysisResult, AnalysisResult.received_at),
-    ("weekly_reports", WeeklyReport, WeeklyReport.created_at),
-]
-
-
-def run_retention(*, days: int = 7, dry_run: bool = False) -> dict[str, int]:
-    cutoff = datetime.now(UTC) - timedelta(days=days)
-    print(f"[retention] cutoff: {cutoff.isoformat()} ({days} days ago)")
-
-    results: dict[str, int] = {}
-    db = SessionLocal()
-
+from src.core.config import settings
+from src.db.retention import RetentionJob, RetentionPolicy, StepResult
+from src.db.session import MaintenanceSession
+
+DEFAULT_CHECKPOINT = os.path.join(tempfile.gettempdir(), "netscope-retention.json")
+
+
+def run_retention(
+    *,
+    days: int | None = None,
+    dry_run: bool = False,
+    tenant_days: dict[str, int] | None = None,
+    chunk_size: int | None = None,
+    sleep: float | None = None,
+    checkpoint: str | None = DEFAULT_CHECKPOINT,
+) -> dict[str, StepResult]:
+    policy = RetentionPolicy(
+        days=settings.RETENTION_DAYS if days is None else days,
+        tenant_days={**settings.RETENTION_TENANT_DAYS, **(tenant_days or {})},
+        candidate_days=settings.RETENTION_CANDIDATE_DAYS,
+    )
+    overrides = ", ".join(f"{t}={d}" for t, d in sorted(policy.tenant_days.items())) or "none"
+    print(f"[retention] {policy.days} days (tenant overrides: {overrides})")
+
+    job = RetentionJob(
+        MaintenanceSession,
+        policy,
+        chunk_size=settings.RETENTION_CHUNK_ROWS if chunk_size is None else chunk_size,
+        sleep=settings.RETENTION_CHUNK_SLEEP_SECONDS if sleep is None else sleep,
+        dry_run=dry_run,
+        checkpoint=checkpoint or None,
+        partitioning=settings.DB_PARTITIONING,
+    )
     try:
-        for table_name, model, ts_col in TARGETS:
-            stmt = delete(model).where(ts_col < cutoff)
-
-            if dry_run:
-                count = db.query(model).filter(ts_col < cutoff).count()
-                print(f"[dry-run] {table_name}: {count} rows would be deleted")
-            else:
-                result = db.execute(stmt)
-                count = result.rowcount
-                print(f"[deleted] {table_name}: {count} rows")
-
-            results[table_name] = count
-
-        if not dry_run:
-            db.commit()
-            print("[retention] committed")
-        else:
-            print("[retention] dry-run complete, no changes made")
-
+        results = job.run()
     except Exception as e:
-        db.rollback()
-        print(f"[retention] ERROR: {e}")
+        print(f"[retention] ERROR: {e} (re-run to resume from {checkpoint})" if checkpoint else f"[retention] ERROR: {e}")
         raise
-    finally:
-        db.close()
 
+    total = sum(r.rows for r in results.values())
+    if dry_run:
+        print(f"[retention] dry-run complete, no changes made (~{total} rows)")
+    else:
+        print(f"[retention] done: {total} rows")
     return results
 
 
+def _tenant_days(value: str) -> tuple[str, int]:
+    tenant, _, days = value.partition("=")
+    if not tenant or not days.isdigit():
+        raise argparse.ArgumentTypeError(f"expected TENANT=DAYS, got {value!r}")
+    return tenant, int(days)
+
+
 def main():
     parser = argparse.ArgumentParser("Netscope retention cleanup")
-    parser.add_argument("--days", type=int, default=7, help="Retention period in days (default: 7)")
+    parser.add_argument("--days", type=int, default=None,
+                        help=f"Retention period in days (default: RETENTION_DAYS={settings.RETENTION_DAYS})")
     parser.add_argument("--dry-run", action="store_true", help="Preview deletions without executing")
+    parser.add_argument("--tenant-days", type=_tenant_days, action="append", default=[], metavar="TENANT=DAYS",
+                        help="Per-tenant retention override (repeatable; adds to RETENTION_TENANT_DAYS)")
+    parser.add_argument("--chunk", type=int, default=None, help="Rows deleted and committed per slice")
+    parser.add_argument("--sleep", type=float, default=None, help="Seconds to pause between slices")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT,
+                        help="Resume file ('' disables; default: %(default)s)")
     args = parser.parse_args()
 
-    run_retention(days=args.days, dry_run=args.dry_run)
+    logging.basicConfig(level=logging.INFO, format="[retention] %(message)s")
+    run_retention(
+        days=args.days,
+        dry_run=args.dry_run,
+        tenant_days=dict(args.tenant_days),
+        chunk_size=args.chunk,
+        sleep=args.sleep,
+        checkpoint=args.checkpoint,
+    )
 
 
 if __name__ == "__main__":
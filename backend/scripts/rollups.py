@@ -0,0 +1,46 @@
+"""
+Hourly rollup backfill / compaction job.
+
+Recomputes `hourly_rollups` buckets from logs and analysis_results — run
+once after deploying the rollup table (backfill), or to repair buckets
+after bulk deletes outside the API (e.g. retention).
+
+Usage:
+    # Via Docker
+    docker compose exec backend python -m scripts.rollups --days 30
+
+    # One tenant
+    python -m scripts.rollups --days 7 --tenant <tenant_id>
+"""
+import argparse
+from datetime import datetime, timedelta, UTC
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.analysis.rollups import rebuild_rollups
+from src.db.session import MaintenanceSession
+
+
+def main():
+    parser = argparse.ArgumentParser("Netscope hourly rollup rebuild")
+    parser.add_argument("--days", type=int, default=7, help="Rebuild buckets of the last N days (default: 7)")
+    parser.add_argument("--tenant", default=None, help="Only this tenant (default: all)")
+    args = parser.parse_args()
+
+    since = datetime.now(UTC) - timedelta(days=args.days)
+    db = MaintenanceSession()
+    try:
+        written = rebuild_rollups(db, since=since, tenant_id=args.tenant)
+        print(f"[rollups] rebuilt since {since.isoformat()}: {written} buckets")
+    except Exception as e:
+        db.rollback()
+        print(f"[rollups] ERROR: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
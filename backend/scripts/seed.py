@@ -16,9 +16,10 @@ import uuid
 from datetime import datetime, timedelta, UTC
 from typing import List, Tuple
 
+from src.analysis.rollups import rebuild_rollups
 from src.db.init import init_db
 from src.db.base import Base
-from src.db.session import SessionLocal, engine
+from src.db.session import MaintenanceSession, maintenance_engine
 from src.core.security import hash_password
 from src.model.User import User
 from src.model.Tenant import Tenant
@@ -278,9 +279,9 @@ def reset_all(db) -> None:
     # create_all alone is IF NOT EXISTS — it won't add new columns.
     print("[seed] dropping all tables (legacy schema cleanup)…")
     db.close()  # release session before DDL
-    Base.metadata.drop_all(bind=engine)
+    Base.metadata.drop_all(bind=maintenance_engine)
     print("[seed] recreating tables with current schema…")
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=maintenance_engine)
 
 
 def seed_user(db, rng: random.Random, spec: dict) -> dict:
@@ -365,16 +366,18 @@ def main():
 
     if args.reset:
         # Drop/recreate handles schema; no need for plain init_db() first.
-        reset_all(SessionLocal())
+        reset_all(MaintenanceSession())
     else:
         print("[seed] ensuring schema (create_all)…")
         init_db()
 
-    db = SessionLocal()
+    db = MaintenanceSession()
     try:
         results = []
         for spec in DEMO_USERS:
             results.append(seed_user(db, rng, spec))
+        # Seeded rows bypass the write path — recompute the dashboard rollups.
+        rebuild_rollups(db, since=datetime.now(UTC) - timedelta(days=1))
 
         print("\n[seed] DONE — demo accounts (password: Demo1234!):")
         for r in results:
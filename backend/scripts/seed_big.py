@@ -21,8 +21,9 @@ import random
 import uuid
 from datetime import datetime, timedelta, UTC
 
+from src.analysis.rollups import rebuild_rollups
 from src.db.init import init_db
-from src.db.session import SessionLocal
+from src.db.session import MaintenanceSession
 from src.model.User import User
 from src.model.Project import Project
 from src.model.log import Log
@@ -224,7 +225,7 @@ def main():
 
     init_db()
     rng = random.Random(args.seed)
-    db = SessionLocal()
+    db = MaintenanceSession()
 
     try:
         if args.purge:
@@ -292,6 +293,9 @@ def main():
             db.commit()
             print(f"[seed_big] {email:>18s}  projects={len(projects)}")
 
+        # Backdated rows bypass the write path — recompute the dashboard rollups.
+        rebuild_rollups(db, since=datetime.now(UTC) - timedelta(days=args.days + 1))
+
         print(f"\n[seed_big] DONE — +{total_logs} logs, +{total_analyses} analyses "
               f"across {args.days}d window")
     finally:
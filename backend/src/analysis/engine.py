@@ -10,6 +10,7 @@ from src.analysis.rule_engine import (
 from src.analysis.gpt_analyzer import GPTAnalyzer
 from src.schemas.enums import SeverityLevel, AnalysisStrategy, LogLevel
 from src.log.models import Log
+from src.ingest.parser import ParsedBatch
 
 
 class AnalysisEngine:
@@ -46,6 +47,21 @@ class AnalysisEngine:
 
         return self._analyze_internal(logs, strategy)
 
+    # ======================================================
+    # 3️⃣ Ingest 배치 분석 (파싱 결과 재사용)
+    # ======================================================
+    def analyze_parsed(
+        self,
+        batch: ParsedBatch,
+        *,
+        strategy: AnalysisStrategy,
+    ):
+        """
+        parse_batch() 결과를 그대로 룰 평가에 사용.
+        source / level / timestamp 가 실제 값이므로 R019~R024 시간 윈도우 룰이 동작한다.
+        """
+        return self._analyze_internal(RuleEngine.to_rule_logs(batch), strategy)
+
     # ======================================================
     # 공통 분석 파이프라인
     # ======================================================
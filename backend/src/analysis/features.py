@@ -0,0 +1,140 @@
+"""
+Rule feature vector — a single scan over a batch shared by every rule.
+
+`RuleEngine.run` used to hand the raw `List[RuleLog]` to each of the 24
+predicates (and again to many evidence builders), so one batch was scanned
+~24 times plus one `regex.search` per rule per log. In compiled mode the
+engine builds a `RuleFeatures` once and every compiled predicate/evidence
+reads from it:
+
+  - per-signal hit counts  (how many logs match each signal regex — one
+                            combined `KeywordMatcher` scan per message)
+  - level counts           (ERROR / WARN / INFO / DEBUG)
+  - per-source counts + the set of sources that logged an ERROR
+  - a timestamp-sorted `Timeline` (for burst / sequence / spike rules)
+
+Time-windowed results are linear-time and memoized per window by the
+timeline (src/analysis/temporal.py), so a predicate and its evidence
+builder share one computation.
+
+Every count is weighted by `RuleLog.count` (1 for a plain line, the run
+length for an agent-aggregated record), so a collapsed storm scores like
+the lines it stands for.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Sequence, Set
+
+from src.analysis.keyword_matcher import KeywordMatcher
+from src.analysis.temporal import Timeline
+from src.schemas.enums import LogLevel
+
+if TYPE_CHECKING:
+    from src.analysis.rule_engine import RuleLog
+
+
+_LEVEL_KEYS: Dict[LogLevel, LogLevel] = {level: level for level in LogLevel}
+
+
+@dataclass
+class RuleFeatures:
+    """Shared, read-only view of a batch for compiled rule evaluation."""
+    logs: Sequence["RuleLog"]
+    total: int
+    signal_hits: Dict[str, int]
+    level_counts: Dict[LogLevel, int]
+    source_counts: Dict[str, int]
+    error_sources: Set[str]
+    # Sorted once per batch (stable — same order as sorted(logs)).
+    timeline: Timeline
+    error_timeline: Timeline
+
+    # --------------------------------------------------
+    # Construction (the only pass over the batch)
+    # --------------------------------------------------
+    @classmethod
+    def build(
+        cls,
+        logs: Sequence["RuleLog"],
+        matcher: KeywordMatcher,
+    ) -> "RuleFeatures":
+        signal_hits: Dict[str, int] = {name: 0 for name in matcher.names}
+        level_counts: Dict[LogLevel, int] = {level: 0 for level in LogLevel}
+        source_counts: Dict[str, int] = {}
+        error_sources: Set[str] = set()
+        tagged: List[FrozenSet[str]] = []
+        # Batches repeat lines heavily (retries, error storms) — tag each
+        # distinct message once.
+        tags_by_message: Dict[str, FrozenSet[str]] = {}
+
+        total = 0
+        for log in logs:
+            n = getattr(log, "count", 1)   # ORM `Log`s (DB analysis) are single lines
+            total += n
+            message = log.message or ""
+            tags = tags_by_message.get(message)
+            if tags is None:
+                tags = matcher.tags(message)
+                tags_by_message[message] = tags
+            for name in tags:
+                signal_hits[name] += n
+            tagged.append(tags)
+
+            level = _LEVEL_KEYS.get(log.level)
+            if level is not None:
+                level_counts[level] += n
+                if level == LogLevel.ERROR:
+                    error_sources.add(log.source)
+
+            source_counts[log.source] = source_counts.get(log.source, 0) + n
+
+        def timestamp(log: "RuleLog"):
+            return log.timestamp
+
+        # Unweighted batches keep the plain entry-counting scans.
+        weighted = total != len(logs)
+        errors = [log for log in logs if log.level == LogLevel.ERROR]
+        timeline = Timeline(logs, timestamp, tagged, [log.count for log in logs] if weighted else None)
+        error_timeline = Timeline(errors, timestamp, weights=[log.count for log in errors] if weighted else None)
+
+        return cls(
+            logs=logs,
+            total=total,
+            signal_hits=signal_hits,
+            level_counts=level_counts,
+            source_counts=source_counts,
+            error_sources=error_sources,
+            timeline=timeline,
+            error_timeline=error_timeline,
+        )
+
+    # --------------------------------------------------
+    # Cheap accessors
+    # --------------------------------------------------
+    def hit(self, signal: str) -> bool:
+        return self.signal_hits.get(signal, 0) > 0
+
+    def count(self, signal: str) -> int:
+        return self.signal_hits.get(signal, 0)
+
+    def level(self, level: LogLevel) -> int:
+        return self.level_counts.get(level, 0)
+
+    def error_rate(self) -> float:
+        """ERROR 로그 비율 (0.0~1.0)."""
+        if not self.total:
+            return 0.0
+        return self.level(LogLevel.ERROR) / self.total
+
+    # --------------------------------------------------
+    # Time-windowed features (delegated to the timelines)
+    # --------------------------------------------------
+    def error_burst_count(self, window_seconds: float = 60.0) -> int:
+        return self.error_timeline.burst_count(window_seconds)
+
+    def has_sequence(self, first: str, then: str, max_gap_seconds: float = 300.0) -> bool:
+        return self.timeline.has_sequence(first, then, max_gap_seconds)
+
+    def spike_ratio(self, window_seconds: float = 60.0) -> float:
+        return self.timeline.spike_ratio(window_seconds)
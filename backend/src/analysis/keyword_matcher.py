@@ -0,0 +1,123 @@
+"""
+KeywordMatcher — tag a message with every signal class it hits in one scan.
+
+The rule engine's signal extractors (`_TIMEOUT_RE`, `_CONN_RE`, ...) used to
+run one `search` each over every message. This folds them into a single
+alternation regex:
+
+    \\b(?=(?P<g0>...)|(?P<g1>...)|...)
+
+Each branch is the original pattern source (minus a shared leading `\\b`),
+so `re.IGNORECASE` and word-boundary semantics are unchanged. When every
+pattern is a plain keyword alternation (`\\b(a|b c|\\d..)\\b`), a one-char
+class of possible first characters is checked before the branches, so most
+word boundaries are rejected without trying 15 alternatives. The lookahead
+is zero-width, so `finditer` visits every word boundary and reports the first
+class that matches there. When a class matches, the later classes are also
+tried at that same position, so two classes that can start at the same
+offset are both reported. The result is exactly the set of patterns whose
+own `search` would succeed.
+
+Stdlib only — safe to import from anywhere (rule engine, agent-side filters).
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, FrozenSet, List, Mapping, Tuple
+
+_WORD_BOUNDARY = r"\b"
+
+# `\b(alt|alt|...)\b` where every alt is literal text (or starts with \d).
+_KEYWORD_GROUP_RE = re.compile(r"^\\b\((?P<alts>[^()\[\]{}?*+^$.]*)\)\\b$")
+
+
+class KeywordMatcher:
+    """
+    Combined matcher over named patterns.
+
+    All patterns must share the same flags (the rule extractors are all
+    `re.IGNORECASE`).
+    """
+
+    def __init__(self, patterns: Mapping[str, re.Pattern]):
+        if not patterns:
+            raise ValueError("KeywordMatcher needs at least one pattern")
+
+        compiled = [(name, _as_pattern(p)) for name, p in patterns.items()]
+        flags = {p.flags for _, p in compiled}
+        if len(flags) != 1:
+            raise ValueError("KeywordMatcher patterns must share the same flags")
+        self.flags = flags.pop()
+
+        self.names: Tuple[str, ...] = tuple(name for name, _ in compiled)
+        self._patterns: Tuple[re.Pattern, ...] = tuple(p for _, p in compiled)
+
+        sources = [p.pattern for p in self._patterns]
+        hoist = all(src.startswith(_WORD_BOUNDARY) for src in sources)
+        if hoist:
+            sources = [src[len(_WORD_BOUNDARY):] for src in sources]
+
+        # Group names must be identifiers ("5xx" is not) — use positional names.
+        self._group_index: Dict[str, int] = {f"g{i}": i for i in range(len(sources))}
+        branches = "|".join(f"(?P<g{i}>{src})" for i, src in enumerate(sources))
+        prefix = _WORD_BOUNDARY if hoist else ""
+        first_chars = _first_char_class([p.pattern for p in self._patterns])
+        if first_chars:
+            prefix += f"(?={first_chars})"
+        self._combined = re.compile(f"{prefix}(?=(?:{branches}))", self.flags)
+
+    def tags(self, message: str) -> FrozenSet[str]:
+        """Names of every pattern that `search`es successfully in message."""
+        found: List[bool] = [False] * len(self.names)
+        remaining = len(found)
+
+        for m in self._combined.finditer(message):
+            first = self._group_index[m.lastgroup]
+            if not found[first]:
+                found[first] = True
+                remaining -= 1
+            # Later classes may start at this same offset — check them here.
+            pos = m.start()
+            for i in range(first + 1, len(found)):
+                if not found[i] and self._patterns[i].match(message, pos):
+                    found[i] = True
+                    remaining -= 1
+            if remaining == 0:
+                break
+
+        return frozenset(name for name, hit in zip(self.names, found) if hit)
+
+    def any(self, message: str) -> bool:
+        """True if any pattern matches (stops at the first hit)."""
+        return self._combined.search(message) is not None
+
+
+def _as_pattern(p: re.Pattern | str) -> re.Pattern:
+    return p if isinstance(p, re.Pattern) else re.compile(p)
+
+
+def _first_char_class(sources: List[str]) -> str | None:
+    """
+    Character class of every possible first character, or None when any
+    pattern is not a plain keyword group. The class is compiled with the
+    patterns' own flags, so IGNORECASE folding stays identical.
+    """
+    chars: set[str] = set()
+    digits = False
+    for src in sources:
+        m = _KEYWORD_GROUP_RE.match(src)
+        if not m:
+            return None
+        for alt in m.group("alts").split("|"):
+            if alt.startswith(r"\d"):
+                digits = True
+            elif alt and alt[0].isalnum():
+                chars.add(alt[0])
+            else:
+                return None
+            if "\\" in alt.replace(r"\d", ""):
+                return None
+    body = "".join(re.escape(c) for c in sorted(chars))
+    if digits:
+        body += r"\d"
+    return f"[{body}]"
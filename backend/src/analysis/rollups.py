@@ -0,0 +1,252 @@
+"""
+Hourly rollups for dashboards (`hourly_rollups`).
+
+대시보드가 요청마다 logs / analysis_results 를 스캔하지 않도록 (tenant, project, 시간 버킷)
+단위 카운터를 쓰기 시점에 함께 갱신한다.
+
+- 로그 저장(`LogDomainService.create_log`) · 삭제, 분석 저장(/analysis, /ingest)이
+  같은 트랜잭션 안에서 해당 버킷에 +1 / -1 (`record_logs`, `record_analysis`)
+- 현재 시각의 버킷은 쓰기마다 갱신되는 "진행 중" 버킷 — 읽을 때 완료된 버킷과 그대로 합산
+- `rebuild_rollups`: 원본 테이블에서 구간을 다시 집계 (도입 전 데이터 백필, 보정용 컴팩션 잡)
+  `python -m scripts.rollups --days 30`
+- 보관 기간은 원본과 같다 — `scripts.retention` 이 tenant별 cutoff 로 만료 버킷을 함께 삭제
+
+PostgreSQL 은 `INSERT ... ON CONFLICT DO UPDATE` 로 서버에서 더하고, 그 외(SQLite 등)는 ORM 으로 병합.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta, UTC
+
+from sqlalchemy import delete, func, literal
+from sqlalchemy.orm import Session
+
+from src.model.rollup import HourlyRollup
+
+LEVEL_COLUMNS = {
+    "DEBUG": "logs_debug",
+    "INFO": "logs_info",
+    "WARN": "logs_warn",
+    "ERROR": "logs_error",
+}
+SEVERITY_COLUMNS = {
+    "LOW": "analyses_low",
+    "MEDIUM": "analyses_medium",
+    "HIGH": "analyses_high",
+    "CRITICAL": "analyses_critical",
+}
+COUNTERS = (
+    *LEVEL_COLUMNS.values(),
+    *SEVERITY_COLUMNS.values(),
+    "confidence_sum",
+    "confidence_count",
+)
+
+
+def hour_bucket(ts: datetime) -> datetime:
+    """Start of the UTC hour containing `ts` (naive values are taken as UTC)."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=UTC)
+    return ts.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+
+
+def _name(value) -> str:
+    return str(getattr(value, "value", value)).upper()
+
+
+# ======================================================
+# Write path
+# ======================================================
+
+def apply(
+    db: Session,
+    tenant_id: str,
+    project_id: str,
+    bucket: datetime,
+    counters: dict[str, float],
+) -> None:
+    """Add `counters` to one bucket. No commit — part of the caller's transaction."""
+    counters = {k: v for k, v in counters.items() if v}
+    if not counters:
+        return
+    now = datetime.now(UTC)
+
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        stmt = pg_insert(HourlyRollup).values(
+            tenant_id=tenant_id, project_id=project_id, bucket=bucket, updated_at=now, **counters,
+        )
+        set_ = {k: getattr(HourlyRollup, k) + getattr(stmt.excluded, k) for k in counters}
+        set_["updated_at"] = stmt.excluded.updated_at
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[HourlyRollup.tenant_id, HourlyRollup.project_id, HourlyRollup.bucket],
+            set_=set_,
+        ))
+        return
+
+    row = db.get(HourlyRollup, (tenant_id, project_id, bucket))
+    if row is None:
+        row = HourlyRollup(tenant_id=tenant_id, project_id=project_id, bucket=bucket)
+        for k in COUNTERS:
+            setattr(row, k, 0)
+        db.add(row)
+    for k, v in counters.items():
+        setattr(row, k, getattr(row, k) + v)
+    row.updated_at = now
+
+
+def record_logs(
+    db: Session,
+    tenant_id: str,
+    project_id: str,
+    levels: Iterable,
+    *,
+    at: datetime | None = None,
+    sign: int = 1,
+) -> None:
+    """Count stored (sign=1) or deleted (sign=-1) log rows received at `at`."""
+    counters: dict[str, int] = defaultdict(int)
+    for level in levels:
+        counters[LEVEL_COLUMNS.get(_name(level), "logs_info")] += sign
+    apply(db, tenant_id, project_id, hour_bucket(at or datetime.now(UTC)), counters)
+
+
+def record_analysis(
+    db: Session,
+    tenant_id: str,
+    project_id: str,
+    severity,
+    confidence: float,
+    *,
+    at: datetime | None = None,
+) -> None:
+    """Count one stored analysis result."""
+    counters = {
+        SEVERITY_COLUMNS.get(_name(severity), "analyses_low"): 1,
+        "confidence_sum": float(confidence or 0.0),
+        "confidence_count": 1,
+    }
+    apply(db, tenant_id, project_id, hour_bucket(at or datetime.now(UTC)), counters)
+
+
+# ======================================================
+# Read path
+# ======================================================
+
+def window_totals(
+    db: Session,
+    tenant_id: str,
+    *,
+    hours: int = 24,
+    project_id: str | None = None,
+    now: datetime | None = None,
+) -> dict[str, float]:
+    """
+    Counters summed over the last `hours` buckets: the hours - 1 finished
+    ones plus the live current bucket.
+    """
+    since = hour_bucket(now or datetime.now(UTC)) - timedelta(hours=hours - 1)
+    q = db.query(*[func.coalesce(func.sum(getattr(HourlyRollup, k)), 0) for k in COUNTERS]).filter(
+        HourlyRollup.tenant_id == tenant_id,
+        HourlyRollup.bucket >= since,
+    )
+    if project_id is not None:
+        q = q.filter(HourlyRollup.project_id == project_id)
+    row = q.one()
+    return dict(zip(COUNTERS, (v or 0 for v in row)))
+
+
+def daily_confidence(
+    db: Session,
+    tenant_id: str,
+    project_id: str,
+    *,
+    start_date: date | None = None,
+    end_date: date | None = None,
+) -> list[dict]:
+    """Per UTC day: average confidence and analysis count."""
+    q = db.query(
+        HourlyRollup.bucket,
+        HourlyRollup.confidence_sum,
+        HourlyRollup.confidence_count,
+    ).filter(
+        HourlyRollup.tenant_id == tenant_id,
+        HourlyRollup.project_id == project_id,
+        HourlyRollup.confidence_count > 0,
+    )
+    if start_date:
+        q = q.filter(HourlyRollup.bucket >= datetime.combine(start_date, datetime.min.time(), UTC))
+    if end_date:
+        q = q.filter(HourlyRollup.bucket < datetime.combine(end_date + timedelta(days=1), datetime.min.time(), UTC))
+
+    days: dict[date, list[float]] = {}
+    for bucket, total, count in q.all():
+        day = hour_bucket(bucket).date()
+        acc = days.setdefault(day, [0.0, 0])
+        acc[0] += total
+        acc[1] += count
+    return [
+        {"date": day, "avg_confidence": round(total / count, 3), "report_count": count}
+        for day, (total, count) in sorted(days.items())
+    ]
+
+
+# ======================================================
+# Compaction / backfill
+# ======================================================
+
+def rebuild_rollups(
+    db: Session,
+    *,
+    since: datetime,
+    until: datetime | None = None,
+    tenant_id: str | None = None,
+) -> int:
+    """
+    Recompute every bucket in [since, until) from `logs` and
+    `analysis_results` (whole hours; `until=None` = through the current
+    hour). Commits; returns the number of bucket rows written.
+    """
+    from src.model.analysis_result import AnalysisResult
+    from src.model.log import Log
+
+    start = hour_bucket(since)
+    end = hour_bucket(until) if until else hour_bucket(datetime.now(UTC)) + timedelta(hours=1)
+
+    # PostgreSQL groups by hour server-side; elsewhere rows are folded here.
+    postgres = db.get_bind().dialect.name == "postgresql"
+    buckets: dict[tuple[str, str, datetime], dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    for model, kind_col, columns, fallback, confidence in (
+        (Log, Log.level, LEVEL_COLUMNS, "logs_info", None),
+        (AnalysisResult, AnalysisResult.severity, SEVERITY_COLUMNS, "analyses_low", AnalysisResult.confidence),
+    ):
+        hour = func.date_trunc("hour", model.received_at) if postgres else model.received_at
+        if confidence is None:
+            confidence = literal(0.0)
+        if postgres:
+            cols = (model.tenant_id, model.project_id, hour, kind_col)
+            q = db.query(*cols, func.count(), func.sum(confidence)).group_by(*cols)
+        else:
+            q = db.query(model.tenant_id, model.project_id, hour, kind_col, literal(1), confidence)
+        q = q.filter(model.received_at >= start, model.received_at < end)
+        if tenant_id is not None:
+            q = q.filter(model.tenant_id == tenant_id)
+
+        for t, p, received_at, kind, n, conf in q.yield_per(10_000):
+            acc = buckets[(t, p, hour_bucket(received_at))]
+            acc[columns.get(_name(kind), fallback)] += n
+            if model is AnalysisResult:
+                acc["confidence_sum"] += conf or 0.0
+                acc["confidence_count"] += n
+
+    stmt = delete(HourlyRollup).where(HourlyRollup.bucket >= start, HourlyRollup.bucket < end)
+    if tenant_id is not None:
+        stmt = stmt.where(HourlyRollup.tenant_id == tenant_id)
+    db.execute(stmt)
+    for (t, p, bucket), counters in buckets.items():
+        apply(db, t, p, bucket, counters)
+    db.commit()
+    return len(buckets)
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
-from datetime import datetime, UTC
-from typing import Callable, List, Set, Tuple, Dict
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, List, Set, Tuple, Dict
 
+from src.analysis import temporal
+from src.analysis.features import RuleFeatures
+from src.analysis.keyword_matcher import KeywordMatcher
 from src.schemas.enums import LogLevel
 
+if TYPE_CHECKING:
+    from src.ingest.parser import ParsedBatch
+
 
 # ======================================================
 # Ephemeral Log (Rule-only, NOT ORM)
@@ -18,11 +24,23 @@ class RuleLog:
     In-memory log representation for rule evaluation.
     - NOT persisted
     - NOT SQLAlchemy
+    - `count` > 1: stands for that many identical lines (agent aggregation)
     """
     source: str
     message: str
     level: LogLevel
     timestamp: datetime
+    count: int = 1
+
+
+def expand(logs: List[RuleLog]) -> List[RuleLog]:
+    """One entry per line — what the raw-list predicates count."""
+    if all(getattr(log, "count", 1) == 1 for log in logs):
+        return logs
+    out: List[RuleLog] = []
+    for log in logs:
+        out.extend([replace(log, count=1)] * log.count)
+    return out
 
 
 # ======================================================
@@ -50,6 +68,11 @@ class Rule:
     - Deterministic
     - Explainable
     - Baseline reasoning (no probabilistic guess)
+
+    `predicate` / `evidence_builder` take the raw log list. The optional
+    `compiled_*` variants read the shared `RuleFeatures` instead and are used
+    by `RuleEngine` in compiled mode; a rule without them falls back to the
+    raw-list callables.
     """
 
     def __init__(
@@ -61,12 +84,16 @@ class Rule:
             evidence_builder: Callable[[List[RuleLog]], str],
             causes: List[str],
             actions: List[str],
+            compiled_predicate: Callable[[RuleFeatures], bool] | None = None,
+            compiled_evidence: Callable[[RuleFeatures], str] | None = None,
     ):
         self.rule_id = rule_id
         self.title = title
         self.score = score
         self.predicate = predicate
         self.evidence_builder = evidence_builder
+        self.compiled_predicate = compiled_predicate
+        self.compiled_evidence = compiled_evidence
         self.causes = tuple(causes)
         self.actions = tuple(actions)
 
@@ -83,16 +110,50 @@ class Rule:
             actions=self.actions,
         )
 
+    def evaluate_features(self, features: RuleFeatures) -> RuleMatch | None:
+        if self.compiled_predicate is None:
+            return self.evaluate(expand(list(features.logs)))
+
+        if not self.compiled_predicate(features):
+            return None
+
+        if self.compiled_evidence is not None:
+            evidence = self.compiled_evidence(features)
+        else:
+            evidence = self.evidence_builder(expand(list(features.logs)))
+
+        return RuleMatch(
+            rule_id=self.rule_id,
+            title=self.title,
+            score=self.score,
+            evidence=evidence,
+            causes=self.causes,
+            actions=self.actions,
+        )
+
 
 # ======================================================
 # Rule Engine
 # ======================================================
 
 class RuleEngine:
-    def __init__(self, rules: List[Rule]):
+    """
+    Evaluates a rule set against one batch.
+
+    compiled=True (default) scans the batch once into `RuleFeatures` and lets
+    every rule read from it. compiled=False keeps the original per-rule
+    evaluation over the raw list (reference path; identical output).
+    """
+
+    def __init__(self, rules: List[Rule], compiled: bool = True):
         self.rules = rules
+        self.compiled = compiled
 
     def run(self, logs: List[RuleLog]) -> List[RuleMatch]:
+        if self.compiled:
+            return self.run_features(RuleFeatures.build(logs, SIGNAL_MATCHER))
+
+        logs = expand(logs)
         matches: List[RuleMatch] = []
         for rule in self.rules:
             result = rule.evaluate(logs)
@@ -100,6 +161,14 @@ class RuleEngine:
                 matches.append(result)
         return matches
 
+    def run_features(self, features: RuleFeatures) -> List[RuleMatch]:
+        matches: List[RuleMatch] = []
+        for rule in self.rules:
+            result = rule.evaluate_features(features)
+            if result:
+                matches.append(result)
+        return matches
+
     # --------------------------------------------------
     # Ingestion Adapter (raw → RuleLog)
     # --------------------------------------------------
@@ -110,22 +179,48 @@ class RuleEngine:
         - Falls back to plain text with level inference
         - No DB persistence
         """
-        from src.ingest.parser import parse_log_lines
+        from src.ingest.parser import parse_batch
 
-        now = datetime.now(UTC)
-        parsed = parse_log_lines(raw_logs)
+        return self.run(self.to_rule_logs(parse_batch(raw_logs)))
 
-        logs = [
+    @classmethod
+    def to_rule_logs(cls, batch: "ParsedBatch") -> List[RuleLog]:
+        """ParsedBatch → RuleLog (parsed source / level / normalized timestamp)."""
+        if batch.counts is not None:
+            return cls._weighted_rule_logs(batch)
+        return [
             RuleLog(
                 source=p.source,
                 message=p.message,
-                level=self._to_log_level(p.level),
-                timestamp=now,
+                level=cls._to_log_level(p.level),
+                timestamp=ts,
             )
-            for p in parsed
+            for p, ts in zip(batch.logs, batch.timestamps)
         ]
 
-        return self.run(logs)
+    @classmethod
+    def _weighted_rule_logs(cls, batch: "ParsedBatch") -> List[RuleLog]:
+        """
+        Aggregated records: a record's count is spread evenly over up to
+        `_SPREAD_POINTS` instants between its first and last time (one per
+        `_SPREAD_STEP_SECONDS`), so a steady repetition does not look like a
+        burst at either end of its span.
+        """
+        out: List[RuleLog] = []
+        for p, n, first, last in zip(batch.logs, batch.counts, batch.timestamps, batch.last_timestamps):
+            span = (last - first).total_seconds()
+            points = max(1, min(n, _SPREAD_POINTS, int(span // _SPREAD_STEP_SECONDS) + 1))
+            level = cls._to_log_level(p.level)
+            for k in range(points):
+                at = first + (last - first) * (k / (points - 1)) if points > 1 else first
+                out.append(RuleLog(
+                    source=p.source,
+                    message=p.message,
+                    level=level,
+                    timestamp=at,
+                    count=n // points + (1 if k < n % points else 0),
+                ))
+        return out
 
     @staticmethod
     def _to_log_level(level_str: str) -> LogLevel:
@@ -140,6 +235,11 @@ class RuleEngine:
         return mapping.get(level_str.upper(), LogLevel.INFO)
 
 
+# Aggregated-record spreading (see RuleEngine._weighted_rule_logs)
+_SPREAD_STEP_SECONDS = 10.0
+_SPREAD_POINTS = 32
+
+
 # ======================================================
 # Regex Patterns (Signal Extractors)
 # ======================================================
@@ -160,6 +260,28 @@ _RESTART_RE = re.compile(r"\b(restart|reboot|killed|terminated)\b", re.IGNORECAS
 _SSL_RE = re.compile(r"\b(SSL|TLS|certificate|handshake)\b", re.IGNORECASE)
 _PERMISSION_RE = re.compile(r"\b(permission denied|EACCES|access denied)\b", re.IGNORECASE)
 
+# Signal name → extractor. Compiled mode scans all of them in one pass per
+# message through SIGNAL_MATCHER; the reference path still uses them one by one.
+SIGNAL_PATTERNS: Dict[str, re.Pattern] = {
+    "timeout": _TIMEOUT_RE,
+    "conn": _CONN_RE,
+    "dns": _DNS_RE,
+    "5xx": _5XX_RE,
+    "4xx": _4XX_RE,
+    "oom": _OOM_RE,
+    "db": _DB_RE,
+    "disk": _DISK_RE,
+    "cpu": _CPU_RE,
+    "auth": _AUTH_RE,
+    "rate_limit": _RATE_LIMIT_RE,
+    "crash": _CRASH_RE,
+    "restart": _RESTART_RE,
+    "ssl": _SSL_RE,
+    "permission": _PERMISSION_RE,
+}
+
+SIGNAL_MATCHER = KeywordMatcher(SIGNAL_PATTERNS)
+
 
 # ======================================================
 # Helper Functions
@@ -197,20 +319,9 @@ def _error_rate(logs: List[RuleLog]) -> float:
 
 def _burst_count(logs: List[RuleLog], window_seconds: float = 60.0) -> int:
     """지정 시간 윈도우 내 최대 로그 밀집도 (슬라이딩 윈도우)."""
-    if len(logs) < 2:
-        return len(logs)
-    sorted_logs = sorted(logs, key=lambda l: l.timestamp)
-    max_count = 1
-    for i, log in enumerate(sorted_logs):
-        count = 1
-        for j in range(i + 1, len(sorted_logs)):
-            delta = (sorted_logs[j].timestamp - log.timestamp).total_seconds()
-            if delta <= window_seconds:
-                count += 1
-            else:
-                break
-        max_count = max(max_count, count)
-    return max_count
+    return temporal.burst_count(
+        sorted(l.timestamp for l in logs), window_seconds
+    )
 
 
 def _error_burst_count(logs: List[RuleLog], window_seconds: float = 60.0) -> int:
@@ -232,33 +343,19 @@ def _has_sequence(
 ) -> bool:
     """first_re 매칭 로그 이후 max_gap_seconds 이내에 then_re 매칭 로그가 있는지."""
     sorted_logs = sorted(logs, key=lambda l: l.timestamp)
-    for i, log_a in enumerate(sorted_logs):
-        if not first_re.search(log_a.message or ""):
-            continue
-        for j in range(i + 1, len(sorted_logs)):
-            delta = (sorted_logs[j].timestamp - log_a.timestamp).total_seconds()
-            if delta > max_gap_seconds:
-                break
-            if then_re.search(sorted_logs[j].message or ""):
-                return True
-    return False
+    return temporal.has_sequence(
+        [l.timestamp for l in sorted_logs],
+        [bool(first_re.search(l.message or "")) for l in sorted_logs],
+        [bool(then_re.search(l.message or "")) for l in sorted_logs],
+        max_gap_seconds,
+    )
 
 
 def _log_spike_ratio(logs: List[RuleLog], window_seconds: float = 60.0) -> float:
     """최근 윈도우 대비 전체 평균 로그 발생 비율. 1.0 = 균등, >1 = 급증."""
-    if len(logs) < 3:
-        return 1.0
-    sorted_logs = sorted(logs, key=lambda l: l.timestamp)
-    total_span = (sorted_logs[-1].timestamp - sorted_logs[0].timestamp).total_seconds()
-    if total_span <= 0:
-        return 1.0
-    avg_rate = len(logs) / total_span
-    # 마지막 window_seconds 내 로그 수
-    cutoff = sorted_logs[-1].timestamp
-    recent = [l for l in sorted_logs
-              if (cutoff - l.timestamp).total_seconds() <= window_seconds]
-    recent_rate = len(recent) / window_seconds if window_seconds > 0 else 0
-    return recent_rate / avg_rate if avg_rate > 0 else 1.0
+    return temporal.spike_ratio(
+        sorted(l.timestamp for l in logs), window_seconds
+    )
 
 
 # ======================================================
@@ -275,6 +372,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "로그 메시지에 timeout / timed out / ETIMEDOUT 키워드가 포함됨"
             ),
+            compiled_predicate=lambda f: f.hit("timeout"),
             causes=[
                 "Upstream(서버/DB/API) 응답 지연",
                 "네트워크 지연 또는 패킷 손실",
@@ -295,6 +393,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "connection refused 또는 reset by peer 관련 키워드가 로그에 포함됨"
             ),
+            compiled_predicate=lambda f: f.hit("conn"),
             causes=[
                 "대상 포트에서 서비스가 리스닝되지 않음",
                 "방화벽 또는 보안그룹에 의해 연결 차단",
@@ -315,6 +414,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "DNS / name resolution 관련 에러 키워드가 로그에 포함됨"
             ),
+            compiled_predicate=lambda f: f.hit("dns"),
             causes=[
                 "DNS 레코드 미등록 또는 오타",
                 "DNS 리졸버 또는 네임서버 장애",
@@ -335,6 +435,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "로그 메시지에 5xx(502/503/504) 상태 코드 패턴이 포함됨"
             ),
+            compiled_predicate=lambda f: f.hit("5xx"),
             causes=[
                 "Upstream 애플리케이션 내부 오류",
                 "프록시 또는 게이트웨이 오류",
@@ -355,6 +456,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "level=ERROR 로 기록된 로그가 하나 이상 존재함"
             ),
+            compiled_predicate=lambda f: f.level(LogLevel.ERROR) > 0,
             causes=[
                 "애플리케이션 또는 시스템 오류 발생",
             ],
@@ -372,6 +474,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "동일 source에서 로그가 5회 이상 반복 발생함"
             ),
+            compiled_predicate=lambda f: any(v >= 5 for v in f.source_counts.values()),
             causes=[
                 "특정 컴포넌트 반복 오류",
                 "재시도 로직 또는 무한 루프 가능성",
@@ -390,6 +493,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "로그에 OOM / OutOfMemoryError / MemoryError 키워드가 포함됨"
             ),
+            compiled_predicate=lambda f: f.hit("oom"),
             causes=[
                 "메모리 누수(Memory Leak)",
                 "할당된 메모리 부족",
@@ -413,6 +517,10 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "로그에 데이터베이스/SQL/쿼리 관련 키워드와 에러가 함께 포함됨"
             ),
+            compiled_predicate=lambda f: (
+                    f.hit("db") and
+                    (f.level(LogLevel.ERROR) > 0 or f.level(LogLevel.WARN) > 0)
+            ),
             causes=[
                 "DB 커넥션 풀 고갈",
                 "느린 쿼리로 인한 타임아웃",
@@ -435,6 +543,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "로그에 disk full / no space left / ENOSPC 키워드가 포함됨"
             ),
+            compiled_predicate=lambda f: f.hit("disk"),
             causes=[
                 "로그 파일 과다 적재",
                 "임시 파일 정리 미흡",
@@ -455,6 +564,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "로그에 CPU / high load / throttle 관련 키워드가 포함됨"
             ),
+            compiled_predicate=lambda f: f.hit("cpu"),
             causes=[
                 "트래픽 급증",
                 "비효율적인 알고리즘 또는 무한 루프",
@@ -475,6 +585,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "로그에 인증/인가 관련 키워드와 4xx 에러가 함께 포함됨"
             ),
+            compiled_predicate=lambda f: f.hit("auth") and f.hit("4xx"),
             causes=[
                 "만료된 토큰 또는 자격증명",
                 "권한 설정 오류",
@@ -495,6 +606,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "로그에 rate limit / too many requests / throttle 키워드가 포함됨"
             ),
+            compiled_predicate=lambda f: f.hit("rate_limit"),
             causes=[
                 "API 호출 빈도 초과",
                 "요청 쿼터 한도 도달",
@@ -515,6 +627,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "로그에 crash / panic / segfault / fatal 키워드가 포함됨"
             ),
+            compiled_predicate=lambda f: f.hit("crash"),
             causes=[
                 "핸들링되지 않은 예외",
                 "메모리 접근 오류",
@@ -535,6 +648,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "로그에 restart / reboot / killed / terminated 키워드가 포함됨"
             ),
+            compiled_predicate=lambda f: f.hit("restart"),
             causes=[
                 "헬스체크 실패로 인한 자동 재시작",
                 "리소스 부족으로 인한 강제 종료",
@@ -558,6 +672,10 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "로그에 SSL/TLS/certificate 관련 키워드와 에러가 함께 포함됨"
             ),
+            compiled_predicate=lambda f: (
+                    f.hit("ssl") and
+                    (f.level(LogLevel.ERROR) > 0 or f.level(LogLevel.WARN) > 0)
+            ),
             causes=[
                 "인증서 만료",
                 "인증서 체인 불일치",
@@ -578,6 +696,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "로그에 permission denied / EACCES / access denied 키워드가 포함됨"
             ),
+            compiled_predicate=lambda f: f.hit("permission"),
             causes=[
                 "파일 또는 디렉토리 권한 부족",
                 "실행 권한 미설정",
@@ -598,6 +717,10 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 f"로그에 4xx 상태 코드가 {_count_matching_logs(_4XX_RE, logs)}회 이상 반복됨"
             ),
+            compiled_predicate=lambda f: f.count("4xx") >= 3,
+            compiled_evidence=lambda f: (
+                f"로그에 4xx 상태 코드가 {f.count('4xx')}회 이상 반복됨"
+            ),
             causes=[
                 "잘못된 요청 파라미터",
                 "존재하지 않는 리소스 접근",
@@ -618,6 +741,10 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 f"level=WARN 로그가 {sum(1 for log in logs if log.level == LogLevel.WARN)}건 발생함"
             ),
+            compiled_predicate=lambda f: f.level(LogLevel.WARN) >= 3,
+            compiled_evidence=lambda f: (
+                f"level=WARN 로그가 {f.level(LogLevel.WARN)}건 발생함"
+            ),
             causes=[
                 "잠재적 문제 상황 발생",
                 "설정 또는 리소스 관련 경고",
@@ -641,6 +768,10 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 f"1분 내 ERROR 로그가 {_error_burst_count(logs, 60.0)}건 집중 발생함"
             ),
+            compiled_predicate=lambda f: f.error_burst_count(60.0) >= 5,
+            compiled_evidence=lambda f: (
+                f"1분 내 ERROR 로그가 {f.error_burst_count(60.0)}건 집중 발생함"
+            ),
             causes=[
                 "서비스 장애로 인한 연쇄 에러 발생",
                 "트래픽 급증으로 인한 동시 실패",
@@ -661,6 +792,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "타임아웃 발생 후 5분 이내 크래시/패닉이 연쇄 발생함"
             ),
+            compiled_predicate=lambda f: f.has_sequence("timeout", "crash", 300.0),
             causes=[
                 "타임아웃 누적으로 리소스 고갈 후 프로세스 크래시",
                 "타임아웃 핸들링 실패로 인한 비정상 종료",
@@ -682,6 +814,11 @@ def default_rules() -> List[Rule]:
                 f"전체 로그 대비 에러율이 {_error_rate(logs):.0%}로 매우 높음 "
                 f"({sum(1 for l in logs if l.level == LogLevel.ERROR)}/{len(logs)})"
             ),
+            compiled_predicate=lambda f: f.total >= 5 and f.error_rate() >= 0.5,
+            compiled_evidence=lambda f: (
+                f"전체 로그 대비 에러율이 {f.error_rate():.0%}로 매우 높음 "
+                f"({f.level(LogLevel.ERROR)}/{f.total})"
+            ),
             causes=[
                 "서비스 전반의 장애 상태",
                 "배포 직후 전면적 오류 발생",
@@ -703,6 +840,11 @@ def default_rules() -> List[Rule]:
                 f"{len(_distinct_error_sources(logs))}개 source에서 동시에 에러 발생: "
                 f"{', '.join(sorted(_distinct_error_sources(logs)))}"
             ),
+            compiled_predicate=lambda f: len(f.error_sources) >= 3,
+            compiled_evidence=lambda f: (
+                f"{len(f.error_sources)}개 source에서 동시에 에러 발생: "
+                f"{', '.join(sorted(f.error_sources))}"
+            ),
             causes=[
                 "공통 의존 서비스(DB/캐시/네트워크) 장애",
                 "인프라 레벨 문제 (DNS/로드밸런서 등)",
@@ -723,6 +865,10 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 f"최근 1분의 로그 발생률이 평균 대비 {_log_spike_ratio(logs, 60.0):.1f}배 급증함"
             ),
+            compiled_predicate=lambda f: f.total >= 10 and f.spike_ratio(60.0) >= 3.0,
+            compiled_evidence=lambda f: (
+                f"최근 1분의 로그 발생률이 평균 대비 {f.spike_ratio(60.0):.1f}배 급증함"
+            ),
             causes=[
                 "트래픽 급증 또는 DDoS 공격",
                 "반복 재시도로 인한 로그 폭발",
@@ -743,6 +889,7 @@ def default_rules() -> List[Rule]:
             evidence_builder=lambda logs: (
                 "연결 실패 후 5분 이내 서비스 재시작이 연쇄 발생함"
             ),
+            compiled_predicate=lambda f: f.has_sequence("conn", "restart", 300.0),
             causes=[
                 "헬스체크 실패로 인한 자동 재시작 반복",
                 "의존 서비스 다운 → 연결 실패 → 컨테이너 재시작 루프",
@@ -0,0 +1,168 @@
+"""
+Temporal features — burst / sequence / spike detectors over one sorted batch.
+
+The original helpers each re-sorted the batch, and the burst / sequence
+scans were nested loops: O(n²) on exactly the batches we care about most
+(a 10k-line error storm inside one minute). `Timeline` sorts once and answers
+every window query in linear time:
+
+  burst_count   two pointers — the window end only ever moves forward
+  has_sequence  "next `then` index" table built right-to-left, so each
+                `first` hit is checked against its nearest follower only
+  spike_ratio   walk back from the newest entry until it leaves the window
+
+Deltas are compared exactly like the original helpers
+(`timedelta.total_seconds()` against the window), so results are identical.
+Window sizes are plain parameters and results are memoized per window.
+
+Entries may carry weights (agent-aggregated records stand for many lines):
+burst and spike then sum weights instead of counting entries.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable, Dict, FrozenSet, Generic, List, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class Timeline(Generic[T]):
+    """
+    Items sorted (stably) by timestamp, each optionally carrying a frozenset
+    of tags (`tags[i]` belongs to `items[i]`). Tags are whatever the caller
+    classifies entries by — signal names in the rule engine ("timeout",
+    "crash", ...) — and `has_sequence` is asked in terms of them.
+    `weights[i]` (optional) is how many occurrences `items[i]` stands for.
+    """
+
+    def __init__(
+        self,
+        items: Sequence[T],
+        timestamp: Callable[[T], datetime],
+        tags: Sequence[FrozenSet[str]] | None = None,
+        weights: Sequence[int] | None = None,
+    ):
+        order = sorted(range(len(items)), key=lambda i: timestamp(items[i]))
+        self.timestamps: List[datetime] = [timestamp(items[i]) for i in order]
+        self.tags: List[FrozenSet[str]] = (
+            [tags[i] for i in order] if tags is not None else [frozenset()] * len(order)
+        )
+        self.weights: List[int] | None = [weights[i] for i in order] if weights is not None else None
+        self._memo: Dict[Tuple, object] = {}
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def burst_count(self, window_seconds: float = 60.0) -> int:
+        key = ("burst", window_seconds)
+        if key not in self._memo:
+            self._memo[key] = burst_count(self.timestamps, window_seconds, self.weights)
+        return self._memo[key]
+
+    def has_sequence(self, first: str, then: str, max_gap_seconds: float = 300.0) -> bool:
+        key = ("sequence", first, then, max_gap_seconds)
+        if key not in self._memo:
+            self._memo[key] = has_sequence(
+                self.timestamps,
+                [first in tags for tags in self.tags],
+                [then in tags for tags in self.tags],
+                max_gap_seconds,
+            )
+        return self._memo[key]
+
+    def spike_ratio(self, window_seconds: float = 60.0) -> float:
+        key = ("spike", window_seconds)
+        if key not in self._memo:
+            self._memo[key] = spike_ratio(self.timestamps, window_seconds, self.weights)
+        return self._memo[key]
+
+
+# ======================================================
+# Window algorithms (input sorted ascending)
+# ======================================================
+
+def burst_count(
+    timestamps: Sequence[datetime],
+    window_seconds: float = 60.0,
+    weights: Sequence[int] | None = None,
+) -> int:
+    """지정 시간 윈도우 내 최대 로그 밀집도 — max entries (or weight) in [t, t + window]."""
+    if weights is not None:
+        return _weighted_burst_count(timestamps, window_seconds, weights)
+    n = len(timestamps)
+    if n < 2:
+        return n
+
+    max_count = 1
+    end = 0
+    for start in range(n):
+        if end <= start:
+            end = start + 1
+        while end < n and (timestamps[end] - timestamps[start]).total_seconds() <= window_seconds:
+            end += 1
+        max_count = max(max_count, end - start)
+    return max_count
+
+
+def _weighted_burst_count(
+    timestamps: Sequence[datetime],
+    window_seconds: float,
+    weights: Sequence[int],
+) -> int:
+    n = len(timestamps)
+    if n < 2:
+        return sum(weights)
+
+    best = 0
+    end = 0
+    in_window = 0   # weight of entries start..end-1
+    for start in range(n):
+        if end <= start:
+            end, in_window = start + 1, weights[start]
+        while end < n and (timestamps[end] - timestamps[start]).total_seconds() <= window_seconds:
+            in_window += weights[end]
+            end += 1
+        best = max(best, in_window)
+        in_window -= weights[start]
+    return best
+
+
+def has_sequence(
+    timestamps: Sequence[datetime],
+    is_first: Sequence[bool],
+    is_then: Sequence[bool],
+    max_gap_seconds: float = 300.0,
+) -> bool:
+    """A `first` entry followed (later in order) by a `then` entry within max_gap."""
+    next_then = None
+    for i in range(len(timestamps) - 1, -1, -1):
+        if is_first[i] and next_then is not None:
+            if (timestamps[next_then] - timestamps[i]).total_seconds() <= max_gap_seconds:
+                return True
+        if is_then[i]:
+            next_then = i
+    return False
+
+
+def spike_ratio(
+    timestamps: Sequence[datetime],
+    window_seconds: float = 60.0,
+    weights: Sequence[int] | None = None,
+) -> float:
+    """최근 윈도우 대비 전체 평균 로그 발생 비율. 1.0 = 균등, >1 = 급증."""
+    n = len(timestamps) if weights is None else sum(weights)
+    if n < 3:
+        return 1.0
+    total_span = (timestamps[-1] - timestamps[0]).total_seconds()
+    if total_span <= 0:
+        return 1.0
+    avg_rate = n / total_span
+
+    cutoff = timestamps[-1]
+    recent = 0
+    for i in range(len(timestamps) - 1, -1, -1):
+        if (cutoff - timestamps[i]).total_seconds() > window_seconds:
+            break
+        recent += 1 if weights is None else weights[i]
+    recent_rate = recent / window_seconds if window_seconds > 0 else 0
+    return recent_rate / avg_rate if avg_rate > 0 else 1.0
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 import uuid
 
 from src.model.analysis_result import AnalysisResult
+from src.db.session import release_connection
 from src.model.weekly_report import WeeklyReport
 from src.analysis.gpt_weekly import (
     gpt_explain_weekly,
@@ -94,7 +95,10 @@ def generate_and_save_weekly_report(
     for r in results:
         if r.signals:
             signals.extend(r.signals)
+    report_count = len(results)
 
+    # GPT 호출 동안 커넥션을 붙잡지 않는다
+    release_connection(db)
     weekly_summary = gpt_explain_weekly(
         rule_summary=rule_summary,
         signals=signals,
@@ -111,7 +115,7 @@ def generate_and_save_weekly_report(
         project_id=project_id,
         period_start=since.date(),
         period_end=now.date(),
-        report_count=len(results),
+        report_count=report_count,
         summary=weekly_summary,
         risk_level=risk["level"],
         risk_reason=risk["reason"],
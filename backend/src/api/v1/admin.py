@@ -0,0 +1,43 @@
+"""
+Operator endpoints — not tenant-scoped, guarded by ADMIN_API_KEY.
+
+GET /admin/drain-trees — per-tenant Drain tree memory (per ingest process)
+"""
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from src.core.config import settings
+from src.ingest.workers import worker_pool
+from src.learning.catalog import drain_tree_report
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def _check_admin_key(x_admin_key: str | None) -> None:
+    # Disabled entirely unless ADMIN_API_KEY is configured.
+    if not settings.ADMIN_API_KEY or x_admin_key != settings.ADMIN_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="invalid or missing X-Admin-Key",
+        )
+
+
+@router.get("/drain-trees")
+async def drain_trees(
+    x_admin_key: str | None = Header(default=None, alias="X-Admin-Key"),
+):
+    """
+    Resident Drain trees: clusters, estimated bytes and idle time per tenant.
+    With INGEST_PROCESSES > 0 the trees live in the workers — one entry per shard.
+    """
+    _check_admin_key(x_admin_key)
+    if worker_pool.enabled:
+        reports = await run_in_threadpool(worker_pool.broadcast, drain_tree_report)
+    else:
+        reports = [drain_tree_report()]
+    processes = [{"shard": i, **r} for i, r in enumerate(reports)]
+    return {
+        "trees": sum(p["trees"] for p in processes),
+        "bytes": sum(p["bytes"] for p in processes),
+        "processes": processes,
+    }
@@ -4,7 +4,7 @@ from datetime import datetime, UTC
 import uuid
 
 from src.api.v1.dep import get_current_context
-from src.db.session import get_db
+from src.db.session import get_db, release_connection
 from src.model.log import Log
 from src.model.analysis_result import AnalysisResult
 from src.schemas.analysis import (
@@ -14,6 +14,7 @@ from src.schemas.analysis import (
     NoteCreateDTO,
 )
 from src.analysis.engine import AnalysisEngine
+from src.analysis.rollups import record_analysis
 from src.analysis.weekly_service import (
     should_generate_weekly_report,
     generate_and_save_weekly_report,
@@ -60,7 +61,8 @@ def analyze_logs(
             detail="Some log_ids are invalid or not accessible",
         )
 
-    # 2️⃣ 분석 실행
+    # 2️⃣ 분석 실행 — GPT 전략은 수 초가 걸리므로 커넥션을 반납한 뒤 호출
+    release_connection(db, *logs)
     result = engine.analyze(logs, dto.strategy)
 
     # 2.5️⃣ 패턴 매칭 (L2 — learned patterns)
@@ -110,6 +112,7 @@ def analyze_logs(
     )
 
     db.add(analysis)
+    record_analysis(db, tenant_id, project_id, analysis.severity, analysis.confidence, at=analysis.received_at)
     db.commit()
     db.refresh(analysis)
 
@@ -4,8 +4,11 @@ GET /events/stream  (cookie-authenticated)
   Opens a long-lived text/event-stream. The browser's EventSource receives
   per-tenant events (new analyses from ingest, etc.) the moment they happen,
   replacing client-side polling with server push.
+
+Each event carries an `id:` line. EventSource sends the last one back as
+`Last-Event-ID` when it reconnects, and events published in between are
+replayed (while the broker still buffers them).
 """
-import asyncio
 import json
 
 from fastapi import APIRouter, Depends, Request
@@ -16,8 +19,13 @@ from src.realtime.broker import broker
 
 router = APIRouter(prefix="/events", tags=["events"])
 
-# How often the generator checks the broker for this tenant's new events.
-_POLL_INTERVAL = 1.5
+# The broker wakes the generator as soon as an event arrives; this is only
+# how long an idle connection waits before sending a heartbeat comment.
+_HEARTBEAT_INTERVAL = 15.0
+
+
+def format_event(eid: str, evt: dict) -> str:
+    return f"id: {eid}\ndata: {json.dumps(evt, ensure_ascii=False)}\n\n"
 
 
 @router.get("/stream")
@@ -26,10 +34,12 @@ async def stream(
     ctx: dict = Depends(get_current_context),
 ):
     tenant_id = ctx["tenant_id"]
+    last_event_id = request.headers.get("last-event-id")
 
     async def event_gen():
-        # Only stream events that arrive AFTER connect (live, not historical).
-        last_id = broker.latest_id()
+        # Fresh connections stream only events that arrive AFTER connect
+        # (live, not historical); reconnects resume from Last-Event-ID.
+        cursor = await broker.resume_cursor(tenant_id, last_event_id)
         # Tell EventSource how long to wait before reconnecting.
         yield "retry: 3000\n\n"
         yield 'event: ready\ndata: {"ok":true}\n\n'
@@ -38,13 +48,14 @@ async def stream(
             if await request.is_disconnected():
                 break
 
-            for eid, evt in broker.since(last_id, tenant_id):
-                last_id = eid
-                yield f"data: {json.dumps(evt, ensure_ascii=False)}\n\n"
+            events = await broker.wait(tenant_id, cursor, _HEARTBEAT_INTERVAL)
+            for eid, evt in events:
+                cursor = eid
+                yield format_event(eid, evt)
 
-            # heartbeat comment keeps proxies from closing the idle connection
-            yield ": ping\n\n"
-            await asyncio.sleep(_POLL_INTERVAL)
+            if not events:
+                # heartbeat comment keeps proxies from closing the idle connection
+                yield ": ping\n\n"
 
     return StreamingResponse(
         event_gen(),
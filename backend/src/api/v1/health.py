@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from src.db.session import get_db
+from src.db.session import get_db, pool_status
 
 router = APIRouter(tags=["health"])
 
@@ -19,4 +19,5 @@ def health_check(db: Session = Depends(get_db)):
     return {
         "status": "ok" if db_status == "ok" else "degraded",
         "db": db_status,
+        "pool": pool_status(),
     }
@@ -1,12 +1,69 @@
-from fastapi import APIRouter, Header, Depends, HTTPException, status
+import zlib
+
+from fastapi import APIRouter, Header, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
 from sqlalchemy.orm import Session
 
 from src.schemas.ingest import IngestPayload
 from src.ingest.service import ingest_logs
+from src.ingest.queue import QueueFull, ingest_queue
+from src.ingest.stream import StreamDecodeError, iter_line_chunks
 from src.db.session import get_db
 from src.core.config import settings
 
-router = APIRouter(prefix="/ingest", tags=["ingest"])
+# Inflated size cap for gzip bodies of POST /ingest (zip bomb guard)
+_MAX_INFLATED_BYTES = 64 * 1024 * 1024
+
+
+class _GzipRequest(Request):
+    """`Content-Encoding: gzip` JSON bodies (the agent compresses its batches)."""
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_inflated"):
+            body = await super().body()
+            if self.headers.get("content-encoding", "").strip().lower() == "gzip":
+                body = _gunzip(body)
+            self._inflated = body
+        return self._inflated
+
+
+class _GzipRoute(APIRoute):
+    # Only body() is wrapped — /ingest/stream inflates request.stream() itself.
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def route(request: Request):
+            return await handler(_GzipRequest(request.scope, request.receive))
+
+        return route
+
+
+def _gunzip(body: bytes) -> bytes:
+    inflater = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    try:
+        out = inflater.decompress(body, _MAX_INFLATED_BYTES)
+    except zlib.error as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"invalid gzip body: {e}")
+    if inflater.unconsumed_tail:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"gzip body inflates beyond {_MAX_INFLATED_BYTES} bytes",
+        )
+    return out
+
+
+router = APIRouter(prefix="/ingest", tags=["ingest"], route_class=_GzipRoute)
+
+
+def _check_api_key(x_api_key: str | None) -> None:
+    # Optional shared-secret auth for agents (enabled only when INGEST_API_KEY set).
+    if settings.INGEST_API_KEY and x_api_key != settings.INGEST_API_KEY:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="invalid or missing X-API-Key",
+        )
 
 
 @router.post("")
@@ -18,11 +75,28 @@ def ingest(
     x_api_key: str | None = Header(default=None, alias="X-API-Key"),
     db: Session = Depends(get_db),
 ):
-    # Optional shared-secret auth for agents (enabled only when INGEST_API_KEY set).
-    if settings.INGEST_API_KEY and x_api_key != settings.INGEST_API_KEY:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="invalid or missing X-API-Key",
+    _check_api_key(x_api_key)
+    # Agent `--aggregate` batches: {"records": [{template, sample, count, first_ts, last_ts}]}
+    records = [r.model_dump() for r in payload.records] or None
+
+    if settings.INGEST_ASYNC:
+        try:
+            batch_id = ingest_queue.submit(
+                tenant_id=x_tenant_id,
+                project_id=x_project_id,
+                agent_id=x_agent_id,
+                raw_logs=payload.logs,
+                records=records,
+            )
+        except QueueFull as e:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=str(e),
+                headers={"Retry-After": "1"},
+            )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"status": "accepted", "batch_id": batch_id},
         )
 
     ingest_logs(
@@ -31,5 +105,78 @@ def ingest(
         project_id=x_project_id,
         agent_id=x_agent_id,
         raw_logs=payload.logs,
+        records=records,
     )
     return {"status": "ok"}
+
+
+@router.post("/stream")
+async def ingest_stream(
+    request: Request,
+    x_tenant_id: str = Header(..., alias="X-Tenant-ID"),
+    x_project_id: str = Header(..., alias="X-Project-ID"),
+    x_agent_id: str | None = Header(default=None, alias="X-Agent-ID"),
+    x_api_key: str | None = Header(default=None, alias="X-API-Key"),
+    content_encoding: str | None = Header(default=None, alias="Content-Encoding"),
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk backfill: newline-delimited raw lines or NDJSON, optionally gzip.
+    The body is read incrementally and every INGEST_STREAM_CHUNK_LINES lines
+    go through the regular pipeline, so memory stays bounded.
+    """
+    _check_api_key(x_api_key)
+
+    encoding = (content_encoding or "").strip().lower()
+    if encoding not in ("", "identity", "gzip"):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"unsupported Content-Encoding: {content_encoding}",
+        )
+
+    chunks: list[dict] = []
+    try:
+        async for lines in iter_line_chunks(
+            request.stream(),
+            gzip=encoding == "gzip",
+            chunk_lines=settings.INGEST_STREAM_CHUNK_LINES,
+        ):
+            result = await run_in_threadpool(
+                ingest_logs,
+                db=db,
+                tenant_id=x_tenant_id,
+                project_id=x_project_id,
+                agent_id=x_agent_id,
+                raw_logs=lines,
+            )
+            chunks.append({"chunk": len(chunks), **result})
+    except StreamDecodeError as e:
+        # Chunks already processed stay processed — report them with the error.
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={"status": "error", "detail": str(e), **_stream_totals(chunks)},
+        )
+
+    return {"status": "ok", **_stream_totals(chunks)}
+
+
+def _stream_totals(chunks: list[dict]) -> dict:
+    formats: dict[str, int] = {}
+    for c in chunks:
+        for fmt, n in c["formats"].items():
+            formats[fmt] = formats.get(fmt, 0) + n
+    return {
+        "lines": sum(c["lines"] for c in chunks),
+        "formats": formats,
+        "analyses_created": sum(1 for c in chunks if c["analysis_id"]),
+        "chunks": chunks,
+    }
+
+
+@router.get("/queue")
+def ingest_queue_stats(
+    x_api_key: str | None = Header(default=None, alias="X-API-Key"),
+):
+    """Queue depth / lag metrics for the accept-and-enqueue mode."""
+    _check_api_key(x_api_key)
+    return {"async": settings.INGEST_ASYNC, **ingest_queue.stats()}
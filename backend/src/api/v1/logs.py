@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
+from src.analysis.rollups import record_logs
 from src.api.v1.dep import get_current_context
+from src.api.v1.pagination import keyset_page, set_next_cursor
 from src.db.session import get_db
 from src.domain.log import LogDomainService
 from src.model.log import Log
@@ -55,19 +57,19 @@ def create_log(
 @router.get("", response_model=list[LogResponseDTO])
 def list_logs(
     project_id: str,
+    response: Response,
     ctx: dict = Depends(get_current_context),
     db: Session = Depends(get_db),
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: str | None = Query(None, description="이전 페이지의 X-Next-Cursor"),
 ):
-    logs = (
-        db.query(Log)
-        .filter(
-            Log.tenant_id == ctx["tenant_id"],
-            Log.project_id == project_id,
-        )
-        .order_by(Log.timestamp.desc())
-        .limit(200)
-        .all()
+    # (timestamp, id) keyset — ix_logs_tenant_project_timestamp 범위 스캔, 깊은 페이지도 같은 비용
+    q = db.query(Log).filter(
+        Log.tenant_id == ctx["tenant_id"],
+        Log.project_id == project_id,
     )
+    logs, next_cursor = keyset_page(q, [Log.timestamp, Log.id], cursor=cursor, limit=limit)
+    set_next_cursor(response, next_cursor)
 
     return [
         LogResponseDTO(
@@ -113,4 +115,5 @@ def delete_log(
         )
 
     db.delete(log)
+    record_logs(db, log.tenant_id, log.project_id, [log.level], at=log.received_at, sign=-1)
     db.commit()
@@ -0,0 +1,67 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is "the next `limit` rows after the last one you saw" in a fixed
+descending order that ends with the primary key, e.g. `(received_at, id)`.
+The cursor is that last row's sort key, opaque to clients (urlsafe base64
+JSON). Each page is one index range scan of `limit + 1` rows, however deep —
+`OFFSET n` re-reads and discards n rows per page.
+
+Lists that return a bare JSON array (logs, reports) send the next cursor in
+the `X-Next-Cursor` response header; it is absent on the last page.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    """Sort-key values for `columns`; 400 on anything we did not issue."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("wrong arity")
+        return [
+            datetime.fromisoformat(v) if col.type.python_type is datetime else col.type.python_type(v)
+            for col, v in zip(columns, values)
+        ]
+    except (binascii.Error, ValueError, TypeError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def keyset_page(q: Query, columns: list, *, cursor: str | None, limit: int) -> tuple[list, str | None]:
+    """
+    Rows of `q` ordered by `columns` (all descending) after `cursor`, and
+    the cursor of the following page (None when this is the last one).
+    `columns` must end with a unique column.
+    """
+    if cursor:
+        q = q.filter(tuple_(*columns) < tuple_(*decode_cursor(cursor, columns)))
+    rows = q.order_by(*(c.desc() for c in columns)).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], c.key) for c in columns])
+
+
+def set_next_cursor(response: Response, next_cursor: str | None) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -1,7 +1,7 @@
 """
 Pattern catalog API — L1 pattern management.
 
-GET    /patterns              — list patterns for tenant (filterable by status)
+GET    /patterns              — list patterns for tenant (filterable by status, keyset cursor)
 GET    /patterns/{id}         — single pattern detail
 PATCH  /patterns/{id}/label   — label a candidate pattern
 PATCH  /patterns/{id}/dismiss — dismiss a pattern
@@ -11,8 +11,11 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from src.api.v1.dep import get_current_context
+from src.api.v1.pagination import keyset_page
+from src.db.async_session import ReadSession, get_read_db
 from src.db.session import get_db
 from src.model.pattern import Pattern, PatternFeedback
+from src.learning.matcher import pattern_index
 from src.learning.promotion import check_and_promote, check_demotion
 from src.learning.weight_learner import apply_feedback_adjustment
 
@@ -41,30 +44,52 @@ class FeedbackRequest(BaseModel):
 # 1️⃣ 패턴 목록
 # ======================================================
 @router.get("")
-def list_patterns(
+async def list_patterns(
     ctx: dict = Depends(get_current_context),
-    db: Session = Depends(get_db),
+    rdb: ReadSession = Depends(get_read_db),
     pattern_status: str | None = Query(default=None, alias="status"),
     limit: int = Query(default=50, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: str | None = Query(default=None),
 ):
-    tenant_id = ctx["tenant_id"]
+    return await rdb.run(_list_patterns, ctx["tenant_id"], pattern_status, limit, offset, cursor)
+
+
+def _list_patterns(
+    db: Session,
+    tenant_id: str,
+    pattern_status: str | None,
+    limit: int,
+    offset: int,
+    cursor: str | None,
+) -> dict:
     q = db.query(Pattern).filter(Pattern.tenant_id == tenant_id)
 
     if pattern_status:
         q = q.filter(Pattern.status == pattern_status)
 
-    total = q.count()
-    patterns = (
-        q.order_by(Pattern.total_count.desc(), Pattern.last_seen.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+    if offset and not cursor:
+        # Legacy offset paging (O(offset) per page) — kept for existing clients.
+        patterns = (
+            q.order_by(Pattern.total_count.desc(), Pattern.last_seen.desc(), Pattern.id.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        return {
+            "total": q.count(),
+            "items": [_to_dto(p) for p in patterns],
+            "next_cursor": None,
+        }
+
+    patterns, next_cursor = keyset_page(
+        q, [Pattern.total_count, Pattern.last_seen, Pattern.id], cursor=cursor, limit=limit,
     )
-
     return {
-        "total": total,
+        # Counted on the first page only; following pages are pure keyset scans.
+        "total": None if cursor else q.count(),
         "items": [_to_dto(p) for p in patterns],
+        "next_cursor": next_cursor,
     }
 
 
@@ -72,13 +97,16 @@ def list_patterns(
 # 2️⃣ 패턴 상세
 # ======================================================
 @router.get("/{pattern_id}")
-def get_pattern(
+async def get_pattern(
     pattern_id: str,
     ctx: dict = Depends(get_current_context),
-    db: Session = Depends(get_db),
+    rdb: ReadSession = Depends(get_read_db),
 ):
-    pattern = _get_or_404(db, ctx["tenant_id"], pattern_id)
-    return _to_dto(pattern)
+    return await rdb.run(_get_pattern, ctx["tenant_id"], pattern_id)
+
+
+def _get_pattern(db: Session, tenant_id: str, pattern_id: str) -> dict:
+    return _to_dto(_get_or_404(db, tenant_id, pattern_id))
 
 
 # ======================================================
@@ -107,6 +135,7 @@ def label_pattern(
     pattern.status = "labeled"
 
     db.commit()
+    pattern_index.update(pattern)
     return _to_dto(pattern)
 
 
@@ -122,6 +151,7 @@ def dismiss_pattern(
     pattern = _get_or_404(db, ctx["tenant_id"], pattern_id)
     pattern.status = "dismissed"
     db.commit()
+    pattern_index.update(pattern)
     return _to_dto(pattern)
 
 
@@ -173,6 +203,8 @@ def submit_feedback(
     # L3: Check auto-promotion / demotion
     check_and_promote(db, pattern)
     check_demotion(db, pattern)
+    # Score / status changed — keep this process's matcher index current.
+    pattern_index.update(pattern)
 
     return _to_dto(pattern)
 
@@ -1,16 +1,18 @@
-from datetime import datetime, timedelta, UTC
-
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from src.analysis.rollups import LEVEL_COLUMNS, window_totals
 from src.api.v1.dep import get_current_context
+from src.db.async_session import ReadSession, get_read_db
 from src.db.session import get_db
 from src.domain.project import ProjectDomainService
-from src.model.log import Log
+from src.ingest.profiles import ProfileSpec, parser_profiles, spec_from_row
+from src.model.parser_profile import ParserProfile
 from src.model.analysis_result import AnalysisResult
 from src.repositories.project_repository import ProjectRepository
 from src.schemas.project import (
+    ParserProfileRequest,
+    ParserProfileResponse,
     ProjectCreateRequest,
     ProjectResponse,
 )
@@ -73,31 +75,19 @@ def create_project(
 # 3️⃣ 프로젝트 개요 (대시보드)
 # ======================================================
 @router.get("/overview")
-def project_overview(
+async def project_overview(
     ctx: dict = Depends(get_current_context),
-    db: Session = Depends(get_db),
+    rdb: ReadSession = Depends(get_read_db),
 ):
     """전체 프로젝트 대시보드: 24h 로그 수, 에러율, 최근 분석."""
-    tenant_id = ctx["tenant_id"]
-    since = datetime.now(UTC) - timedelta(hours=24)
-
-    # 24h 로그 수
-    log_count_24h = (
-        db.query(func.count(Log.id))
-        .filter(Log.tenant_id == tenant_id, Log.received_at >= since)
-        .scalar()
-    ) or 0
-
-    # 24h 에러 수 → 에러율
-    error_count = (
-        db.query(func.count(Log.id))
-        .filter(
-            Log.tenant_id == tenant_id,
-            Log.received_at >= since,
-            Log.level == "ERROR",
-        )
-        .scalar()
-    ) or 0
+    return await rdb.run(_overview, ctx["tenant_id"])
+
+
+def _overview(db: Session, tenant_id: str) -> dict:
+    # 24h 로그 수 / 에러 수 — 시간 버킷 롤업 (완료된 23개 + 진행 중 버킷)
+    totals = window_totals(db, tenant_id, hours=24)
+    log_count_24h = int(sum(totals[c] for c in LEVEL_COLUMNS.values()))
+    error_count = int(totals[LEVEL_COLUMNS["ERROR"]])
 
     error_rate = round(error_count / log_count_24h, 4) if log_count_24h else 0.0
 
@@ -145,4 +135,96 @@ def delete_project(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found",
-        )
\ No newline at end of file
+        )
+
+
+# ======================================================
+# 5️⃣ 파서 프로파일 (포맷 · 필드 매핑 · 타임스탬프 포맷)
+# ======================================================
+def _require_project(db: Session, tenant_id: str, project_id: str) -> None:
+    if ProjectRepository(db).get(tenant_id, project_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found",
+        )
+
+
+def _profile_response(row: ParserProfile) -> dict:
+    return {
+        "project_id": row.project_id,
+        **spec_from_row(row).to_dict(),
+        "updated_at": row.updated_at.isoformat(),
+    }
+
+
+@router.get("/{project_id}/parser-profile", response_model=ParserProfileResponse)
+def get_parser_profile(
+    project_id: str,
+    ctx: dict = Depends(get_current_context),
+    db: Session = Depends(get_db),
+):
+    tenant_id = ctx["tenant_id"]
+    _require_project(db, tenant_id, project_id)
+
+    row = db.get(ParserProfile, (tenant_id, project_id))
+    if row is None:
+        learning = parser_profiles.learning_status(tenant_id, project_id)
+        detail = "No parser profile"
+        if learning:
+            detail += f" (learning: {learning['batches_seen']}/{learning['batches_needed']} batches)"
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    return _profile_response(row)
+
+
+@router.put("/{project_id}/parser-profile", response_model=ParserProfileResponse)
+def put_parser_profile(
+    project_id: str,
+    req: ParserProfileRequest,
+    ctx: dict = Depends(get_current_context),
+    db: Session = Depends(get_db),
+):
+    """선언된 프로파일은 학습 결과보다 우선하며 학습을 중단시킨다."""
+    tenant_id = ctx["tenant_id"]
+    _require_project(db, tenant_id, project_id)
+
+    spec = ProfileSpec(
+        format=req.format,
+        fields=req.fields,
+        timestamp_format=req.timestamp_format,
+        origin="declared",
+    )
+    try:
+        spec.validate()
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    row = db.get(ParserProfile, (tenant_id, project_id))
+    if row is None:
+        row = ParserProfile(tenant_id=tenant_id, project_id=project_id)
+        db.add(row)
+    row.format = spec.format
+    row.fields = spec.fields
+    row.timestamp_format = spec.timestamp_format
+    row.origin = spec.origin
+    db.commit()
+    db.refresh(row)
+
+    parser_profiles.put(tenant_id, project_id, spec)
+    return _profile_response(row)
+
+
+@router.delete("/{project_id}/parser-profile", status_code=status.HTTP_204_NO_CONTENT)
+def delete_parser_profile(
+    project_id: str,
+    ctx: dict = Depends(get_current_context),
+    db: Session = Depends(get_db),
+):
+    """프로파일 삭제 — 다음 배치부터 다시 학습."""
+    tenant_id = ctx["tenant_id"]
+    _require_project(db, tenant_id, project_id)
+
+    row = db.get(ParserProfile, (tenant_id, project_id))
+    if row is not None:
+        db.delete(row)
+        db.commit()
+    parser_profiles.put(tenant_id, project_id, None)
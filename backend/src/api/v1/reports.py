@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session, load_only
 from datetime import datetime, date, timedelta, UTC
 
+from src.analysis.rollups import daily_confidence
 from src.api.v1.dep import get_current_context
-from src.db.session import get_db
+from src.api.v1.pagination import keyset_page, set_next_cursor
+from src.db.async_session import ReadSession, get_read_db
+from src.db.session import get_db, release_connection
 from src.model.analysis_result import AnalysisResult
 from src.model.weekly_report import WeeklyReport
-from src.schemas.analysis import AnalysisResultDTO
+from src.schemas.analysis import AnalysisResultDTO, AnalysisResultSummaryDTO
 
 import uuid
 
@@ -25,18 +27,35 @@ router = APIRouter(
 # ======================================================
 #  분석 리포트 목록 (개별 결과 리스트)
 # ======================================================
-@router.get("", response_model=list[AnalysisResultDTO])
-def list_reports(
+@router.get("", response_model=list[AnalysisResultSummaryDTO])
+async def list_reports(
     project_id: str,
+    response: Response,
     ctx: dict = Depends(get_current_context),
-    db: Session = Depends(get_db),
+    rdb: ReadSession = Depends(get_read_db),
     start_date: date | None = Query(None, description="YYYY-MM-DD"),
     end_date: date | None = Query(None, description="YYYY-MM-DD"),
     limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="이전 페이지의 X-Next-Cursor"),
 ):
-    tenant_id = ctx["tenant_id"]
+    items, next_cursor = await rdb.run(
+        _list_reports, ctx["tenant_id"], project_id, start_date, end_date, limit, cursor,
+    )
+    set_next_cursor(response, next_cursor)
+    return items
+
 
-    q = db.query(AnalysisResult).filter(
+def _list_reports(
+    db: Session,
+    tenant_id: str,
+    project_id: str,
+    start_date: date | None,
+    end_date: date | None,
+    limit: int,
+    cursor: str | None,
+) -> tuple[list[AnalysisResultSummaryDTO], str | None]:
+    # 목록 컬럼만 로드 — report_sections / notes / signals(JSONB 본문)는 단건 조회에서만
+    q = db.query(AnalysisResult).options(load_only(*_SUMMARY_COLUMNS)).filter(
         AnalysisResult.tenant_id == tenant_id,
         AnalysisResult.project_id == project_id,
     )
@@ -53,14 +72,13 @@ def list_reports(
             <= datetime.combine(end_date, datetime.max.time())
         )
 
-    results = (
-        q.order_by(AnalysisResult.received_at.desc())
-        .limit(limit)
-        .all()
+    # (received_at, id) keyset — 깊은 페이지도 인덱스 범위 스캔 한 번
+    results, next_cursor = keyset_page(
+        q, [AnalysisResult.received_at, AnalysisResult.id], cursor=cursor, limit=limit,
     )
 
     return [
-        AnalysisResultDTO(
+        AnalysisResultSummaryDTO(
             id=r.id,
             summary=r.summary,
             severity=r.severity,
@@ -68,15 +86,28 @@ def list_reports(
             suspected_causes=r.suspected_causes,
             recommended_actions=r.recommended_actions,
             matched_rules=r.matched_rules,
-            report_sections=r.report_sections or [],
             investigation_status=r.investigation_status or "open",
             resolution=r.resolution,
-            notes=r.notes or [],
             strategy_used=r.strategy_used,
             received_at=r.received_at,
         )
         for r in results
-    ]
+    ], next_cursor
+
+
+_SUMMARY_COLUMNS = (
+    AnalysisResult.id,
+    AnalysisResult.summary,
+    AnalysisResult.severity,
+    AnalysisResult.confidence,
+    AnalysisResult.suspected_causes,
+    AnalysisResult.recommended_actions,
+    AnalysisResult.matched_rules,
+    AnalysisResult.investigation_status,
+    AnalysisResult.resolution,
+    AnalysisResult.strategy_used,
+    AnalysisResult.received_at,
+)
 
 # ======================================================
 # 🔥  주간 운영 리포트 (최근 7일)
@@ -158,7 +189,10 @@ def weekly_report(
     for r in results:
         if r.signals:
             signals.extend(r.signals)
+    report_count = len(results)
 
+    # GPT 호출(수 초) 동안 커넥션을 붙잡지 않는다
+    release_connection(db)
     weekly_summary = gpt_explain_weekly(
         rule_summary=rule_summary,
         signals=signals,
@@ -178,7 +212,7 @@ def weekly_report(
         project_id=project_id,
         period_start=period_start,
         period_end=period_end,
-        report_count=len(results),
+        report_count=report_count,
         summary=weekly_summary,
         risk_level=risk["level"],
         risk_reason=risk["reason"],
@@ -202,14 +236,16 @@ def weekly_report(
 #  분석 리포트 단건 조회
 # ======================================================
 @router.get("/{analysis_id}", response_model=AnalysisResultDTO)
-def get_report(
+async def get_report(
     project_id: str,
     analysis_id: str,
     ctx: dict = Depends(get_current_context),
-    db: Session = Depends(get_db),
+    rdb: ReadSession = Depends(get_read_db),
 ):
-    tenant_id = ctx["tenant_id"]
+    return await rdb.run(_get_report, ctx["tenant_id"], project_id, analysis_id)
 
+
+def _get_report(db: Session, tenant_id: str, project_id: str, analysis_id: str) -> AnalysisResultDTO:
     result = (
         db.query(AnalysisResult)
         .filter(
@@ -244,52 +280,25 @@ def get_report(
 # Confidence Trend (그래프용)
 # ======================================================
 @router.get("/trend/confidence")
-def confidence_trend(
+async def confidence_trend(
     project_id: str,
     ctx: dict = Depends(get_current_context),
-    db: Session = Depends(get_db),
+    rdb: ReadSession = Depends(get_read_db),
     start_date: date | None = Query(None),
     end_date: date | None = Query(None),
 ):
-    tenant_id = ctx["tenant_id"]
-
-    q = db.query(
-        func.date(AnalysisResult.received_at).label("day"),
-        func.avg(AnalysisResult.confidence).label("avg_confidence"),
-        func.count(AnalysisResult.id).label("count"),
-    ).filter(
-        AnalysisResult.tenant_id == tenant_id,
-        AnalysisResult.project_id == project_id,
-    )
-
-    if start_date:
-        q = q.filter(
-            AnalysisResult.received_at
-            >= datetime.combine(start_date, datetime.min.time())
-        )
-
-    if end_date:
-        q = q.filter(
-            AnalysisResult.received_at
-            <= datetime.combine(end_date, datetime.max.time())
-        )
-
-    rows = (
-        q.group_by(func.date(AnalysisResult.received_at))
-        .order_by(func.date(AnalysisResult.received_at))
-        .all()
+    # 시간 버킷 롤업을 일자(UTC)별로 합산 — analysis_results 스캔 없음
+    points = await rdb.run(
+        daily_confidence,
+        ctx["tenant_id"],
+        project_id,
+        start_date=start_date,
+        end_date=end_date,
     )
 
     return {
         "metric": "confidence_trend",
-        "points": [
-            {
-                "date": row.day,
-                "avg_confidence": round(row.avg_confidence, 3),
-                "report_count": row.count,
-            }
-            for row in rows
-        ],
+        "points": points,
     }
 
 
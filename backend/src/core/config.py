@@ -23,11 +23,84 @@ class Settings(BaseSettings):
     # Infra
     # ===============================
     DATABASE_URL: str | None = None
+    # logs / analysis_results 시간 범위 파티셔닝: daily | weekly (PostgreSQL, 비우면 끔).
+    # 기존 테이블 변환은 alembic 0002 또는 `python -m scripts.partitions convert`. 켜져 있으면 기동 시 다음 파티션을 미리 생성
+    DB_PARTITIONING: str | None = None
+    # 커넥션 풀 (PostgreSQL). 요청당 세션 1개 — pool_size + max_overflow 가 동시 DB 작업 상한.
+    # 풀이 비면 DB_POOL_TIMEOUT 초 대기 후 503 (기본 30초 대기 → 연쇄 타임아웃 방지용으로 짧게)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 5.0
+    # 이 시간(초)보다 오래된 커넥션은 재연결 (LB/방화벽 idle 끊김 대비, -1 = 끔)
+    DB_POOL_RECYCLE: int = 1800
+    # 서버측 statement_timeout / idle_in_transaction_session_timeout (ms, 0 = 끔)
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = 60000
+    # 읽기 위주 엔드포인트(reports / overview / patterns 목록)를 async 엔진(asyncpg)으로 처리.
+    # `pip install asyncpg` 필요 — 없으면 경고 후 동기 세션 사용
+    DB_ASYNC_READS: bool = False
     OPENAI_API_KEY: str | None = None
 
     # Agent → /ingest 인증. 설정 시 에이전트는 X-API-Key 헤더를 보내야 함.
     # 비워두면(기본) 인증 미적용 — 하위호환.
     INGEST_API_KEY: str | None = None
+    # /admin/* 운영용 엔드포인트 인증 (X-Admin-Key 헤더). 비워두면 /admin 은 403
+    ADMIN_API_KEY: str | None = None
+
+    # Accept-and-enqueue 모드: true면 /ingest 는 큐에 넣고 202 + batch_id 를 즉시 반환,
+    # 워커 스레드가 파이프라인을 실행. 큐가 MAX_DEPTH(배치 수)에 도달하면 429.
+    INGEST_ASYNC: bool = False
+    INGEST_QUEUE_MAX_DEPTH: int = 1000
+    INGEST_WORKERS: int = 2
+    # 같은 tenant/project 의 대기 배치를 합쳐 한 번에 처리할 최대 라인 수
+    INGEST_COALESCE_MAX_LINES: int = 2000
+    # /ingest/stream: 본문을 이 라인 수 단위로 잘라 파이프라인에 투입
+    INGEST_STREAM_CHUNK_LINES: int = 1000
+    # 파싱·마스킹·Drain·룰 평가(CPU 단계)를 돌릴 워커 프로세스 수. 0이면 API 프로세스 안에서 실행.
+    # tenant 는 consistent hash 로 한 워커에 고정 (Drain 트리가 한 프로세스에만 존재)
+    INGEST_PROCESSES: int = 0
+
+    # ===============================
+    # Retention (scripts/retention.py)
+    # ===============================
+    # 기본 보관 기간(일). CLI --days 가 우선
+    RETENTION_DAYS: int = 7
+    # tenant 별 보관 기간 재정의 (JSON: {"tenant-a": 30, "tenant-b": 3})
+    RETENTION_TENANT_DAYS: dict[str, int] = {}
+    # 한 번에 지우고 커밋하는 행 수 / 청크 사이 대기(초) — 야간 작업이 수집 지연을 키우지 않도록
+    RETENTION_CHUNK_ROWS: int = 5000
+    RETENTION_CHUNK_SLEEP_SECONDS: float = 0.05
+    # 이 기간(일) 동안 다시 보이지 않은 candidate 패턴 삭제 (0 = 끔)
+    RETENTION_CANDIDATE_DAYS: int = 30
+
+    # ===============================
+    # Pattern mining
+    # ===============================
+    # mask_variables 결과 LRU 캐시 크기 (0 = 끔). 같은 라인이 반복되는 소스에서만 이득
+    MASK_CACHE_SIZE: int = 0
+    # true면 마스크를 단일 alternation 패스로 적용 (더 빠르지만 마스크가 겹칠 때 결과가 달라짐)
+    MASK_FUSED: bool = False
+    # tenant Drain 트리 스냅샷 디렉터리 (비우면 끔 — 재시작 시 빈 트리로 시작)
+    DRAIN_SNAPSHOT_DIR: str | None = None
+    # 변경된 트리를 다시 저장하는 최소 간격(초). 종료 시에는 항상 저장
+    DRAIN_SNAPSHOT_INTERVAL_SECONDS: int = 300
+    # 프로세스(워커)당 Drain 트리 메모리 예산(MB, 추정치). 넘으면 가장 오래 안 쓴 tenant 트리부터 내림 (0 = 무제한)
+    DRAIN_CACHE_MAX_MB: int = 512
+    # 이 시간(초) 동안 수집이 없던 tenant 트리는 내림 (0 = 끔). DRAIN_SNAPSHOT_DIR가 있을 때만 적용 — 다음 수집 때 복원
+    DRAIN_TREE_IDLE_SECONDS: int = 3600
+    # 프로젝트별 파서 프로파일(포맷·필드 매핑·타임스탬프 포맷)을 학습할 초기 배치 수 (0 = 학습 끔, 선언만 사용)
+    PARSER_PROFILE_LEARN_BATCHES: int = 3
+
+    # ===============================
+    # Realtime (SSE)
+    # ===============================
+    # memory: 단일 프로세스 (기본) | redis: 멀티 워커/인스턴스 (REDIS_URL 필요)
+    EVENT_BROKER: str = "memory"
+    REDIS_URL: str | None = None
+    # tenant 별로 보관하는 최근 이벤트 수 (Last-Event-ID 재전송 범위)
+    EVENT_BUFFER_SIZE: int = 1000
+    # memory broker: 구독자도 새 이벤트도 이 시간(초) 동안 없던 tenant의 버퍼는 버림 (0 = 끔)
+    EVENT_BUFFER_IDLE_SECONDS: int = 600
 
     # ===============================
     # Frontend / CORS
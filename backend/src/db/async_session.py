@@ -0,0 +1,103 @@
+"""
+Optional async engine for read-heavy endpoints (`DB_ASYNC_READS`, asyncpg).
+
+Read routes take a `ReadSession` (`Depends(get_read_db)`) and hand it a
+plain sync function of a session:
+
+    items = await rdb.run(_list_reports, tenant_id, project_id, ...)
+
+With async reads on, the function runs through `AsyncSession.run_sync` on
+an asyncpg connection: the event loop awaits the I/O and neither a
+threadpool thread nor a sync pool connection is tied up by dashboard
+polling. Otherwise it runs in the threadpool on the request's regular sync
+session — the same query code either way. `fn` must return plain data
+(DTOs / dicts): ORM objects are detached once it returns.
+
+The async engine has its own pool with the same `DB_POOL_*` limits.
+"""
+from __future__ import annotations
+
+import importlib.util
+import logging
+from typing import AsyncIterator, Callable, TypeVar
+
+from fastapi import Depends
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from src.db.session import DATABASE_URL, engine_options, get_db
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncReads:
+    """The async engine + session factory, or disabled (None)."""
+
+    def __init__(self, url: str, enabled: bool):
+        self.engine = None
+        self.factory = None
+        if not enabled:
+            return
+        if make_url(url).get_backend_name() != "postgresql":
+            logger.warning("DB_ASYNC_READS needs PostgreSQL — using sync sessions")
+            return
+        missing = [m for m in ("asyncpg", "greenlet") if importlib.util.find_spec(m) is None]
+        if missing:
+            logger.warning(
+                f"DB_ASYNC_READS is set but {', '.join(missing)} is not installed "
+                "(pip install asyncpg 'sqlalchemy[asyncio]') — using sync sessions"
+            )
+            return
+
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        async_url = make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+        self.engine = create_async_engine(async_url, **engine_options(async_url))
+        self.factory = async_sessionmaker(self.engine, expire_on_commit=False)
+
+    @property
+    def enabled(self) -> bool:
+        return self.factory is not None
+
+    async def dispose(self) -> None:
+        if self.engine is not None:
+            await self.engine.dispose()
+
+
+class ReadSession:
+    """Runs read functions on the async session when enabled, else the sync one."""
+
+    def __init__(self, *, sync: Session | None = None, async_session=None):
+        self._sync = sync
+        self._async = async_session
+
+    @property
+    def is_async(self) -> bool:
+        return self._async is not None
+
+    async def run(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        if self._async is not None:
+            return await self._async.run_sync(fn, *args, **kwargs)
+        return await run_in_threadpool(fn, self._sync, *args, **kwargs)
+
+
+async def get_read_db(db: Session = Depends(get_db)) -> AsyncIterator[ReadSession]:
+    # The sync session only checks out a connection on its first query, so
+    # taking it here costs nothing when the async engine serves the request.
+    if async_reads.enabled:
+        async with async_reads.factory() as session:
+            yield ReadSession(async_session=session)
+    else:
+        yield ReadSession(sync=db)
+
+
+def _from_settings() -> AsyncReads:
+    from src.core.config import settings
+
+    return AsyncReads(DATABASE_URL, settings.DB_ASYNC_READS)
+
+
+async_reads = _from_settings()
@@ -10,6 +10,8 @@ from src.model.User import User
 from src.model.weekly_report import WeeklyReport
 from src.model.refresh_token import RefreshToken
 from src.model.pattern import Pattern, PatternFeedback
+from src.model.parser_profile import ParserProfile
+from src.model.rollup import HourlyRollup
 
 
 def init_db():
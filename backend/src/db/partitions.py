@@ -0,0 +1,202 @@
+"""
+Optional time-range partitioning of `logs` / `analysis_results` (PostgreSQL).
+
+With `DB_PARTITIONING=daily|weekly` both tables are `PARTITION BY RANGE
+(received_at)`, one partition per period named `<table>_<d|w><YYYYMMDD>`
+(period start, UTC) plus a `<table>_default` catch-all. Retention then
+drops whole expired partitions (`drop_partitions_before`) instead of
+`DELETE ... WHERE received_at < cutoff`, which bloated the tables and held
+locks for minutes.
+
+- `convert_to_partitioned` — one-off conversion of an existing table (copy
+  into a new partitioned parent; run in a maintenance window). Alembic
+  revision 0002 calls it when `DB_PARTITIONING` is set at upgrade time;
+  `python -m scripts.partitions convert` does the same later.
+- `ensure_partitions` — creates the partitions for the current period and
+  `_AHEAD` ahead; run at startup and by the retention job so rows never
+  land in the default partition.
+
+The partition key must be part of the primary key, so partitioned tables
+have `PRIMARY KEY (id, received_at)`; the ORM keeps treating `id` as the
+identity. Partition names are the source of truth for bounds — tables
+attached by hand under other names are never dropped.
+"""
+from __future__ import annotations
+
+import logging
+import re
+from datetime import datetime, timedelta, UTC
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateIndex
+
+logger = logging.getLogger(__name__)
+
+# table -> partition key
+PARTITIONED_TABLES = {
+    "logs": "received_at",
+    "analysis_results": "received_at",
+}
+
+GRANULARITIES = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+_PREFIX = {"daily": "d", "weekly": "w"}
+_AHEAD = timedelta(days=14)
+
+
+def period_start(ts: datetime, granularity: str) -> datetime:
+    """UTC midnight starting the day / ISO week (Monday) that contains `ts`."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=UTC)
+    day = ts.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "weekly":
+        day -= timedelta(days=day.weekday())
+    return day
+
+
+def partition_name(table: str, start: datetime, granularity: str) -> str:
+    return f"{table}_{_PREFIX[granularity]}{start:%Y%m%d}"
+
+
+def parse_partition_name(table: str, name: str) -> tuple[datetime, datetime] | None:
+    """(lower, upper) bounds encoded in a partition name, or None if not ours."""
+    m = re.fullmatch(rf"{re.escape(table)}_([dw])(\d{{8}})", name)
+    if m is None:
+        return None
+    start = datetime.strptime(m.group(2), "%Y%m%d").replace(tzinfo=UTC)
+    step = GRANULARITIES["daily" if m.group(1) == "d" else "weekly"]
+    return start, start + step
+
+
+# ======================================================
+# Introspection
+# ======================================================
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    return conn.execute(
+        text(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+        ),
+        {"table": table},
+    ).first() is not None
+
+
+def list_partitions(conn: Connection, table: str) -> list[tuple[str, float]]:
+    """(partition name, estimated rows) for every partition of `table`."""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname, c.reltuples FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table AND pg_table_is_visible(p.oid) "
+            "ORDER BY c.relname"
+        ),
+        {"table": table},
+    ).all()
+    return [(name, max(float(n), 0.0)) for name, n in rows]
+
+
+# ======================================================
+# Maintenance
+# ======================================================
+
+def ensure_partitions(
+    conn: Connection,
+    table: str,
+    granularity: str,
+    *,
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> list[str]:
+    """Create missing partitions covering [since, until) (default: now .. now + _AHEAD)."""
+    now = datetime.now(UTC)
+    start = period_start(since or now, granularity)
+    end = until or now + _AHEAD
+    step = GRANULARITIES[granularity]
+    existing = {name for name, _ in list_partitions(conn, table)}
+    created = []
+    while start < end:
+        name = partition_name(table, start, granularity)
+        if name not in existing:
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{(start + step).isoformat()}')"
+            ))
+            created.append(name)
+        start += step
+    return created
+
+
+def ensure_all(conn: Connection, granularity: str) -> list[str]:
+    """`ensure_partitions` for every table that is partitioned (startup / cron)."""
+    created = []
+    for table in PARTITIONED_TABLES:
+        if is_partitioned(conn, table):
+            created += ensure_partitions(conn, table, granularity)
+    return created
+
+
+def drop_partitions_before(
+    conn: Connection,
+    table: str,
+    cutoff: datetime,
+    *,
+    dry_run: bool = False,
+) -> list[tuple[str, float]]:
+    """
+    Detach and drop every partition whose whole range ends at or before
+    `cutoff`. Returns (name, estimated rows) of the dropped partitions.
+    """
+    dropped = []
+    for name, rows in list_partitions(conn, table):
+        bounds = parse_partition_name(table, name)
+        if bounds is None or bounds[1] > cutoff:
+            continue
+        if not dry_run:
+            conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+            conn.execute(text(f'DROP TABLE "{name}"'))
+        dropped.append((name, rows))
+    return dropped
+
+
+def convert_to_partitioned(conn: Connection, table: str, granularity: str) -> int:
+    """
+    Rebuild `table` as a range-partitioned table with the same columns and
+    model indexes, copying all rows. Returns the number of rows copied.
+    Holds an exclusive lock on the table for the duration of the copy.
+    """
+    from src.db.base import Base
+    from src.model import analysis_result, log  # noqa: F401 — register the tables
+
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"unknown partitioning: {granularity!r} (daily | weekly)")
+    if is_partitioned(conn, table):
+        return 0
+    key = PARTITIONED_TABLES[table]
+    old = f"{table}_unpartitioned"
+
+    conn.execute(text(f'ALTER TABLE "{table}" RENAME TO "{old}"'))
+    # Constraint / index names are schema-wide: free "<table>_pkey" for the new table.
+    conn.execute(text(f'ALTER INDEX IF EXISTS "{table}_pkey" RENAME TO "{old}_pkey"'))
+    conn.execute(text(
+        f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+        f'PARTITION BY RANGE ("{key}")'
+    ))
+    conn.execute(text(f'ALTER TABLE "{table}" ADD PRIMARY KEY (id, "{key}")'))
+    conn.execute(text(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT'))
+
+    oldest = conn.execute(text(f'SELECT min("{key}") FROM "{old}"')).scalar()
+    ensure_partitions(conn, table, granularity, since=oldest)
+    copied = conn.execute(text(f'INSERT INTO "{table}" SELECT * FROM "{old}"')).rowcount
+    conn.execute(text(f'DROP TABLE "{old}"'))
+
+    # Indexes last: one build per partition instead of maintenance per row.
+    for index in Base.metadata.tables[table].indexes:
+        conn.execute(CreateIndex(index))
+    logger.info(f"Partitioned {table} ({granularity}): {copied} rows")
+    return copied
@@ -0,0 +1,289 @@
+"""
+Chunked retention engine (`python -m scripts.retention`).
+
+One `DELETE ... WHERE received_at < cutoff` per table in a single
+transaction held locks and produced WAL for the whole run, and the dry-run
+did a full `COUNT(*)`. `RetentionJob` instead:
+
+- deletes in bounded slices — the oldest `chunk_size` ids below the cutoff
+  (served by the `received_at` index), one commit per slice, with an
+  optional sleep between slices so ingest keeps the I/O and the WAL
+- drops whole expired partitions first when the table is partitioned
+  (`src/db/partitions.py`); slices then only cover tenants whose retention
+  is shorter than the longest one
+- applies per-tenant overrides (`RETENTION_TENANT_DAYS`): the default rule
+  skips overridden tenants, each override gets its own cutoff
+- prunes `hourly_rollups` buckets with the same per-tenant cutoffs, so
+  dashboard trends never report days whose raw rows are already gone
+- prunes `patterns` candidates not seen for `candidate_days` and
+  `pattern_feedback` rows whose pattern no longer exists
+- logs rows/sec per step and writes a JSON checkpoint after every slice; an
+  interrupted run resumes with the same cutoffs and skips finished steps
+- dry-run counts at most `_DRY_RUN_CAP` rows per step (partitions: planner
+  estimates), never a full scan
+
+Deletes are idempotent ("oldest rows below the cutoff"), so the checkpoint
+only has to pin the run's start time and the finished steps.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, UTC
+
+from sqlalchemy import delete, exists, func, select, text
+from sqlalchemy.orm import Session
+
+from src.db.partitions import drop_partitions_before, ensure_all, is_partitioned
+from src.model.analysis_result import AnalysisResult
+from src.model.log import Log
+from src.model.pattern import Pattern, PatternFeedback
+from src.model.rollup import HourlyRollup
+from src.model.weekly_report import WeeklyReport
+
+logger = logging.getLogger(__name__)
+
+# (table, model, timestamp column) — tenant-scoped, `days` / overrides apply
+TARGETS = [
+    ("logs", Log, Log.received_at),
+    ("analysis_results", AnalysisResult, AnalysisResult.received_at),
+    ("weekly_reports", WeeklyReport, WeeklyReport.created_at),
+    ("hourly_rollups", HourlyRollup, HourlyRollup.bucket),
+]
+
+# Tables without a single `id` column: slices are taken by this column instead.
+_SLICE_KEYS = {"hourly_rollups": HourlyRollup.bucket}
+# A bucket goes only once its whole span is past the cutoff — an hour that
+# still holds surviving raw rows keeps its counters.
+_BUCKET_WIDTH = {"hourly_rollups": timedelta(hours=1)}
+
+_DRY_RUN_CAP = 100_000
+_PROGRESS_EVERY = 20                      # slices between progress lines
+_CHECKPOINT_MAX_AGE = timedelta(hours=20)  # older checkpoints belong to a dead run
+
+
+@dataclass
+class RetentionPolicy:
+    days: int = 7
+    tenant_days: dict[str, int] = field(default_factory=dict)
+    candidate_days: int = 30              # 0 = keep stale candidates
+
+    def rules(self) -> list[tuple[str | None, int]]:
+        """(tenant or None for "everyone else", days), default rule first."""
+        return [(None, self.days), *sorted(self.tenant_days.items())]
+
+    @property
+    def longest(self) -> int:
+        return max([self.days, *self.tenant_days.values()])
+
+
+@dataclass
+class StepResult:
+    rows: int = 0
+    seconds: float = 0.0
+    estimated: bool = False               # dry-run figure is a cap / planner estimate
+
+    @property
+    def rate(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+class Checkpoint:
+    """`{"started_at": iso, "done": {step: rows}, "partial": {step: rows}}` in a JSON file."""
+
+    def __init__(self, path: str | None):
+        self.path = path
+        self.started_at: datetime | None = None
+        self.done: dict[str, int] = {}
+        self.partial: dict[str, int] = {}
+
+    def load(self, now: datetime) -> bool:
+        """Resume a recent unfinished run; returns True when one was found."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            started = datetime.fromisoformat(data["started_at"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable retention checkpoint {self.path}: {e}")
+            return False
+        if now - started > _CHECKPOINT_MAX_AGE:
+            return False
+        self.started_at = started
+        self.done = dict(data.get("done", {}))
+        self.partial = dict(data.get("partial", {}))
+        return True
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({
+                "started_at": self.started_at.isoformat(),
+                "done": self.done,
+                "partial": self.partial,
+            }, f)
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class RetentionJob:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        policy: RetentionPolicy,
+        *,
+        chunk_size: int = 5000,
+        sleep: float = 0.0,
+        dry_run: bool = False,
+        checkpoint: str | None = None,
+        partitioning: str | None = None,
+        targets: list | None = None,
+        now: datetime | None = None,
+    ):
+        self.session_factory = session_factory
+        self.policy = policy
+        self.chunk_size = max(1, chunk_size)
+        self.sleep = sleep
+        self.dry_run = dry_run
+        self.checkpoint = Checkpoint(None if dry_run else checkpoint)
+        self.partitioning = partitioning
+        self.targets = TARGETS if targets is None else targets
+        self.now = now
+        self.prune_patterns = targets is None
+        self.results: dict[str, StepResult] = {}
+
+    # --------------------------------------------------
+    # Entry point
+    # --------------------------------------------------
+
+    def run(self) -> dict[str, StepResult]:
+        now = self.now or datetime.now(UTC)
+        if self.checkpoint.load(now):
+            now = self.checkpoint.started_at
+            logger.info(f"Resuming retention run started {now.isoformat()} ({len(self.checkpoint.done)} steps done)")
+        self.checkpoint.started_at = now
+
+        with self.session_factory() as db:
+            postgres = db.get_bind().dialect.name == "postgresql"
+            for table, model, ts_col in self.targets:
+                partitioned = postgres and is_partitioned(db.connection(), table)
+                db.rollback()
+                keep = self.policy.longest
+                if partitioned:
+                    self._step(f"{table}:partitions", lambda: self._drop_partitions(db, table, now - timedelta(days=keep)))
+                overridden = list(self.policy.tenant_days)
+                pk = _SLICE_KEYS.get(table, getattr(model, "id", None))
+                width = _BUCKET_WIDTH.get(table)
+                for tenant_id, days in self.policy.rules():
+                    if partitioned and days >= keep:
+                        continue   # whole expired partitions already cover this rule
+                    cutoff = now - timedelta(days=days)
+                    where = [ts_col <= cutoff - width if width else ts_col < cutoff]
+                    if tenant_id is not None:
+                        where.append(model.tenant_id == tenant_id)
+                    elif overridden:
+                        where.append(model.tenant_id.not_in(overridden))
+                    key = table if tenant_id is None else f"{table}[{tenant_id}]"
+                    self._step(key, lambda: self._delete_slices(db, key, model, pk, ts_col, where))
+
+            if self.prune_patterns:
+                if self.policy.candidate_days:
+                    stale = [
+                        Pattern.status == "candidate",
+                        Pattern.last_seen < now - timedelta(days=self.policy.candidate_days),
+                    ]
+                    self._step("patterns:candidates", lambda: self._delete_slices(
+                        db, "patterns:candidates", Pattern, Pattern.id, Pattern.last_seen, stale))
+                orphan = [~exists().where(Pattern.id == PatternFeedback.pattern_id)]
+                self._step("pattern_feedback:orphans", lambda: self._delete_slices(
+                    db, "pattern_feedback:orphans", PatternFeedback, PatternFeedback.id, PatternFeedback.id, orphan))
+
+            if not self.dry_run and postgres and self.partitioning:
+                # Also keep upcoming partitions in place (the API does this at startup).
+                ensure_all(db.connection(), self.partitioning)
+                db.commit()
+
+        if not self.dry_run:
+            self.checkpoint.clear()
+        return self.results
+
+    # --------------------------------------------------
+    # Steps
+    # --------------------------------------------------
+
+    def _step(self, key: str, fn: Callable[[], StepResult]) -> None:
+        if key in self.checkpoint.done:
+            self.results[key] = StepResult(rows=self.checkpoint.done[key])
+            logger.info(f"{key}: done in the interrupted run ({self.checkpoint.done[key]} rows)")
+            return
+        result = fn()
+        self.results[key] = result
+        if self.dry_run:
+            bound = "≥" if result.estimated else ""
+            logger.info(f"[dry-run] {key}: {bound}{result.rows} rows would be deleted")
+            return
+        self.checkpoint.partial.pop(key, None)
+        self.checkpoint.done[key] = result.rows
+        self.checkpoint.save()
+        logger.info(f"{key}: {result.rows} rows in {result.seconds:.1f}s ({result.rate:.0f} rows/s)")
+
+    def _drop_partitions(self, db: Session, table: str, cutoff: datetime) -> StepResult:
+        started = time.monotonic()
+        dropped = drop_partitions_before(db.connection(), table, cutoff, dry_run=self.dry_run)
+        if not self.dry_run:
+            db.commit()
+        names = ", ".join(name for name, _ in dropped) or "none"
+        logger.info(f"{table}: {'would drop' if self.dry_run else 'dropped'} partitions {names}")
+        return StepResult(
+            rows=int(sum(rows for _, rows in dropped)),
+            seconds=time.monotonic() - started,
+            estimated=True,   # reltuples
+        )
+
+    def _delete_slices(self, db: Session, key: str, model, pk, order_col, where: list) -> StepResult:
+        if self.dry_run:
+            capped = select(pk).where(*where).limit(_DRY_RUN_CAP).subquery()
+            n = db.execute(select(func.count()).select_from(capped)).scalar() or 0
+            return StepResult(rows=n, estimated=n >= _DRY_RUN_CAP)
+
+        postgres = db.get_bind().dialect.name == "postgresql"
+        result = StepResult(rows=self.checkpoint.partial.get(key, 0))
+        started = time.monotonic()
+        slices = 0
+        while True:
+            ids = db.execute(
+                select(pk).where(*where).order_by(order_col).limit(self.chunk_size)
+            ).scalars().all()
+            if not ids:
+                break
+            if postgres:
+                # Re-runnable job: don't make ingest commits queue behind our WAL flushes.
+                db.execute(text("SET LOCAL synchronous_commit = off"))
+            deleted = db.execute(
+                delete(model).where(pk.in_(ids), *where).execution_options(synchronize_session=False)
+            ).rowcount or 0
+            db.commit()
+
+            result.rows += deleted
+            slices += 1
+            self.checkpoint.partial[key] = result.rows
+            self.checkpoint.save()
+            if slices % _PROGRESS_EVERY == 0:
+                elapsed = time.monotonic() - started
+                logger.info(f"{key}: {result.rows} rows so far ({result.rows / elapsed:.0f} rows/s)")
+            if len(ids) < self.chunk_size:
+                break
+            if self.sleep:
+                time.sleep(self.sleep)
+        result.seconds = time.monotonic() - started
+        return result
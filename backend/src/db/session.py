@@ -1,8 +1,33 @@
+"""
+Sync engine / session factory.
+
+Every request that touches the DB checks a connection out of this pool on
+its first query and holds it until the session's transaction ends, so the
+pool size is the ceiling on concurrent DB work. Pool limits, recycling and
+server-side timeouts come from settings (`DB_POOL_*`, `DB_*_TIMEOUT_MS`);
+a checkout that waits longer than `DB_POOL_TIMEOUT` is answered with 503
+instead of piling up behind the pool.
+
+Slow non-DB work (GPT calls, the ingest CPU stage) must not run while a
+connection is checked out — `release_connection` ends the session's
+transaction first; the next query checks a connection out again.
+
+Maintenance scripts (partitions, rollups, retention, seed) use
+`maintenance_engine` / `MaintenanceSession` instead: same database, both
+server-side timeouts switched off — a partition copy or a rollup rebuild
+legitimately runs for minutes.
+"""
+from __future__ import annotations
+
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 from typing import Generator
 
+from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.core.config import settings
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 if not DATABASE_URL:
@@ -11,10 +36,39 @@ if not DATABASE_URL:
         "Please export it as an OS environment variable."
     )
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-)
+
+def engine_options(url: str, *, maintenance: bool = False) -> dict:
+    """
+    create_engine / create_async_engine kwargs for `url` from settings.
+    `maintenance=True` sets both timeouts to 0 (off, overriding any role or
+    database default) for long-running scripts.
+    """
+    options: dict = {"pool_pre_ping": True}
+    if make_url(url).get_backend_name() != "postgresql":
+        return options   # sqlite (tests, local tools): SQLAlchemy's default pool
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    timeouts = {
+        name: 0 if maintenance else ms
+        for name, ms in (
+            ("statement_timeout", settings.DB_STATEMENT_TIMEOUT_MS),
+            ("idle_in_transaction_session_timeout", settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS),
+        )
+        if maintenance or ms > 0
+    }
+    if timeouts and make_url(url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {"server_settings": {k: str(v) for k, v in timeouts.items()}}
+    elif timeouts:
+        options["connect_args"] = {"options": " ".join(f"-c {k}={v}" for k, v in timeouts.items())}
+    return options
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -23,9 +77,46 @@ SessionLocal = sessionmaker(
 )
 
 
+# Engines connect lazily — the API process never opens a maintenance connection.
+maintenance_engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, maintenance=True))
+
+MaintenanceSession = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    bind=maintenance_engine,
+)
+
+
 def get_db() -> Generator:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def release_connection(db: Session, *keep: object) -> None:
+    """
+    Hand the session's connection back to the pool before a slow external
+    call. Only for sessions with nothing left to flush — commit first.
+    Objects in `keep` are detached and stay readable as loaded; everything
+    else is expired and reloads (checking a connection out) on next access.
+    """
+    if db.new or db.dirty or db.deleted:
+        raise RuntimeError("release_connection() with unflushed changes — commit first")
+    for obj in keep:
+        db.expunge(obj)
+    if db.in_transaction():
+        db.rollback()
+
+
+def pool_status() -> dict:
+    """Checked-out / idle / overflow connections of the sync pool."""
+    pool = engine.pool
+    stats = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            stats[name] = fn()
+    return stats
+
@@ -2,6 +2,7 @@ import uuid
 from sqlalchemy.orm import Session
 from datetime import datetime, UTC
 
+from src.analysis.rollups import record_logs
 from src.model.log import Log
 from src.schemas.enums import LogLevel
 
@@ -36,6 +37,7 @@ class LogDomainService:
         )
 
         self.db.add(log)
+        record_logs(self.db, tenant_id, project_id, [level], at=log.received_at)
         self.db.commit()
         self.db.refresh(log)
 
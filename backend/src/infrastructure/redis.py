@@ -0,0 +1,32 @@
+"""Redis client factories (optional dependency — `pip install redis`).
+
+Only imported by features that are switched on by config (e.g.
+`EVENT_BROKER=redis`), so the default single-process stack does not need
+the package installed.
+"""
+from __future__ import annotations
+
+
+def _require_redis():
+    try:
+        import redis  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError(
+            "The redis package is required for this setting. "
+            "Install it with `pip install redis`."
+        ) from e
+    return redis
+
+
+def sync_client(url: str):
+    """Blocking client (for publishing from threadpool code)."""
+    redis = _require_redis()
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+def async_client(url: str):
+    """asyncio client (for async endpoints such as the SSE stream)."""
+    _require_redis()
+    from redis import asyncio as aioredis
+
+    return aioredis.Redis.from_url(url, decode_responses=True)
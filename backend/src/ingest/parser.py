@@ -6,16 +6,34 @@ Supports:
   2. Key=Value logs:  level=ERROR message="timeout occurred" service=api
   3. Syslog (RFC 3164): <134>Oct 11 22:14:15 server01 app[12345]: connection refused
   4. Plain text:      fallback — returns raw message with inferred level
+
+`parse_batch` parses a request's lines once into a `ParsedBatch` that the
+ingest pipeline shares between pattern mining, rule evaluation and the SSE
+event. It carries each line's timestamp normalized to an aware UTC datetime
+(ISO 8601, epoch s/ms, syslog `Oct 11 22:14:15`). `parse_records` builds the
+same batch from agent-aggregated records — one entry per record, weighted by
+its `count`.
+
+`parse_log_lines` samples the batch first: agents ship homogeneous batches,
+so when one format dominates (JSON or syslog) every line goes straight to
+that decoder and only misses fall back to the full chain. JSON is decoded
+with orjson when it is installed (`pip install orjson`).
 """
 from __future__ import annotations
 
 import json
 import re
 from dataclasses import dataclass, field
-from datetime import datetime, UTC
+from datetime import datetime, timedelta, UTC
+from functools import cached_property
 
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
 
-@dataclass
+
+@dataclass(slots=True)
 class ParsedLog:
     """Normalized output of the parser."""
     message: str
@@ -29,12 +47,30 @@ class ParsedLog:
 
 # --- JSON parser ---
 
+_JSON_KNOWN_KEYS = frozenset({
+    "message", "msg", "log", "text",
+    "level", "severity", "loglevel",
+    "source", "service", "app", "logger",
+    "timestamp", "time", "ts",
+    "host", "hostname",
+})
+
+
+def _loads(text: str):
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # NaN / huge ints etc. — let the stdlib decide
+    return json.loads(text)
+
+
 def _try_json(line: str) -> ParsedLog | None:
     stripped = line.strip()
     if not stripped.startswith("{"):
         return None
     try:
-        obj = json.loads(stripped)
+        obj = _loads(stripped)
     except (json.JSONDecodeError, ValueError):
         return None
 
@@ -64,14 +100,7 @@ def _try_json(line: str) -> ParsedLog | None:
     timestamp = obj.get("timestamp") or obj.get("time") or obj.get("ts")
     host = obj.get("host") or obj.get("hostname")
 
-    known_keys = {
-        "message", "msg", "log", "text",
-        "level", "severity", "loglevel",
-        "source", "service", "app", "logger",
-        "timestamp", "time", "ts",
-        "host", "hostname",
-    }
-    extra = {k: v for k, v in obj.items() if k not in known_keys}
+    extra = {k: v for k, v in obj.items() if k not in _JSON_KNOWN_KEYS}
 
     return ParsedLog(
         message=str(message),
@@ -90,8 +119,17 @@ _KV_RE = re.compile(
     r'(\w+)\s*=\s*(?:"([^"]*?)"|(\S+))'
 )
 
+_KV_KNOWN_KEYS = frozenset({
+    "message", "msg", "level", "severity",
+    "source", "service", "timestamp", "time",
+    "host", "hostname",
+})
+
 
 def _try_kv(line: str) -> ParsedLog | None:
+    # Every pair consumes its own "=", so fewer than two can't make two pairs.
+    if line.count("=") < 2:
+        return None
     pairs = _KV_RE.findall(line)
     if len(pairs) < 2:
         return None
@@ -104,12 +142,7 @@ def _try_kv(line: str) -> ParsedLog | None:
     timestamp = kv.get("timestamp") or kv.get("time")
     host = kv.get("host") or kv.get("hostname")
 
-    known_keys = {
-        "message", "msg", "level", "severity",
-        "source", "service", "timestamp", "time",
-        "host", "hostname",
-    }
-    extra = {k: v for k, v in kv.items() if k not in known_keys}
+    extra = {k: v for k, v in kv.items() if k not in _KV_KNOWN_KEYS}
 
     return ParsedLog(
         message=str(message),
@@ -157,17 +190,104 @@ def _try_syslog(line: str) -> ParsedLog | None:
 
 # --- Plain text fallback ---
 
+# Leading ISO 8601 timestamp: "2026-01-02T01:01:00Z ERROR ..."
+_LEADING_ISO_RE = re.compile(
+    r"^\s*(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?)(?=\s|$)"
+)
+
+
 def _parse_plain(line: str) -> ParsedLog:
     level_m = _LEVEL_RE.search(line)
     level = level_m.group(1).upper() if level_m else "INFO"
+    ts_m = _LEADING_ISO_RE.match(line)
 
     return ParsedLog(
         message=line.strip(),
         level=level,
+        timestamp=ts_m.group(1) if ts_m else None,
         format="plain",
     )
 
 
+# --- Timestamp normalization ---
+
+_MONTHS = {
+    m: i for i, m in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun",
+         "jul", "aug", "sep", "oct", "nov", "dec"),
+        start=1,
+    )
+}
+_SYSLOG_TS_RE = re.compile(r"^(\w{3})\s+(\d{1,2})\s+(\d{2}):(\d{2}):(\d{2})$")
+_EPOCH_RE = re.compile(r"^\d{9,13}(?:\.\d+)?$")
+
+# Epoch values above this are milliseconds (1e11 s is year 5138).
+_EPOCH_MS_THRESHOLD = 1e11
+
+
+def _epoch_ts(epoch: float) -> datetime | None:
+    try:
+        return datetime.fromtimestamp(epoch, UTC)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+def _syslog_ts(m: re.Match, now: datetime | None) -> datetime | None:
+    month = _MONTHS.get(m.group(1).lower())
+    if month is None:
+        return None
+    now = now or datetime.now(UTC)
+    try:
+        ts = datetime(
+            now.year, month, int(m.group(2)),
+            int(m.group(3)), int(m.group(4)), int(m.group(5)),
+            tzinfo=UTC,
+        )
+        if ts - now > timedelta(days=1):
+            ts = ts.replace(year=now.year - 1)
+    except ValueError:  # Feb 29 outside a leap year
+        return None
+    return ts
+
+
+def _iso_ts(text: str) -> datetime | None:
+    try:
+        ts = datetime.fromisoformat(text.replace(",", "."))
+    except ValueError:
+        return None
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=UTC)
+    return ts.astimezone(UTC)
+
+
+def parse_timestamp(value: str | None, *, now: datetime | None = None) -> datetime | None:
+    """
+    Normalize a parsed timestamp string to an aware UTC datetime.
+
+    - ISO 8601 (`Z` / offset / naive — naive is taken as UTC)
+    - epoch seconds or milliseconds (int or fractional)
+    - syslog RFC 3164 (`Oct 11 22:14:15`, no year — the current year, or the
+      previous one if that would put it more than a day in the future)
+
+    Returns None for anything else.
+    """
+    if not value:
+        return None
+    text = value.strip()
+
+    if _EPOCH_RE.match(text):
+        epoch = float(text)
+        if epoch >= _EPOCH_MS_THRESHOLD:
+            epoch /= 1000.0
+        return _epoch_ts(epoch)
+
+    m = _SYSLOG_TS_RE.match(text)
+    if m:
+        return _syslog_ts(m, now)
+
+    return _iso_ts(text)
+
+
 # --- Public API ---
 
 def parse_log_line(line: str) -> ParsedLog:
@@ -183,6 +303,163 @@ def parse_log_line(line: str) -> ParsedLog:
     )
 
 
+# Decoders that may go first for a batch without changing any result: a JSON
+# line starts with "{", a syslog line with "<" or a month name, so neither can
+# be taken by a format ahead of it in the chain. kv and plain batches keep the
+# chain — there the earlier probes already reject in O(1).
+_FAST_PATHS = {
+    "json": _try_json,
+    "syslog": _try_syslog,
+}
+
+_SAMPLE_SIZE = 32
+_DOMINANT_SHARE = 0.8
+
+
+def detect_format(lines: list[str], sample: int = _SAMPLE_SIZE) -> str | None:
+    """
+    Dominant format of a batch, judged on up to `sample` evenly spaced lines.
+    None when no format reaches `_DOMINANT_SHARE` of the sample.
+    """
+    if not lines:
+        return None
+    step = max(1, len(lines) // sample)
+    counts: dict[str, int] = {}
+    taken = 0
+    for line in lines[::step][:sample]:
+        if not line or not line.strip():
+            continue
+        fmt = parse_log_line(line).format
+        counts[fmt] = counts.get(fmt, 0) + 1
+        taken += 1
+    if not taken:
+        return None
+    fmt, n = max(counts.items(), key=lambda kv: kv[1])
+    return fmt if n >= taken * _DOMINANT_SHARE else None
+
+
 def parse_log_lines(lines: list[str]) -> list[ParsedLog]:
     """Parse multiple raw log lines."""
-    return [parse_log_line(line) for line in lines]
+    fast = _FAST_PATHS.get(detect_format(lines)) if len(lines) > _SAMPLE_SIZE else None
+    if fast is None:
+        return [parse_log_line(line) for line in lines]
+
+    out: list[ParsedLog] = []
+    append = out.append
+    for line in lines:
+        parsed = fast(line) if line else None
+        append(parsed if parsed is not None else parse_log_line(line))
+    return out
+
+
+@dataclass
+class ParsedBatch:
+    """
+    One ingest request, parsed once.
+
+    `timestamps[i]` is line i's normalized timestamp. Lines without one
+    (stack-trace continuations, unstructured text) inherit the previous
+    line's timestamp, or `received_at` when none came before.
+
+    For aggregated records entry i stands for `counts[i]` lines seen between
+    `timestamps[i]` and `last_timestamps[i]`; both are None for plain lines.
+    """
+    raw: list[str]
+    logs: list[ParsedLog]
+    timestamps: list[datetime]
+    received_at: datetime
+    counts: list[int] | None = None
+    last_timestamps: list[datetime] | None = None
+
+    def __len__(self) -> int:
+        return len(self.logs)
+
+    @property
+    def line_count(self) -> int:
+        """Lines the batch stands for (entries weighted by their counts)."""
+        return sum(self.counts) if self.counts is not None else len(self.logs)
+
+    # Columns are built once and shared by mining, rules and the SSE event.
+    @cached_property
+    def messages(self) -> list[str]:
+        return [p.message for p in self.logs]
+
+    @cached_property
+    def sources(self) -> list[str]:
+        return [p.source for p in self.logs]
+
+    @cached_property
+    def levels(self) -> list[str]:
+        return [p.level for p in self.logs]
+
+    @cached_property
+    def hosts(self) -> list[str | None]:
+        return [p.host for p in self.logs]
+
+    def format_counts(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        weights = self.counts or [1] * len(self.logs)
+        for p, n in zip(self.logs, weights):
+            counts[p.format] = counts.get(p.format, 0) + n
+        return counts
+
+    @property
+    def first_ts(self) -> datetime | None:
+        return min(self.timestamps) if self.timestamps else None
+
+    @property
+    def last_ts(self) -> datetime | None:
+        stamps = self.last_timestamps or self.timestamps
+        return max(stamps) if stamps else None
+
+
+def parse_batch(
+    lines: list[str],
+    *,
+    received_at: datetime | None = None,
+    profile=None,
+) -> ParsedBatch:
+    """
+    Parse a request's raw lines and normalize their timestamps.
+
+    `profile` is the project's compiled parser profile (`ingest.profiles`);
+    with one, format detection and alias probing are skipped.
+    """
+    received_at = received_at or datetime.now(UTC)
+    if profile is not None:
+        logs, stamps = profile.parse(lines, now=received_at)
+    else:
+        logs = parse_log_lines(lines)
+        stamps = [parse_timestamp(p.timestamp, now=received_at) for p in logs]
+
+    timestamps: list[datetime] = []
+    last = received_at
+    for ts in stamps:
+        if ts is not None:
+            last = ts
+        timestamps.append(last)
+
+    return ParsedBatch(raw=lines, logs=logs, timestamps=timestamps, received_at=received_at)
+
+
+def parse_records(
+    records: list[dict],
+    *,
+    received_at: datetime | None = None,
+    profile=None,
+) -> ParsedBatch:
+    """
+    Agent-aggregated records (`template`, `sample`, `count`, `first_ts`,
+    `last_ts`) as a weighted batch: each sample is parsed once and stands
+    for `count` lines. The record's own first/last times win over the
+    sample's timestamp; naive times are taken as UTC.
+    """
+    batch = parse_batch([r["sample"] for r in records], received_at=received_at, profile=profile)
+    batch.counts = [r["count"] for r in records]
+    batch.timestamps = [_aware(r["first_ts"]) for r in records]
+    batch.last_timestamps = [max(_aware(r["last_ts"]), ts) for r, ts in zip(records, batch.timestamps)]
+    return batch
+
+
+def _aware(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=UTC) if ts.tzinfo is None else ts.astimezone(UTC)
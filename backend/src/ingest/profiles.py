@@ -0,0 +1,506 @@
+"""
+Per-project parser profiles.
+
+The generic parser probes every line: format detection, then alias chains
+such as `message|msg|log|text` per field. A project's stream rarely changes
+shape, so a profile pins it down once:
+
+  format            json | kv | syslog | plain
+  fields            role -> key, e.g. {"timestamp": "@timestamp", "level": "lvl"}
+  timestamp_format  iso | epoch_s | epoch_ms | syslog | a strptime pattern
+
+Profiles are either declared through `PUT /projects/{id}/parser-profile` or
+learned from the project's first `PARSER_PROFILE_LEARN_BATCHES` batches.
+Learning also recognises keys outside the built-in alias chains (`@timestamp`,
+`lvl`, ...) by their values, so those streams get real timestamps and levels.
+An unlisted numeric field is taken as an epoch timestamp only when every
+sampled value lies within `_EPOCH_SNIFF_WINDOW` of the ingest time — large
+ids and counters are otherwise indistinguishable from epochs.
+
+With a profile, `ProfileParser.parse` reads the mapped keys directly and runs
+the timestamp parser compiled for the declared format. Lines that don't fit
+(a stray plain line in a JSON stream) fall back to the generic parser.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, UTC
+from typing import Callable
+
+from src.ingest.parser import (
+    _EPOCH_MS_THRESHOLD,
+    _EPOCH_RE,
+    _KV_RE,
+    _SYSLOG_TS_RE,
+    ParsedBatch,
+    ParsedLog,
+    _epoch_ts,
+    _iso_ts,
+    _loads,
+    _parse_plain,
+    _syslog_ts,
+    _try_syslog,
+    parse_log_line,
+    parse_timestamp,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("json", "kv", "syslog", "plain")
+ROLES = ("message", "level", "source", "timestamp", "host")
+
+# Known names per role, in preference order. Wider than the generic parser's
+# chains — learning picks one and the profile then reads only that key.
+_ALIASES: dict[str, tuple[str, ...]] = {
+    "message": ("message", "msg", "log", "text", "@message", "event", "body"),
+    "level": ("level", "severity", "loglevel", "lvl", "levelname", "log.level", "priority"),
+    "source": ("source", "service", "app", "logger", "component", "svc", "service.name", "logger_name"),
+    "timestamp": ("timestamp", "time", "ts", "@timestamp", "datetime", "date", "eventtime", "t"),
+    "host": ("host", "hostname", "node", "host.name"),
+}
+_LEVEL_VALUES = frozenset({
+    "ERROR", "ERR", "WARN", "WARNING", "INFO", "DEBUG", "TRACE",
+    "FATAL", "CRITICAL", "NOTICE",
+})
+
+# Layouts the generic parser doesn't understand, tried when learning.
+_STRPTIME_CANDIDATES = (
+    "%d/%b/%Y:%H:%M:%S %z",   # Apache / nginx access log
+    "%Y/%m/%d %H:%M:%S",      # nginx error log
+    "%d/%m/%Y %H:%M:%S",
+)
+
+
+# ======================================================
+# Timestamp formats
+# ======================================================
+
+TimestampParser = Callable[[str, datetime | None], datetime | None]
+
+
+def detect_timestamp_format(value: str) -> str | None:
+    text = value.strip()
+    if not text:
+        return None
+    if _EPOCH_RE.match(text):
+        return "epoch_ms" if float(text) >= _EPOCH_MS_THRESHOLD else "epoch_s"
+    if _SYSLOG_TS_RE.match(text):
+        return "syslog"
+    if _iso_ts(text) is not None:
+        return "iso"
+    for fmt in _STRPTIME_CANDIDATES:
+        try:
+            datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return fmt
+    return None
+
+
+def compile_timestamp_parser(fmt: str) -> TimestampParser:
+    """Parser for one timestamp format. Raises ValueError for unknown formats."""
+    if fmt == "iso":
+        return lambda text, now: _iso_ts(text.strip())
+
+    if fmt in ("epoch_s", "epoch_ms"):
+        scale = 1000.0 if fmt == "epoch_ms" else 1.0
+
+        def parse_epoch(text: str, now: datetime | None) -> datetime | None:
+            try:
+                return _epoch_ts(float(text) / scale)
+            except ValueError:
+                return None
+        return parse_epoch
+
+    if fmt == "syslog":
+        def parse_syslog(text: str, now: datetime | None) -> datetime | None:
+            m = _SYSLOG_TS_RE.match(text.strip())
+            return _syslog_ts(m, now) if m else None
+        return parse_syslog
+
+    if "%" in fmt:
+        def parse_strptime(text: str, now: datetime | None) -> datetime | None:
+            try:
+                ts = datetime.strptime(text.strip(), fmt)
+            except ValueError:
+                return None
+            return ts.replace(tzinfo=UTC) if ts.tzinfo is None else ts.astimezone(UTC)
+        return parse_strptime
+
+    raise ValueError(f"unknown timestamp format: {fmt}")
+
+
+# ======================================================
+# Profile
+# ======================================================
+
+@dataclass(frozen=True)
+class ProfileSpec:
+    format: str
+    fields: dict[str, str] = field(default_factory=dict)
+    timestamp_format: str | None = None
+    origin: str = "learned"  # learned | declared
+
+    def validate(self) -> None:
+        if self.format not in FORMATS:
+            raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+        unknown = set(self.fields) - set(ROLES)
+        if unknown:
+            raise ValueError(f"unknown field roles: {', '.join(sorted(unknown))}")
+        if self.timestamp_format:
+            compile_timestamp_parser(self.timestamp_format)
+
+    def to_dict(self) -> dict:
+        return {
+            "format": self.format,
+            "fields": dict(self.fields),
+            "timestamp_format": self.timestamp_format,
+            "origin": self.origin,
+        }
+
+
+class ProfileParser:
+    """A `ProfileSpec` compiled for the hot path (see `parse_batch(profile=...)`)."""
+
+    def __init__(self, spec: ProfileSpec):
+        spec.validate()
+        self.spec = spec
+        f = spec.fields
+        if spec.format == "kv":  # kv keys are matched lowercased
+            f = {role: key.lower() for role, key in f.items()}
+        self._message = f.get("message")
+        self._level = f.get("level")
+        self._source = f.get("source")
+        self._timestamp = f.get("timestamp")
+        self._host = f.get("host")
+        self._mapped = frozenset(f.values())
+        self._ts = compile_timestamp_parser(spec.timestamp_format) if spec.timestamp_format else None
+        self._decode = {
+            "json": self._json,
+            "kv": self._kv,
+            "syslog": self._syslog,
+            "plain": self._plain,
+        }[spec.format]
+
+    def parse(self, lines: list[str], *, now: datetime | None = None) -> tuple[list[ParsedLog], list[datetime | None]]:
+        """Parsed logs and each line's timestamp (None where it has none)."""
+        decode, ts_parse = self._decode, self._ts
+        logs: list[ParsedLog] = []
+        stamps: list[datetime | None] = []
+        for line in lines:
+            parsed = decode(line) if line else None
+            if parsed is None:
+                parsed = parse_log_line(line)
+                ts = parse_timestamp(parsed.timestamp, now=now)
+            elif parsed.timestamp is None:
+                ts = None
+            else:
+                ts = ts_parse(parsed.timestamp, now) if ts_parse is not None else None
+                if ts is None:
+                    ts = parse_timestamp(parsed.timestamp, now=now)
+            logs.append(parsed)
+            stamps.append(ts)
+        return logs, stamps
+
+    def _fields(self, obj: dict, fallback_message: str, fmt: str) -> ParsedLog:
+        message = obj.get(self._message) if self._message else None
+        level = obj.get(self._level) if self._level else None
+        source = obj.get(self._source) if self._source else None
+        timestamp = obj.get(self._timestamp) if self._timestamp else None
+        host = obj.get(self._host) if self._host else None
+        return ParsedLog(
+            message=str(message or fallback_message),
+            level=str(level or "INFO").upper(),
+            source=str(source or "unknown"),
+            timestamp=str(timestamp) if timestamp else None,
+            host=str(host) if host else None,
+            extra={k: v for k, v in obj.items() if k not in self._mapped},
+            format=fmt,
+        )
+
+    def _json(self, line: str) -> ParsedLog | None:
+        stripped = line.strip()
+        if not stripped.startswith("{"):
+            return None
+        try:
+            obj = _loads(stripped)
+        except ValueError:
+            return None
+        if not isinstance(obj, dict):
+            return None
+        return self._fields(obj, stripped, "json")
+
+    def _kv(self, line: str) -> ParsedLog | None:
+        if line.count("=") < 2:
+            return None
+        pairs = _KV_RE.findall(line)
+        if len(pairs) < 2:
+            return None
+        return self._fields({k.lower(): (v1 or v2) for k, v1, v2 in pairs}, line, "kv")
+
+    def _syslog(self, line: str) -> ParsedLog | None:
+        return _try_syslog(line)
+
+    def _plain(self, line: str) -> ParsedLog | None:
+        return _parse_plain(line) if line.strip() else None
+
+
+# ======================================================
+# Learning
+# ======================================================
+
+_LEARN_SAMPLE = 64
+_DOMINANT_SHARE = 0.8
+# An unlisted numeric field counts as an epoch timestamp only this close to
+# the ingest time — ids and counters of 9-13 digits look like epochs too.
+_EPOCH_SNIFF_WINDOW = timedelta(days=7)
+
+
+def _plausible_epoch(text: str, fmt: str, now: datetime) -> bool:
+    ts = compile_timestamp_parser(fmt)(text, now)
+    return ts is not None and abs(ts - now) <= _EPOCH_SNIFF_WINDOW
+
+
+def _role_key(role: str, obj: dict, now: datetime) -> str | None:
+    for key in _ALIASES[role]:
+        if obj.get(key):
+            return key
+    # Unlisted names: recognise the field by its value.
+    if role == "level":
+        for key, value in obj.items():
+            if isinstance(value, str) and value.upper() in _LEVEL_VALUES:
+                return key
+    elif role == "timestamp":
+        for key, value in obj.items():
+            if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+                continue
+            fmt = detect_timestamp_format(str(value))
+            if fmt is None:
+                continue
+            if fmt in ("epoch_s", "epoch_ms") and not _plausible_epoch(str(value).strip(), fmt, now):
+                continue
+            return key
+    return None
+
+
+class ProfileLearner:
+    """Accumulates what a project's first batches look like."""
+
+    def __init__(self):
+        self.batches = 0
+        self.lines = 0
+        self.formats: Counter[str] = Counter()
+        self.keys: dict[str, Counter[str]] = {role: Counter() for role in ROLES}
+        self.ts_formats: Counter[str] = Counter()
+        # Unlisted keys: epoch-shaped values seen / accepted as timestamps.
+        self.epoch_shaped: Counter[str] = Counter()
+        self.epoch_accepted: Counter[str] = Counter()
+
+    def observe(self, batch: ParsedBatch) -> None:
+        self.batches += 1
+        step = max(1, len(batch) // _LEARN_SAMPLE)
+        for raw, parsed in list(zip(batch.raw, batch.logs))[::step][:_LEARN_SAMPLE]:
+            if not raw or not raw.strip():
+                continue
+            self.lines += 1
+            self.formats[parsed.format] += 1
+
+            obj = None
+            if parsed.format == "json":
+                obj = _loads(raw.strip())
+            elif parsed.format == "kv":
+                obj = {k.lower(): (v1 or v2) for k, v1, v2 in _KV_RE.findall(raw)}
+
+            ts_value = parsed.timestamp
+            if obj is not None:
+                ts_key = None
+                for role in ROLES:
+                    key = _role_key(role, obj, batch.received_at)
+                    if key is not None:
+                        self.keys[role][key] += 1
+                        if role == "timestamp":
+                            ts_key = key
+                            ts_value = str(obj[key])
+                self._count_epochs(obj, ts_key)
+            if ts_value:
+                fmt = detect_timestamp_format(ts_value)
+                if fmt:
+                    self.ts_formats[fmt] += 1
+
+    def _count_epochs(self, obj: dict, ts_key: str | None) -> None:
+        for key, value in obj.items():
+            if key in _ALIASES["timestamp"] or isinstance(value, bool) or not isinstance(value, (str, int, float)):
+                continue
+            if detect_timestamp_format(str(value)) in ("epoch_s", "epoch_ms"):
+                self.epoch_shaped[key] += 1
+                if key == ts_key:
+                    self.epoch_accepted[key] += 1
+
+    def _sniffed_epoch_is_consistent(self, key: str) -> bool:
+        """Every sampled epoch-shaped value of `key` was a plausible timestamp, on most lines."""
+        if key not in self.epoch_shaped:
+            return True       # listed alias or a string timestamp
+        return (
+            self.epoch_accepted[key] == self.epoch_shaped[key]
+            and self.epoch_accepted[key] >= self.lines * _DOMINANT_SHARE
+        )
+
+    def build(self) -> ProfileSpec | None:
+        """The learned profile, or None when no format dominates the stream."""
+        if not self.lines:
+            return None
+        fmt, n = self.formats.most_common(1)[0]
+        if n < self.lines * _DOMINANT_SHARE:
+            return None
+        fields = {}
+        ts_formats = self.ts_formats
+        if fmt in ("json", "kv"):
+            for role, counts in self.keys.items():
+                if counts:
+                    fields[role] = counts.most_common(1)[0][0]
+            ts_key = fields.get("timestamp")
+            if ts_key is not None and not self._sniffed_epoch_is_consistent(ts_key):
+                # An id / counter that happened to look like epochs on some lines.
+                del fields["timestamp"]
+                ts_formats = Counter({f: n for f, n in ts_formats.items() if f not in ("epoch_s", "epoch_ms")})
+        ts_format = ts_formats.most_common(1)[0][0] if ts_formats else None
+        return ProfileSpec(format=fmt, fields=fields, timestamp_format=ts_format, origin="learned")
+
+
+# ======================================================
+# Registry (per process)
+# ======================================================
+
+_PROFILE_TTL = 300.0  # seconds before a cached profile is re-read from the DB
+
+
+class ProfileRegistry:
+    """
+    Compiled profiles per (tenant, project), loaded from `parser_profiles`
+    and cached for `_PROFILE_TTL` so declarations made on another worker
+    are picked up. Projects without a row are learned in memory and the
+    result is written back once.
+    """
+
+    def __init__(self, learn_batches: int = 3):
+        self.learn_batches = learn_batches
+        self._lock = threading.Lock()
+        self._cache: dict[tuple[str, str], tuple[ProfileParser | None, float]] = {}
+        self._learners: dict[tuple[str, str], ProfileLearner] = {}
+
+    def get(self, db, tenant_id: str, project_id: str) -> ProfileParser | None:
+        key = (tenant_id, project_id)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[1] > time.monotonic():
+                return cached[0]
+            if key in self._learners:
+                return None
+
+        parser = self._load(db, tenant_id, project_id)
+        with self._lock:
+            if parser is None and self.learn_batches > 0 and cached is None:
+                self._learners.setdefault(key, ProfileLearner())
+            else:
+                self._cache[key] = (parser, time.monotonic() + _PROFILE_TTL)
+        return parser
+
+    def observe(self, db, tenant_id: str, project_id: str, batch: ParsedBatch) -> None:
+        """Feed a batch parsed without a profile to the project's learner."""
+        key = (tenant_id, project_id)
+        with self._lock:
+            learner = self._learners.get(key)
+            if learner is None:
+                return
+            learner.observe(batch)
+            if learner.batches < self.learn_batches:
+                return
+            del self._learners[key]
+
+        spec = learner.build()
+        parser = None
+        if spec is not None:
+            parser = self._save(db, tenant_id, project_id, spec)
+            logger.info(f"Learned parser profile for {tenant_id}/{project_id}: {spec.to_dict()}")
+        with self._lock:
+            self._cache[key] = (parser, time.monotonic() + _PROFILE_TTL)
+
+    def learning_status(self, tenant_id: str, project_id: str) -> dict | None:
+        with self._lock:
+            learner = self._learners.get((tenant_id, project_id))
+            if learner is None:
+                return None
+            return {"batches_seen": learner.batches, "batches_needed": self.learn_batches}
+
+    def put(self, tenant_id: str, project_id: str, spec: ProfileSpec | None) -> None:
+        """Install (or with None, forget) a profile in this process's cache."""
+        key = (tenant_id, project_id)
+        with self._lock:
+            self._learners.pop(key, None)
+            if spec is None:
+                self._cache.pop(key, None)
+            else:
+                self._cache[key] = (ProfileParser(spec), time.monotonic() + _PROFILE_TTL)
+
+    # --------------------------------------------------
+    # DB
+    # --------------------------------------------------
+
+    @staticmethod
+    def _load(db, tenant_id: str, project_id: str) -> ProfileParser | None:
+        from src.model.parser_profile import ParserProfile
+
+        row = db.get(ParserProfile, (tenant_id, project_id))
+        if row is None:
+            return None
+        try:
+            return ProfileParser(spec_from_row(row))
+        except ValueError as e:
+            logger.warning(f"Ignoring invalid parser profile {tenant_id}/{project_id}: {e}")
+            return None
+
+    @staticmethod
+    def _save(db, tenant_id: str, project_id: str, spec: ProfileSpec) -> ProfileParser:
+        from sqlalchemy.exc import IntegrityError
+        from src.model.parser_profile import ParserProfile
+
+        # A declared profile (or another worker's) written meanwhile wins.
+        row = db.get(ParserProfile, (tenant_id, project_id))
+        if row is None:
+            db.add(ParserProfile(
+                tenant_id=tenant_id,
+                project_id=project_id,
+                format=spec.format,
+                fields=spec.fields,
+                timestamp_format=spec.timestamp_format,
+                origin=spec.origin,
+            ))
+            try:
+                db.commit()
+                return ProfileParser(spec)
+            except IntegrityError:
+                db.rollback()
+                row = db.get(ParserProfile, (tenant_id, project_id))
+        return ProfileParser(spec_from_row(row))
+
+
+def spec_from_row(row) -> ProfileSpec:
+    return ProfileSpec(
+        format=row.format,
+        fields=dict(row.fields or {}),
+        timestamp_format=row.timestamp_format,
+        origin=row.origin,
+    )
+
+
+def _from_settings() -> ProfileRegistry:
+    from src.core.config import settings
+
+    return ProfileRegistry(learn_batches=settings.PARSER_PROFILE_LEARN_BATCHES)
+
+
+parser_profiles = _from_settings()
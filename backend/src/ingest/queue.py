@@ -0,0 +1,285 @@
+"""Bounded in-process ingest queue (accept-and-enqueue mode for POST /ingest).
+
+With `INGEST_ASYNC=true` the endpoint validates the payload, enqueues it and
+returns 202 + batch id immediately; a small pool of worker threads drains the
+queue and runs the regular `ingest_logs` pipeline with its own DB session.
+Agents time out after 5s, so a slow DB moment no longer turns into a retry
+storm — instead the queue absorbs it, and once `INGEST_QUEUE_MAX_DEPTH`
+batches are waiting the endpoint answers 429 (backpressure).
+
+Workers coalesce: when a worker picks up a batch it also takes the other
+queued batches for the same (tenant, project), up to
+`INGEST_COALESCE_MAX_LINES` lines, and runs them as one pipeline call. A
+(tenant, project) key is only ever processed by one worker at a time, which
+also keeps that tenant's Drain tree single-writer. Aggregated-record batches
+(agent `--aggregate`) only coalesce with each other; there a record counts as
+one line.
+
+NOTE: in-memory => queued batches are lost if the process dies. Shutdown
+(`stop`) drains what is queued before returning.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """Raised by `IngestQueue.submit` when the queue is at max depth."""
+
+
+@dataclass
+class QueuedBatch:
+    batch_id: str
+    tenant_id: str
+    project_id: str
+    agent_id: str | None
+    raw_logs: list[str]
+    records: list[dict] | None = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def key(self) -> tuple[str, str]:
+        return (self.tenant_id, self.project_id)
+
+    @property
+    def size(self) -> int:
+        return len(self.records) if self.records else len(self.raw_logs)
+
+
+# (tenant_id, project_id, agent_id, raw_logs[, records=...]) → None
+IngestHandler = Callable[..., None]
+
+
+def _run_pipeline(
+    tenant_id: str,
+    project_id: str,
+    agent_id: str | None,
+    raw_logs: list[str],
+    records: list[dict] | None = None,
+) -> None:
+    """Default handler — the synchronous ingest pipeline on a fresh session."""
+    from src.db.session import SessionLocal
+    from src.ingest.service import ingest_logs
+
+    db = SessionLocal()
+    try:
+        ingest_logs(
+            db=db,
+            tenant_id=tenant_id,
+            project_id=project_id,
+            agent_id=agent_id,
+            raw_logs=raw_logs,
+            records=records,
+        )
+    finally:
+        db.close()
+
+
+class IngestQueue:
+    def __init__(
+        self,
+        *,
+        max_depth: int = 1000,
+        workers: int = 2,
+        coalesce_max_lines: int = 2000,
+        handler: IngestHandler = _run_pipeline,
+    ):
+        self.max_depth = max_depth
+        self.workers = workers
+        self.coalesce_max_lines = coalesce_max_lines
+        self._handler = handler
+
+        self._pending: deque[QueuedBatch] = deque()
+        self._active: set[tuple[str, str]] = set()
+        self._cond = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._stopping = False
+
+        # Metrics
+        self._accepted = 0
+        self._rejected = 0
+        self._processed = 0
+        self._pipeline_runs = 0
+        self._failed = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+
+    # --------------------------------------------------
+    # Lifecycle
+    # --------------------------------------------------
+    def start(self) -> None:
+        with self._cond:
+            if self._threads:
+                return
+            self._stopping = False
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"ingest-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        logger.info(f"Ingest queue started ({self.workers} workers, max depth {self.max_depth})")
+
+    def stop(self, timeout: float = 30.0) -> None:
+        """Stop accepting work, drain what is queued, then join the workers."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        deadline = time.monotonic() + timeout
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+        with self._cond:
+            left = len(self._pending)
+            self._threads = []
+        if left:
+            logger.warning(f"Ingest queue stopped with {left} batches still queued")
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads)
+
+    # --------------------------------------------------
+    # Producer side
+    # --------------------------------------------------
+    def submit(
+        self,
+        *,
+        tenant_id: str,
+        project_id: str,
+        agent_id: str | None,
+        raw_logs: list[str],
+        records: list[dict] | None = None,
+    ) -> str:
+        """Enqueue a batch; returns its batch id. Raises QueueFull (→ 429)."""
+        with self._cond:
+            if self._stopping or len(self._pending) >= self.max_depth:
+                self._rejected += 1
+                raise QueueFull(f"ingest queue is full ({self.max_depth} batches)")
+            batch = QueuedBatch(
+                batch_id=str(uuid.uuid4()),
+                tenant_id=tenant_id,
+                project_id=project_id,
+                agent_id=agent_id,
+                raw_logs=raw_logs,
+                records=records or None,
+            )
+            self._pending.append(batch)
+            self._accepted += 1
+            self._cond.notify()
+            return batch.batch_id
+
+    # --------------------------------------------------
+    # Consumer side
+    # --------------------------------------------------
+    def _take(self) -> list[QueuedBatch] | None:
+        """
+        Next batch whose key is idle, plus the queued batches for the same key
+        (up to coalesce_max_lines). Blocks; returns None once stopped and empty.
+        """
+        with self._cond:
+            while True:
+                first = next((b for b in self._pending if b.key not in self._active), None)
+                if first is not None:
+                    break
+                if self._stopping and not self._pending:
+                    return None
+                self._cond.wait(timeout=1.0)
+
+            taken = [first]
+            lines = first.size
+            kept: deque[QueuedBatch] = deque()
+            full = False  # stop at the first batch that doesn't fit — FIFO per key
+            for b in self._pending:
+                if b is first:
+                    continue
+                if b.key == first.key and not full:
+                    if (b.records is None) != (first.records is None):
+                        full = True   # other payload kind: keep key order, run it next
+                    elif lines + b.size <= self.coalesce_max_lines:
+                        taken.append(b)
+                        lines += b.size
+                        continue
+                    else:
+                        full = True
+                kept.append(b)
+            self._pending = kept
+            self._active.add(first.key)
+
+            lag = time.monotonic() - first.enqueued_at
+            self._last_lag = lag
+            self._max_lag = max(self._max_lag, lag)
+            return taken
+
+    def _worker(self) -> None:
+        while True:
+            batches = self._take()
+            if batches is None:
+                return
+            first = batches[0]
+            agents = {b.agent_id for b in batches}
+            raw_logs = [line for b in batches for line in b.raw_logs]
+            extra = {}
+            if first.records is not None:
+                extra["records"] = [r for b in batches for r in b.records]
+            try:
+                self._handler(
+                    first.tenant_id,
+                    first.project_id,
+                    first.agent_id if len(agents) == 1 else None,
+                    raw_logs,
+                    **extra,
+                )
+            except Exception as e:
+                with self._cond:
+                    self._failed += len(batches)
+                logger.warning(
+                    f"Queued ingest failed for {first.tenant_id}/{first.project_id} "
+                    f"({len(batches)} batches, {sum(b.size for b in batches)} lines): {e}"
+                )
+            finally:
+                with self._cond:
+                    self._active.discard(first.key)
+                    self._processed += len(batches)
+                    self._pipeline_runs += 1
+                    self._cond.notify_all()
+
+    # --------------------------------------------------
+    # Metrics
+    # --------------------------------------------------
+    def stats(self) -> dict:
+        with self._cond:
+            oldest = self._pending[0].enqueued_at if self._pending else None
+            return {
+                "running": self.running,
+                "workers": self.workers,
+                "depth": len(self._pending),
+                "max_depth": self.max_depth,
+                "queued_lines": sum(b.size for b in self._pending),
+                "oldest_age_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+                "last_lag_seconds": round(self._last_lag, 3),
+                "max_lag_seconds": round(self._max_lag, 3),
+                "accepted": self._accepted,
+                "rejected": self._rejected,
+                "processed": self._processed,
+                "pipeline_runs": self._pipeline_runs,
+                "failed": self._failed,
+            }
+
+
+def _from_settings() -> IngestQueue:
+    from src.core.config import settings
+
+    return IngestQueue(
+        max_depth=settings.INGEST_QUEUE_MAX_DEPTH,
+        workers=settings.INGEST_WORKERS,
+        coalesce_max_lines=settings.INGEST_COALESCE_MAX_LINES,
+    )
+
+
+ingest_queue = _from_settings()
@@ -4,53 +4,88 @@ from datetime import datetime, UTC
 
 from sqlalchemy.orm import Session
 
-from src.analysis.engine import AnalysisEngine
-from src.ingest.parser import parse_log_lines
+from src.analysis.rollups import record_analysis
+from src.db.session import release_connection
+from src.ingest.profiles import parser_profiles
+from src.ingest.workers import compute_batch, worker_pool
 from src.model.analysis_result import AnalysisResult
-from src.schemas.enums import AnalysisStrategy
 from src.realtime.broker import broker
 
 logger = logging.getLogger(__name__)
 
-# 싱글톤 구성 (hot path)
-analysis_engine = AnalysisEngine()
 
-
-def ingest_logs(*, db: Session, tenant_id: str, project_id: str, agent_id: str | None, raw_logs: list[str]):
+def ingest_logs(
+    *,
+    db: Session,
+    tenant_id: str,
+    project_id: str,
+    agent_id: str | None,
+    raw_logs: list[str],
+    records: list[dict] | None = None,
+):
     """
     Ingestion hot path:
-    - Rule engine evaluation (analysis_engine 내부에서 수행)
-    - Pattern mining (L0 — background collection)
+    - 요청당 1회 파싱 (ParsedBatch) — 마이닝 / 룰 평가 / SSE 이벤트가 공유
+      프로젝트 파서 프로파일이 있으면 포맷 감지·alias 탐색 없이 바로 파싱, 없으면 학습
+    - Rule engine evaluation + Pattern mining (L0 — background collection)
+      CPU 단계(compute_batch)는 INGEST_PROCESSES > 0 이면 tenant 샤드 워커 프로세스에서 실행,
+      여기서는 결과(패턴 delta / 룰 결과)만 저장
     - 의미 있는 신호면 완전한 분석 결과를 저장하고 SSE로 실시간 푸시
     - No raw log persistence
+    - `records`: agent 가 미리 묶은 반복 라인 (template, sample, count, first_ts, last_ts).
+      sample 만 파싱·마이닝하고 count 로 가중 — raw_logs 대신 사용
+
+    Returns a small summary (line count, parsed format breakdown, analysis id)
+    used for per-chunk accounting by /ingest/stream.
     """
-    # L0: Background pattern mining
+    profile = None
     try:
-        from src.learning.catalog import mine_and_upsert
+        profile = parser_profiles.get(db, tenant_id, project_id)
+    except Exception as e:
+        logger.warning(f"Parser profile lookup failed (non-fatal): {e}")
+    learning = profile is None and parser_profiles.learning_status(tenant_id, project_id) is not None
+    # CPU stage below holds no connection; the writes check one out again
+    release_connection(db)
 
-        parsed = parse_log_lines(raw_logs)
-        mine_and_upsert(
-            db=db,
-            tenant_id=tenant_id,
-            messages=raw_logs,
-            sources=[p.source for p in parsed],
-            levels=[p.level for p in parsed],
+    if worker_pool.enabled:
+        outcome = worker_pool.run(
+            tenant_id,
+            raw_logs,
+            profile=profile.spec if profile is not None else None,
+            keep_batch=learning,
+            records=records,
         )
-    except Exception as e:
+    else:
+        outcome = compute_batch(tenant_id, raw_logs, profile=profile, keep_batch=learning, records=records)
+
+    if learning and outcome.batch is not None:
+        try:
+            parser_profiles.observe(db, tenant_id, project_id, outcome.batch)
+        except Exception as e:
+            logger.warning(f"Parser profile learning failed (non-fatal): {e}")
+
+    # L0: Background pattern mining
+    if outcome.mining_error:
         # Pattern mining failure must not break ingest
-        logger.warning(f"Pattern mining failed (non-fatal): {e}")
+        logger.warning(f"Pattern mining failed (non-fatal): {outcome.mining_error}")
+    else:
+        try:
+            from src.learning.catalog import upsert_deltas
+
+            upsert_deltas(db, tenant_id, outcome.deltas)
+        except Exception as e:
+            logger.warning(f"Pattern mining failed (non-fatal): {e}")
 
     # ── 실시간: 의미 있는 신호면 분석 저장 + 이벤트 푸시 ──────────────
     analysis_id = None
     severity = None
     summary = None
     confidence = 0.0
+    if outcome.analysis_error:
+        logger.warning(f"Ingest analysis failed (non-fatal): {outcome.analysis_error}")
+    result = outcome.analysis
     try:
-        result = analysis_engine.analyze_test(
-            messages=raw_logs,
-            strategy=AnalysisStrategy.RULE,
-        )
-        if result.get("matched_rules"):
+        if result:
             analysis = AnalysisResult(
                 id=str(uuid.uuid4()),
                 tenant_id=tenant_id,
@@ -67,6 +102,7 @@ def ingest_logs(*, db: Session, tenant_id: str, project_id: str, agent_id: str |
                 received_at=datetime.now(UTC),
             )
             db.add(analysis)
+            record_analysis(db, tenant_id, project_id, analysis.severity, analysis.confidence, at=analysis.received_at)
             db.commit()
             analysis_id = analysis.id
             severity = result["severity"].value if hasattr(result["severity"], "value") else str(result["severity"])
@@ -84,6 +120,15 @@ def ingest_logs(*, db: Session, tenant_id: str, project_id: str, agent_id: str |
         "severity": severity,
         "summary": summary,
         "confidence": confidence,
-        "log_count": len(raw_logs),
+        "log_count": outcome.lines,
+        "first_ts": outcome.first_ts.isoformat() if outcome.first_ts else None,
+        "last_ts": outcome.last_ts.isoformat() if outcome.last_ts else None,
         "at": datetime.now(UTC).isoformat(),
     })
+
+    return {
+        "lines": outcome.lines,
+        "formats": outcome.formats,
+        "analysis_id": analysis_id,
+        "severity": severity,
+    }
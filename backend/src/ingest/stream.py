@@ -0,0 +1,114 @@
+"""Incremental line reader for POST /ingest/stream (bulk backfill).
+
+The request body is consumed piece by piece — optionally gunzipped on the
+fly — and split into lines that are handed out in fixed-size chunks, so
+memory stays bounded by the chunk size no matter how large the upload is.
+
+Body formats (one record per line):
+  - raw log lines (text/plain)
+  - NDJSON: a JSON object record is passed through as-is (the parser reads
+    it as a `json` log); a JSON string record is unwrapped to its text.
+
+Blank lines are skipped. Lines longer than `max_line_chars` characters are
+split so a single runaway line cannot grow the buffer without bound.
+"""
+from __future__ import annotations
+
+import codecs
+import json
+import zlib
+from typing import AsyncIterator
+
+# Decompressed output per inflate step — bounds memory on highly compressed input.
+_INFLATE_STEP = 1 << 20
+
+
+class StreamDecodeError(ValueError):
+    """Malformed body (bad or truncated gzip data)."""
+
+
+async def _inflate(pieces: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """gunzip an async byte stream (concatenated gzip members are supported)."""
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    fed = False   # current member has received input
+    async for piece in pieces:
+        data = piece
+        while data:
+            fed = True
+            try:
+                out = d.decompress(data, _INFLATE_STEP)
+            except zlib.error as e:
+                raise StreamDecodeError(f"invalid gzip body: {e}") from e
+            if out:
+                yield out
+            if d.eof:
+                # Next gzip member (e.g. `cat a.gz b.gz`).
+                data = d.unused_data
+                d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                fed = False
+            else:
+                data = d.unconsumed_tail
+    tail = d.flush()
+    if tail:
+        yield tail
+    if fed and not d.eof:
+        # flush() does not complain about a cut-off member — the lost tail
+        # would otherwise be reported as a successful upload.
+        raise StreamDecodeError("truncated gzip body")
+
+
+def _record(line: str) -> str:
+    """NDJSON string records → their text; everything else is the line itself."""
+    if line.startswith('"'):
+        try:
+            value = json.loads(line)
+        except ValueError:
+            return line
+        if isinstance(value, str):
+            return value
+    return line
+
+
+async def iter_line_chunks(
+    pieces: AsyncIterator[bytes],
+    *,
+    gzip: bool = False,
+    chunk_lines: int = 1000,
+    max_line_chars: int = 64 * 1024,
+) -> AsyncIterator[list[str]]:
+    """Yield lists of at most `chunk_lines` non-blank lines."""
+    source = _inflate(pieces) if gzip else pieces
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buf = ""
+    chunk: list[str] = []
+
+    def emit(line: str):
+        line = line.rstrip("\r")
+        for start in range(0, len(line), max_line_chars):
+            part = line[start:start + max_line_chars]
+            if part.strip():
+                chunk.append(_record(part))
+
+    async for data in source:
+        buf += decoder.decode(data)
+        lines = buf.split("\n")
+        buf = lines.pop()
+        if len(buf) > max_line_chars:
+            # Unterminated runaway line — flush the full-size prefix now.
+            cut = len(buf) - len(buf) % max_line_chars
+            lines.append(buf[:cut])
+            buf = buf[cut:]
+        for line in lines:
+            emit(line)
+            while len(chunk) >= chunk_lines:
+                yield chunk[:chunk_lines]
+                del chunk[:chunk_lines]
+
+    buf += decoder.decode(b"", final=True)
+    for line in buf.split("\n"):
+        emit(line)
+        while len(chunk) >= chunk_lines:
+            yield chunk[:chunk_lines]
+            del chunk[:chunk_lines]
+    if chunk:
+        yield chunk
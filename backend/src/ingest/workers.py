@@ -0,0 +1,224 @@
+"""
+CPU stage of the ingest pipeline, optionally in worker processes.
+
+Parsing, masking, Drain mining and rule evaluation are pure Python, so in
+threads they share one core under the GIL. `compute_batch` is that stage as
+one picklable function returning a compact `BatchOutcome` (pattern deltas,
+the rule result when something matched, batch stats). The parent keeps the
+DB work: it upserts the deltas, stores the analysis and publishes the event.
+
+With `INGEST_PROCESSES > 0` the stage runs in a `ShardedWorkerPool`: one
+single-process executor per shard, tenants assigned by a consistent hash
+ring. A tenant's Drain tree (`catalog._drain_trees`) therefore lives in
+exactly one worker process and is only ever touched by it, serially; adding
+a shard moves only ~1/N of the tenants. With 0 (default) it runs inline.
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchOutcome:
+    lines: int
+    formats: dict[str, int]
+    first_ts: datetime | None
+    last_ts: datetime | None
+    deltas: dict = field(default_factory=dict)   # pattern id -> PatternDelta
+    mining_error: str | None = None
+    analysis: dict | None = None                 # engine result, only when rules matched
+    analysis_error: str | None = None
+    batch: object | None = None                  # the ParsedBatch, only when asked for
+
+
+# ======================================================
+# The stage itself (runs in the parent or in a worker)
+# ======================================================
+
+_engine = None
+_profiles: dict[tuple, object] = {}
+
+
+def _analysis_engine():
+    global _engine
+    if _engine is None:
+        from src.analysis.engine import AnalysisEngine
+
+        _engine = AnalysisEngine()
+    return _engine
+
+
+def _compiled(profile):
+    """ProfileParser for a ProfileSpec (specs cross the process boundary)."""
+    from src.ingest.profiles import ProfileParser, ProfileSpec
+
+    if not isinstance(profile, ProfileSpec):
+        return profile
+    key = (profile.format, tuple(sorted(profile.fields.items())), profile.timestamp_format)
+    parser = _profiles.get(key)
+    if parser is None:
+        parser = _profiles[key] = ProfileParser(profile)
+    return parser
+
+
+def compute_batch(
+    tenant_id: str,
+    raw_logs: list[str],
+    *,
+    profile=None,
+    keep_batch: bool = False,
+    records: list[dict] | None = None,
+) -> BatchOutcome:
+    """
+    Parse, mine (into the tenant's tree in this process) and evaluate rules.
+    With `records` (agent-aggregated, see `parse_records`) `raw_logs` is
+    ignored and every stage weighs a record by its count.
+    """
+    from src.ingest.parser import parse_batch, parse_records
+    from src.learning.catalog import _get_tree, aggregate_hits, snapshot_tree
+    from src.schemas.enums import AnalysisStrategy
+
+    if records:
+        batch = parse_records(records, profile=_compiled(profile))
+    else:
+        batch = parse_batch(raw_logs, profile=_compiled(profile))
+    outcome = BatchOutcome(
+        lines=batch.line_count,
+        formats=batch.format_counts(),
+        first_ts=batch.first_ts,
+        last_ts=batch.last_ts,
+        batch=batch if keep_batch else None,
+    )
+
+    try:
+        # Drain은 원본 라인 기준으로 템플릿을 만든다 (기존 패턴 ID 유지).
+        _, outcome.deltas = aggregate_hits(
+            _get_tree(tenant_id),
+            batch.raw,
+            batch.sources,
+            batch.levels,
+            datetime.now(UTC).hour,
+            batch.counts,
+        )
+        snapshot_tree(tenant_id)
+    except Exception as e:
+        outcome.mining_error = str(e)
+
+    try:
+        result = _analysis_engine().analyze_parsed(batch, strategy=AnalysisStrategy.RULE)
+        if result.get("matched_rules"):
+            outcome.analysis = result
+    except Exception as e:
+        outcome.analysis_error = str(e)
+
+    return outcome
+
+
+# ======================================================
+# Consistent hashing
+# ======================================================
+
+class HashRing:
+    """Consistent hash ring with virtual nodes."""
+
+    def __init__(self, nodes: int, vnodes: int = 64):
+        self.nodes = nodes
+        points = sorted(
+            (self._hash(f"{node}#{v}"), node)
+            for node in range(nodes)
+            for v in range(vnodes)
+        )
+        self._keys = [h for h, _ in points]
+        self._nodes = [n for _, n in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def node_for(self, key: str) -> int:
+        i = bisect.bisect(self._keys, self._hash(key))
+        return self._nodes[i % len(self._nodes)]
+
+
+# ======================================================
+# Worker pool
+# ======================================================
+
+class ShardedWorkerPool:
+    def __init__(self, processes: int):
+        self.processes = processes
+        self.ring = HashRing(processes)
+        self._shards: list[ProcessPoolExecutor | None] = [None] * processes
+        self._lock = threading.Lock()
+        self._ctx = multiprocessing.get_context("spawn")  # the API process is threaded
+
+    @property
+    def enabled(self) -> bool:
+        return self.processes > 0
+
+    def _shard(self, index: int) -> ProcessPoolExecutor:
+        with self._lock:
+            executor = self._shards[index]
+            if executor is None:
+                executor = self._shards[index] = ProcessPoolExecutor(max_workers=1, mp_context=self._ctx)
+            return executor
+
+    def start(self) -> None:
+        for i in range(self.processes):
+            self._shard(i)
+
+    def stop(self) -> None:
+        from src.learning.catalog import flush_tree_snapshots
+
+        with self._lock:
+            shards, self._shards = self._shards, [None] * self.processes
+        for executor in shards:
+            if executor is None:
+                continue
+            # The trees live in the workers — flush their snapshots first.
+            try:
+                executor.submit(flush_tree_snapshots).result(timeout=60)
+            except Exception as e:
+                logger.warning(f"Drain snapshot flush in worker failed: {e}")
+            executor.shutdown(wait=True, cancel_futures=False)
+
+    def broadcast(self, fn, timeout: float = 30) -> list:
+        """Run `fn()` once in every shard (e.g. per-process stats), in shard order."""
+        futures = [self._shard(i).submit(fn) for i in range(self.processes)]
+        return [f.result(timeout=timeout) for f in futures]
+
+    def shard_for(self, tenant_id: str) -> int:
+        return self.ring.node_for(tenant_id)
+
+    def run(self, tenant_id: str, raw_logs: list[str], **kwargs) -> BatchOutcome:
+        """`compute_batch` on the tenant's shard; blocks the calling thread only."""
+        index = self.shard_for(tenant_id)
+        try:
+            return self._shard(index).submit(compute_batch, tenant_id, raw_logs, **kwargs).result()
+        except BrokenProcessPool:
+            # The worker died (OOM kill, segfault): its trees are gone (the new
+            # process warm-starts from snapshots, if enabled). Replace it and
+            # retry once on the fresh process.
+            logger.warning(f"Ingest worker {index} died — restarting it")
+            with self._lock:
+                self._shards[index] = None
+            return self._shard(index).submit(compute_batch, tenant_id, raw_logs, **kwargs).result()
+
+
+def _from_settings() -> ShardedWorkerPool:
+    from src.core.config import settings
+
+    return ShardedWorkerPool(settings.INGEST_PROCESSES)
+
+
+worker_pool = _from_settings()
@@ -3,29 +3,136 @@ Pattern Catalog — persists Drain clusters to the patterns table.
 
 Called from the ingest pipeline to silently accumulate patterns
 (L0 — background collection, no user-facing alerts yet).
+
+A batch is written in a constant number of round trips:
+
+  1. `aggregate_hits` — Drain + per-pattern deltas in memory
+     (count, source / level / hour histograms)
+  2. one `IN` query for the batch's pattern ids
+  3. GC of the tenant's oldest candidates, only when the (incrementally
+     tracked) tenant pattern count would exceed the cap
+  4. PostgreSQL: one `INSERT ... ON CONFLICT (id) DO UPDATE` that merges the
+     JSONB / array counters server-side. Other dialects merge in Python over
+     the rows fetched in step 2.
 """
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from datetime import datetime, UTC
 
+from sqlalchemy import delete, func, literal_column, select, text
 from sqlalchemy.orm import Session
 
 from src.learning.drain import DrainTree, LogCluster
 from src.learning.masking import mask_variables
+from src.learning.snapshots import tree_snapshots
+from src.learning.tree_cache import drain_trees as _drain_trees
 from src.model.pattern import Pattern
 
 
-# Module-level singleton (shared across ingest calls within the process).
-_drain_trees: dict[str, DrainTree] = {}
+# Per-tenant trees live in the memory-bounded `TreeCache` singleton
+# (`_drain_trees`, shared across ingest calls within the process).
+
+# tenant_id → pattern row count. Seeded with one COUNT per tenant per process
+# and kept up to date from inserts / GC; re-counted exactly before any GC,
+# so drift from other writers (API deletes, other workers) is harmless.
+_tenant_pattern_counts: dict[str, int] = {}
 
 MAX_PATTERNS_PER_TENANT = 10_000
 
+# Rows per INSERT statement (~20 bound columns each — well under the
+# 65535-parameter limit).
+UPSERT_CHUNK_SIZE = 1_000
+
 
 def _get_tree(tenant_id: str) -> DrainTree:
-    if tenant_id not in _drain_trees:
-        _drain_trees[tenant_id] = DrainTree()
-    return _drain_trees[tenant_id]
+    # Warm start from the tenant's snapshot (DRAIN_SNAPSHOT_DIR), if any.
+    return _drain_trees.get(tenant_id)
+
+
+def snapshot_tree(tenant_id: str) -> None:
+    """
+    After mining: periodic snapshot (no-op unless due), then evict idle /
+    over-budget trees of other tenants.
+    """
+    tree = _drain_trees.peek(tenant_id)
+    if tree is not None:
+        tree_snapshots.maybe_save(tenant_id, tree)
+    _drain_trees.enforce(keep=tenant_id)
+
+
+def flush_tree_snapshots() -> int:
+    """Write every changed tree in this process (shutdown hook)."""
+    return tree_snapshots.flush(dict(_drain_trees.items()))
+
+
+def drain_tree_report() -> dict:
+    """Per-tenant tree sizes in this process (admin endpoint)."""
+    return _drain_trees.report()
+
+
+# ======================================================
+# 1. In-memory aggregation
+# ======================================================
+
+@dataclass
+class PatternDelta:
+    """Everything one batch adds to a single pattern row."""
+    id: str
+    template: str
+    sample: str
+    count: int = 0
+    sources: dict[str, int] = field(default_factory=dict)
+    level_dist: dict[str, int] = field(default_factory=dict)
+    hourly_dist: list[int] = field(default_factory=lambda: [0] * 24)
+
+
+def aggregate_hits(
+    tree: DrainTree,
+    messages: list[str],
+    sources: list[str] | None = None,
+    levels: list[str] | None = None,
+    hour: int = 0,
+    counts: list[int] | None = None,
+) -> tuple[list[LogCluster], dict[str, PatternDelta]]:
+    """
+    Feed messages through Drain and fold the hits into per-pattern deltas.
+
+    The template recorded for an id is the one it had when hit — a cluster
+    whose template generalizes mid-batch gets a new id, exactly as the
+    per-line upsert did. With `counts` (agent-aggregated records) message i
+    goes through Drain once and counts `counts[i]` hits.
+    Returns (clusters seen, deltas by pattern id).
+    """
+    clusters_seen: dict[str, LogCluster] = {}
+    deltas: dict[str, PatternDelta] = {}
+
+    for i, msg in enumerate(messages):
+        cluster = tree.add(mask_variables(msg))
+        cid = cluster.cluster_id
+        clusters_seen[cid] = cluster
+
+        source = sources[i] if sources and i < len(sources) else "unknown"
+        level = levels[i] if levels and i < len(levels) else "INFO"
+        n = counts[i] if counts else 1
+
+        delta = deltas.get(cid)
+        if delta is None:
+            delta = PatternDelta(id=cid, template=cluster.template, sample=msg[:500])
+            deltas[cid] = delta
+        else:
+            delta.template = cluster.template
+        delta.count += n
+        delta.sources[source] = delta.sources.get(source, 0) + n
+        delta.level_dist[level] = delta.level_dist.get(level, 0) + n
+        delta.hourly_dist[hour] += n
+
+    return list(clusters_seen.values()), deltas
+
 
+# ======================================================
+# 2~4. Persistence
+# ======================================================
 
 def mine_and_upsert(
     *,
@@ -34,95 +141,223 @@ def mine_and_upsert(
     messages: list[str],
     sources: list[str] | None = None,
     levels: list[str] | None = None,
+    counts: list[int] | None = None,
 ) -> list[LogCluster]:
     """
     Process raw log messages through Drain and upsert results into DB.
+    `counts[i]` (optional) is how many lines message i stands for.
 
     Returns the list of LogClusters that the messages were assigned to.
     """
     tree = _get_tree(tenant_id)
     now = datetime.now(UTC)
-    hour = now.hour
 
-    clusters_seen: dict[str, LogCluster] = {}
+    clusters, deltas = aggregate_hits(tree, messages, sources, levels, now.hour, counts)
+    snapshot_tree(tenant_id)
+    upsert_deltas(db, tenant_id, deltas, now)
+    return clusters
 
-    for i, msg in enumerate(messages):
-        masked = mask_variables(msg)
-        cluster = tree.add(masked)
-        cid = cluster.cluster_id
-        clusters_seen[cid] = cluster
 
-        # Upsert pattern row
-        pattern = (
-            db.query(Pattern)
-            .filter(Pattern.id == cid, Pattern.tenant_id == tenant_id)
-            .first()
+def upsert_deltas(
+    db: Session,
+    tenant_id: str,
+    deltas: dict[str, PatternDelta],
+    now: datetime | None = None,
+) -> None:
+    """
+    Steps 2~4 for deltas aggregated elsewhere (e.g. by an ingest worker
+    process that owns the tenant's Drain tree).
+    """
+    if not deltas:
+        return
+    now = now or datetime.now(UTC)
+
+    # One IN query: which of the batch's ids already exist (and whose they are).
+    existing: dict[str, Pattern | str] = {}
+    postgres = db.get_bind().dialect.name == "postgresql"
+    if postgres:
+        rows = db.execute(
+            select(Pattern.id, Pattern.tenant_id).where(Pattern.id.in_(list(deltas)))
+        ).all()
+        existing = {pid: owner for pid, owner in rows}
+    else:
+        existing = {
+            p.id: p
+            for p in db.query(Pattern).filter(Pattern.id.in_(list(deltas))).all()
+        }
+
+    # Ids owned by another tenant are skipped (the id space is shared).
+    new_ids = [cid for cid in deltas if cid not in existing]
+    _enforce_limit(db, tenant_id, len(new_ids), protect=set(deltas))
+
+    if postgres:
+        inserted = _upsert_postgres(db, tenant_id, deltas, now)
+    else:
+        inserted = _merge_orm(db, tenant_id, deltas, existing, now)
+
+    db.commit()
+    _tenant_pattern_counts[tenant_id] = _tenant_pattern_counts.get(tenant_id, 0) + inserted
+
+
+def _tenant_count(db: Session, tenant_id: str, exact: bool = False) -> int:
+    if exact or tenant_id not in _tenant_pattern_counts:
+        _tenant_pattern_counts[tenant_id] = (
+            db.query(func.count(Pattern.id))
+            .filter(Pattern.tenant_id == tenant_id)
+            .scalar()
+        ) or 0
+    return _tenant_pattern_counts[tenant_id]
+
+
+def _enforce_limit(db: Session, tenant_id: str, incoming: int, protect: set[str]) -> None:
+    """GC: drop the tenant's oldest low-frequency candidates to make room."""
+    if incoming == 0 or _tenant_count(db, tenant_id) + incoming <= MAX_PATTERNS_PER_TENANT:
+        return
+
+    overflow = _tenant_count(db, tenant_id, exact=True) + incoming - MAX_PATTERNS_PER_TENANT
+    if overflow <= 0:
+        return
+
+    victims = (
+        select(Pattern.id)
+        .where(
+            Pattern.tenant_id == tenant_id,
+            Pattern.status == "candidate",
+            Pattern.id.not_in(protect),
         )
+        .order_by(Pattern.total_count.asc(), Pattern.last_seen.asc())
+        .limit(overflow)
+    )
+    result = db.execute(
+        delete(Pattern)
+        .where(Pattern.id.in_(victims.scalar_subquery()))
+        .execution_options(synchronize_session=False)
+    )
+    _tenant_pattern_counts[tenant_id] -= result.rowcount or 0
+
+
+# Server-side counter merges, referencing the existing row (`patterns`) and
+# the proposed row (`excluded`) of the ON CONFLICT clause.
+_MERGE_JSONB_COUNTS = (
+    "(SELECT COALESCE(jsonb_object_agg(k, n), '{{}}'::jsonb) FROM ("
+    "SELECT key AS k, SUM(value::bigint) AS n FROM ("
+    "SELECT * FROM jsonb_each_text(COALESCE(patterns.{col}, '{{}}'::jsonb)) "
+    "UNION ALL SELECT * FROM jsonb_each_text(excluded.{col})"
+    ") kv GROUP BY key) merged)"
+)
+_MERGE_HOURLY = (
+    "ARRAY(SELECT COALESCE(a, 0) + COALESCE(b, 0) "
+    "FROM unnest(patterns.hourly_dist, excluded.hourly_dist) WITH ORDINALITY AS u(a, b, i) "
+    "ORDER BY i)"
+)
 
-        source = sources[i] if sources and i < len(sources) else "unknown"
-        level = levels[i] if levels and i < len(levels) else "INFO"
 
+def build_upsert(tenant_id: str, deltas: list[PatternDelta], now: datetime):
+    """`INSERT ... ON CONFLICT (id) DO UPDATE` for one chunk of deltas."""
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    stmt = pg_insert(Pattern).values([
+        {
+            "id": d.id,
+            "tenant_id": tenant_id,
+            "template": d.template,
+            "sample": d.sample,
+            "total_count": d.count,
+            "first_seen": now,
+            "last_seen": now,
+            "sources": d.sources,
+            "level_dist": d.level_dist,
+            "hourly_dist": d.hourly_dist,
+            "status": "candidate",
+            "updated_at": now,
+        }
+        for d in deltas
+    ])
+    excluded = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[Pattern.id],
+        set_={
+            "template": excluded.template,
+            "total_count": Pattern.total_count + excluded.total_count,
+            "last_seen": excluded.last_seen,
+            "updated_at": excluded.updated_at,
+            "sources": text(_MERGE_JSONB_COUNTS.format(col="sources")),
+            "level_dist": text(_MERGE_JSONB_COUNTS.format(col="level_dist")),
+            "hourly_dist": text(_MERGE_HOURLY),
+        },
+        # Never touch another tenant's row that happens to share the id.
+        where=Pattern.tenant_id == excluded.tenant_id,
+    ).returning(Pattern.id, literal_column("(xmax = 0)").label("inserted"))
+
+
+def _upsert_postgres(
+    db: Session,
+    tenant_id: str,
+    deltas: dict[str, PatternDelta],
+    now: datetime,
+) -> int:
+    """Returns the number of newly inserted rows."""
+    # Sorted ids → concurrent batches lock rows in the same order.
+    ordered = [deltas[cid] for cid in sorted(deltas)]
+    inserted = 0
+    for start in range(0, len(ordered), UPSERT_CHUNK_SIZE):
+        chunk = ordered[start:start + UPSERT_CHUNK_SIZE]
+        rows = db.execute(build_upsert(tenant_id, chunk, now)).all()
+        inserted += sum(1 for _, is_new in rows if is_new)
+    return inserted
+
+
+def _merge_orm(
+    db: Session,
+    tenant_id: str,
+    deltas: dict[str, PatternDelta],
+    existing: dict[str, Pattern],
+    now: datetime,
+) -> int:
+    """Dialect-neutral path: merge into the rows fetched by the IN query."""
+    inserted = 0
+    for cid, d in deltas.items():
+        pattern = existing.get(cid)
         if pattern is None:
-            # Check tenant limit
-            count = (
-                db.query(Pattern)
-                .filter(Pattern.tenant_id == tenant_id)
-                .count()
-            )
-            if count >= MAX_PATTERNS_PER_TENANT:
-                # GC: remove oldest low-frequency candidate
-                oldest = (
-                    db.query(Pattern)
-                    .filter(
-                        Pattern.tenant_id == tenant_id,
-                        Pattern.status == "candidate",
-                    )
-                    .order_by(Pattern.total_count.asc(), Pattern.last_seen.asc())
-                    .first()
-                )
-                if oldest:
-                    db.delete(oldest)
-
-            pattern = Pattern(
+            db.add(Pattern(
                 id=cid,
                 tenant_id=tenant_id,
-                template=cluster.template,
-                sample=msg[:500],
-                total_count=1,
+                template=d.template,
+                sample=d.sample,
+                total_count=d.count,
                 first_seen=now,
                 last_seen=now,
-                sources={source: 1},
-                level_dist={level: 1},
-                hourly_dist=_inc_hour([0] * 24, hour),
+                sources=dict(d.sources),
+                level_dist=dict(d.level_dist),
+                hourly_dist=list(d.hourly_dist),
                 status="candidate",
-            )
-            db.add(pattern)
-        else:
-            pattern.template = cluster.template
-            pattern.total_count += 1
-            pattern.last_seen = now
-            pattern.updated_at = now
+            ))
+            inserted += 1
+            continue
+        if pattern.tenant_id != tenant_id:
+            continue
 
-            # Merge source counts
-            src_dict = dict(pattern.sources or {})
-            src_dict[source] = src_dict.get(source, 0) + 1
-            pattern.sources = src_dict
+        pattern.template = d.template
+        pattern.total_count += d.count
+        pattern.last_seen = now
+        pattern.updated_at = now
+        pattern.sources = _merge_counts(pattern.sources, d.sources)
+        pattern.level_dist = _merge_counts(pattern.level_dist, d.level_dist)
+        pattern.hourly_dist = _merge_hourly(pattern.hourly_dist, d.hourly_dist)
+    return inserted
 
-            # Merge level distribution
-            lvl_dict = dict(pattern.level_dist or {})
-            lvl_dict[level] = lvl_dict.get(level, 0) + 1
-            pattern.level_dist = lvl_dict
 
-            # Merge hourly distribution
-            hdist = list(pattern.hourly_dist or [0] * 24)
-            pattern.hourly_dist = _inc_hour(hdist, hour)
-
-    db.commit()
-    return list(clusters_seen.values())
+def _merge_counts(current: dict | None, delta: dict[str, int]) -> dict[str, int]:
+    merged = dict(current or {})
+    for key, n in delta.items():
+        merged[key] = merged.get(key, 0) + n
+    return merged
 
 
-def _inc_hour(dist: list[int], hour: int) -> list[int]:
-    while len(dist) < 24:
-        dist.append(0)
-    dist[hour] += 1
-    return dist
+def _merge_hourly(current: list[int] | None, delta: list[int]) -> list[int]:
+    merged = list(current or [])
+    while len(merged) < 24:
+        merged.append(0)
+    for hour, n in enumerate(delta):
+        merged[hour] += n
+    return merged
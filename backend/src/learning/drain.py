@@ -14,7 +14,31 @@ the Netscope ingest hot path.
 from __future__ import annotations
 
 import hashlib
+import struct
+import sys
+import threading
+import zlib
+from array import array
 from dataclasses import dataclass, field
+from operator import eq
+
+WILDCARD = "<*>"
+
+# Snapshot format (`DrainTree.to_bytes`): magic, then a zlib-compressed body of
+#   header   <HdIII  depth, sim_threshold, max_clusters, #strings, #ints
+#   strings  #strings uint32 UTF-8 byte lengths, then the concatenated bytes
+#   ints     one int64 stream walking the tree (see `_dump_node`)
+# Every distinct token / sample is stored once and referenced by index, so a
+# restored tree also shares one str object per distinct token.
+_SNAPSHOT_MAGIC = b"NSDRAIN1"
+_SNAPSHOT_HEADER = struct.Struct("<HdIII")
+
+# Samples are kept for display only — cap them so one huge line can't pin memory.
+_SAMPLE_MAX_CHARS = 512
+
+# Leaves with more clusters than this get an inverted index; smaller leaves
+# are scanned directly (a C-level token compare beats index bookkeeping).
+_INDEX_MIN_CLUSTERS = 8
 
 
 @dataclass
@@ -23,6 +47,17 @@ class LogCluster:
     template_tokens: list[str]
     count: int = 0
     sample: str = ""
+    # Insertion order within the leaf (tie-break), cached id and <*> count.
+    seq: int = field(default=0, repr=False, compare=False)
+    _id: str | None = field(default=None, init=False, repr=False, compare=False)
+    _wild: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name, value):
+        # Assigning a new template invalidates the cached id.
+        if name == "template_tokens":
+            object.__setattr__(self, "_id", None)
+            object.__setattr__(self, "_wild", value.count(WILDCARD))
+        object.__setattr__(self, name, value)
 
     @property
     def template(self) -> str:
@@ -31,16 +66,22 @@ class LogCluster:
     @property
     def cluster_id(self) -> str:
         """Deterministic ID from template content (SHA-1 prefix 12 chars)."""
-        return hashlib.sha1(self.template.encode()).hexdigest()[:12]
+        if self._id is None:
+            self._id = hashlib.sha1(self.template.encode()).hexdigest()[:12]
+        return self._id
 
 
 class _Node:
     """Internal prefix-tree node."""
-    __slots__ = ("children", "clusters")
+    __slots__ = ("children", "clusters", "index", "next_seq")
 
     def __init__(self):
         self.children: dict[str, _Node] = {}
         self.clusters: list[LogCluster] = []
+        # Leaf inverted index: (position, template token) → {seq: cluster}.
+        # Built once the leaf outgrows _INDEX_MIN_CLUSTERS.
+        self.index: dict[tuple[int, str], dict[int, LogCluster]] | None = None
+        self.next_seq = 0
 
 
 class DrainTree:
@@ -66,12 +107,26 @@ class DrainTree:
         self.max_clusters = max_clusters
         self._root: dict[int, _Node] = {}  # length -> root node
         self._cluster_count = 0
+        # Bumped by every add — snapshotting compares it to skip clean trees.
+        self.version = 0
+        # Held by `add` and `to_bytes`: ingest threads of the same tenant mine
+        # concurrently, and a snapshot must never see a half-applied add.
+        self.lock = threading.Lock()
+
+    @property
+    def cluster_count(self) -> int:
+        return self._cluster_count
 
     def add(self, masked_message: str) -> LogCluster:
         """
         Process a single masked log message, returning the cluster it
         was assigned to (existing or newly created).
         """
+        with self.lock:
+            return self._add(masked_message)
+
+    def _add(self, masked_message: str) -> LogCluster:
+        self.version += 1
         tokens = masked_message.split()
         length = len(tokens)
 
@@ -87,46 +142,268 @@ class DrainTree:
         for i in range(min(self.depth, length)):
             token = tokens[i]
             if token.startswith("<") and token.endswith(">"):
-                token = "<*>"  # wildcard group
+                token = WILDCARD  # wildcard group
             if token not in node.children:
-                node.children[token] = _Node()
+                node.children[sys.intern(token)] = _Node()
             node = node.children[token]
 
-        # Find best matching cluster at leaf
-        best_cluster = None
-        best_sim = 0.0
-
-        for cluster in node.clusters:
-            sim = self._similarity(tokens, cluster.template_tokens)
-            if sim > best_sim:
-                best_sim = sim
-                best_cluster = cluster
-
-        if best_cluster and best_sim >= self.sim_threshold:
-            # Merge into existing cluster
-            best_cluster.template_tokens = self._merge_tokens(
-                best_cluster.template_tokens, tokens
-            )
+        best_cluster, matches = self._best_match(node, tokens)
+        if best_cluster is not None and matches / length >= self.sim_threshold:
+            # Merge into existing cluster. Positions already <*> never match a
+            # masked token, so the template only changes if some other
+            # position mismatched.
+            if matches + best_cluster._wild < length or WILDCARD in tokens:
+                self._generalize(node, best_cluster, tokens)
             best_cluster.count += 1
             return best_cluster
 
         # Create new cluster
         if self._cluster_count >= self.max_clusters:
-            # Evict least-used cluster from this node
+            # Evict least-used cluster from this node (first one on ties)
             if node.clusters:
-                node.clusters.sort(key=lambda c: c.count)
-                evicted = node.clusters.pop(0)
+                evicted = min(node.clusters, key=lambda c: c.count)
+                self._remove(node, evicted)
                 self._cluster_count -= 1
 
         new_cluster = LogCluster(
-            template_tokens=list(tokens),
+            # Interned: `<NUM>`, common words etc. share one object across
+            # clusters and tenants.
+            template_tokens=list(map(sys.intern, tokens)),
             count=1,
-            sample=masked_message,
+            sample=masked_message[:_SAMPLE_MAX_CHARS],
+            seq=node.next_seq,
         )
+        node.next_seq += 1
         node.clusters.append(new_cluster)
+        if node.index is not None:
+            self._index_add(node, new_cluster)
+        elif len(node.clusters) > _INDEX_MIN_CLUSTERS:
+            node.index = {}
+            for cluster in node.clusters:
+                self._index_add(node, cluster)
         self._cluster_count += 1
         return new_cluster
 
+    def _best_match(self, node: _Node, tokens: list[str]) -> tuple[LogCluster | None, int]:
+        """
+        Cluster with the most matching positions (earliest on ties) and that
+        count — the same choice as scoring every cluster with `_similarity`.
+
+        Small leaves are scanned directly. Larger ones count matches from the
+        leaf's inverted index instead: only clusters sharing a token with the
+        message at the same position are touched. A position whose
+        posting holds every cluster in the leaf (the shared prefix, usually)
+        adds to a common base instead of to each cluster, and if even a
+        cluster matching every remaining position could not reach the
+        threshold, scoring is skipped entirely.
+        """
+        clusters = node.clusters
+        if not clusters:
+            return None, 0
+
+        if node.index is None:
+            best, best_matches = None, 0
+            for cluster in clusters:
+                matches = sum(map(eq, tokens, cluster.template_tokens))
+                if matches > best_matches:
+                    best, best_matches = cluster, matches
+            return best, best_matches
+
+        n = len(clusters)
+        base = 0
+        partial: list[dict[int, LogCluster]] = []
+        for key in enumerate(tokens):
+            posting = node.index.get(key)
+            if not posting:
+                continue
+            if len(posting) == n:
+                base += 1
+            else:
+                partial.append(posting)
+
+        # Early exit: no cluster can reach the threshold.
+        if (base + len(partial)) / len(tokens) < self.sim_threshold:
+            return None, 0
+
+        extra: dict[int, int] = {}
+        for posting in partial:
+            for seq in posting:
+                extra[seq] = extra.get(seq, 0) + 1
+
+        if extra:
+            top = max(extra.values())
+            seq = min(s for s, c in extra.items() if c == top)
+            best = next(p[seq] for p in partial if seq in p)
+            return best, base + top
+        if base == 0:
+            return None, 0
+        # Every cluster matches only the shared positions — earliest wins.
+        return clusters[0], base
+
+    def _generalize(self, node: _Node, cluster: LogCluster, tokens: list[str]) -> None:
+        """Replace mismatched template positions with <*>, keeping the index in sync."""
+        template = cluster.template_tokens
+        merged = self._merge_tokens(template, tokens)
+        if merged == template:
+            return
+        if node.index is not None:
+            for pos, (old, new) in enumerate(zip(template, merged)):
+                if old != new:
+                    posting = node.index[(pos, old)]
+                    del posting[cluster.seq]
+                    if not posting:
+                        del node.index[(pos, old)]
+                    node.index.setdefault((pos, new), {})[cluster.seq] = cluster
+        cluster.template_tokens = merged
+
+    @staticmethod
+    def _index_add(node: _Node, cluster: LogCluster) -> None:
+        for key in enumerate(cluster.template_tokens):
+            node.index.setdefault(key, {})[cluster.seq] = cluster
+
+    @staticmethod
+    def _remove(node: _Node, cluster: LogCluster) -> None:
+        node.clusters.remove(cluster)
+        if node.index is None:
+            return
+        for key in enumerate(cluster.template_tokens):
+            posting = node.index[key]
+            del posting[cluster.seq]
+            if not posting:
+                del node.index[key]
+
+    # --------------------------------------------------
+    # Snapshots
+    # --------------------------------------------------
+
+    def to_bytes(self) -> bytes:
+        """Compact snapshot of the whole tree (clusters, counts, leaf order)."""
+        strings: dict[str, int] = {}
+        ints = array("q")
+
+        def sid(s: str) -> int:
+            i = strings.get(s)
+            if i is None:
+                i = strings[s] = len(strings)
+            return i
+
+        with self.lock:
+            ints.append(len(self._root))
+            for length, node in self._root.items():
+                ints.append(length)
+                self._dump_node(node, ints, sid)
+
+        encoded = [s.encode() for s in strings]
+        body = b"".join((
+            _SNAPSHOT_HEADER.pack(self.depth, self.sim_threshold, self.max_clusters, len(encoded), len(ints)),
+            array("I", map(len, encoded)).tobytes(),
+            b"".join(encoded),
+            ints.tobytes(),
+        ))
+        return _SNAPSHOT_MAGIC + zlib.compress(body, 1)
+
+    @staticmethod
+    def _dump_node(node: _Node, ints: array, sid) -> None:
+        # next_seq, #clusters, per cluster [count, seq, sample, #tokens, tokens...],
+        # #children, per child [key, node...]
+        ints.append(node.next_seq)
+        ints.append(len(node.clusters))
+        for c in node.clusters:
+            ints.extend((c.count, c.seq, sid(c.sample), len(c.template_tokens)))
+            ints.extend(map(sid, c.template_tokens))
+        ints.append(len(node.children))
+        for key, child in node.children.items():
+            ints.append(sid(key))
+            DrainTree._dump_node(child, ints, sid)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> DrainTree:
+        """Inverse of `to_bytes`. Raises ValueError on a corrupt snapshot."""
+        if not data.startswith(_SNAPSHOT_MAGIC):
+            raise ValueError("not a Drain snapshot")
+        try:
+            body = zlib.decompress(data[len(_SNAPSHOT_MAGIC):])
+            depth, sim, max_clusters, n_strings, n_ints = _SNAPSHOT_HEADER.unpack_from(body)
+            pos = _SNAPSHOT_HEADER.size
+            lengths = array("I")
+            lengths.frombytes(body[pos:pos + 4 * n_strings])
+            pos += 4 * n_strings
+            strings: list[str] = []
+            for n in lengths:
+                strings.append(sys.intern(body[pos:pos + n].decode()))
+                pos += n
+            ints = array("q")
+            ints.frombytes(body[pos:pos + 8 * n_ints])
+        except (zlib.error, struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"corrupt Drain snapshot: {e}") from e
+        if len(ints) != n_ints:
+            raise ValueError("corrupt Drain snapshot: truncated")
+
+        tree = cls(depth=depth, sim_threshold=sim, max_clusters=max_clusters)
+        it = iter(ints)
+        try:
+            for _ in range(next(it)):
+                length = next(it)
+                tree._root[length] = tree._load_node(it, strings)
+        except (StopIteration, IndexError) as e:
+            raise ValueError("corrupt Drain snapshot: bad tree") from e
+        return tree
+
+    def _load_node(self, it, strings: list[str]) -> _Node:
+        node = _Node()
+        node.next_seq = next(it)
+        for _ in range(next(it)):
+            count, seq, sample, n_tokens = next(it), next(it), next(it), next(it)
+            node.clusters.append(LogCluster(
+                template_tokens=[strings[next(it)] for _ in range(n_tokens)],
+                count=count,
+                sample=strings[sample],
+                seq=seq,
+            ))
+        self._cluster_count += len(node.clusters)
+        if len(node.clusters) > _INDEX_MIN_CLUSTERS:
+            node.index = {}
+            for cluster in node.clusters:
+                self._index_add(node, cluster)
+        for _ in range(next(it)):
+            key = strings[next(it)]
+            node.children[key] = self._load_node(it, strings)
+        return node
+
+    # --------------------------------------------------
+    # Memory accounting
+    # --------------------------------------------------
+
+    def memory_bytes(self) -> int:
+        """
+        Approximate heap held by the tree: nodes, clusters, token lists,
+        samples and leaf indexes. Each distinct token object is counted once
+        (interned tokens shared with other trees are counted in each).
+        """
+        getsizeof = sys.getsizeof
+        seen: set[int] = set()
+        total = getsizeof(self._root)
+        stack = list(self._root.values())
+        while stack:
+            node = stack.pop()
+            total += _NODE_BYTES + getsizeof(node.children) + getsizeof(node.clusters)
+            if node.index is not None:
+                total += getsizeof(node.index)
+                for posting in node.index.values():
+                    total += _INDEX_KEY_BYTES + getsizeof(posting)
+            for c in node.clusters:
+                total += _CLUSTER_BYTES + getsizeof(c.template_tokens) + getsizeof(c.sample)
+                for token in c.template_tokens:
+                    if id(token) not in seen:
+                        seen.add(id(token))
+                        total += getsizeof(token)
+            for key, child in node.children.items():
+                if id(key) not in seen:
+                    seen.add(id(key))
+                    total += getsizeof(key)
+                stack.append(child)
+        return total
+
     def all_clusters(self) -> list[LogCluster]:
         """Return all clusters in the tree."""
         result: list[LogCluster] = []
@@ -161,6 +438,13 @@ class DrainTree:
     ) -> list[str]:
         """Merge two token sequences, replacing mismatched positions with <*>."""
         return [
-            t if t == n else "<*>"
+            t if t == n else WILDCARD
             for t, n in zip(template, new_tokens)
         ]
+
+
+_probe = LogCluster(template_tokens=[])
+_CLUSTER_BYTES = sys.getsizeof(_probe) + sys.getsizeof(_probe.__dict__)
+_NODE_BYTES = sys.getsizeof(_Node())
+_INDEX_KEY_BYTES = sys.getsizeof((0, "")) + sys.getsizeof(0)
+del _probe
@@ -4,10 +4,26 @@ Variable masking for log template extraction.
 Replaces dynamic values (numbers, UUIDs, IPs, timestamps, paths, etc.)
 with placeholder tokens so that structurally identical messages collapse
 into a single template.
+
+Masking runs once per ingested line and once per line in `match_patterns`,
+so `MaskingEngine` keeps it cheap:
+
+- pre-scan: a handful of substring / character-count probes (digit, 4+ "-",
+  7+ ":", 2+ "/", "@", quotes, ...) per message; masks whose required
+  characters are absent are skipped. Placeholder tokens only contain letters
+  and `<>`, so no intermediate string has more of those characters than the
+  raw message — skipping is exact.
+- cache: optional bounded LRU keyed on the raw message, for repetitive lines.
+- fused (opt-in): the applicable masks joined into one alternation, applied
+  in a single `sub` pass, alternatives in precedence order. Not the default:
+  a leftmost alternation is not exactly the sequential pipeline when masks
+  overlap (e.g. `/srv/10.0.0.1/x` is `<PATH>` fused but `/srv/<IP>/x`
+  sequentially), and templates already in the catalog depend on the latter.
 """
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 
 # Order matters: more specific patterns first
 _MASKS: list[tuple[re.Pattern, str]] = [
@@ -36,10 +52,129 @@ _MASKS: list[tuple[re.Pattern, str]] = [
     (re.compile(r"'[^']{2,}'"), "<STR>"),
 ]
 
+# --------------------------------------------------
+# Pre-scan gates
+# --------------------------------------------------
+
+_DIGIT = "\\d"   # any Unicode decimal digit (what `\d` matches)
+_LONG = "len16"  # message has at least 16 characters
+
+_DIGIT_RE = re.compile(r"\d")
+_SUBSTRING_PROBES = ("@", "0x", '"', "'")
+# (char, minimum occurrences) — the feature is named e.g. "-4"
+_COUNT_PROBES = (("-", 2), ("-", 4), (":", 2), (":", 7), (".", 1), (".", 3), ("/", 2))
+
+# Features each mask needs in the raw message to possibly match (parallel to _MASKS).
+_GATES: list[frozenset[str]] = [
+    frozenset({"-4"}),                # UUID
+    frozenset({_DIGIT, "-2", ":2"}),  # ISO timestamp
+    frozenset({_DIGIT}),              # epoch
+    frozenset({":7"}),                # IPv6
+    frozenset({_DIGIT, ".3"}),        # IPv4
+    frozenset({"@", ".1"}),           # email
+    frozenset({"/2"}),                # path
+    frozenset({_LONG}),               # base64
+    frozenset({"0x"}),                # hex
+    frozenset({_DIGIT}),              # number
+    frozenset({'"'}),                 # "quoted"
+    frozenset({"'"}),                 # 'quoted'
+]
+
+
+def _features(message: str) -> frozenset[str]:
+    # Substitutions only ever remove these characters, so counts taken on the
+    # raw message are upper bounds for every intermediate string.
+    found = [p for p in _SUBSTRING_PROBES if p in message]
+    counts = {}
+    for char, n in _COUNT_PROBES:
+        count = counts.get(char)
+        if count is None:
+            count = counts[char] = message.count(char)
+        if count >= n:
+            found.append(f"{char}{n}")
+    if _DIGIT_RE.search(message) is not None:
+        found.append(_DIGIT)
+    if len(message) >= 16:
+        found.append(_LONG)
+    return frozenset(found)
+
+
+# ======================================================
+# Engine
+# ======================================================
+
+class MaskingEngine:
+    """Applies `masks` in order, skipping those the pre-scan rules out."""
+
+    def __init__(
+        self,
+        masks: list[tuple[re.Pattern, str]] | None = None,
+        gates: list[frozenset[str]] | None = None,
+        *,
+        cache_size: int = 0,
+        fused: bool = False,
+    ):
+        self.masks = _MASKS if masks is None else masks
+        # Custom masks without gates are always applied.
+        if gates is None:
+            gates = _GATES if masks is None else [frozenset()] * len(self.masks)
+        self.gates = gates
+        self.fused = fused
+        self.cache_size = cache_size
+        # feature set -> applicable masks (sequential) or fused (regex, tokens)
+        self._plans: dict[frozenset[str], object] = {}
+        self._cached = lru_cache(maxsize=cache_size)(self._mask) if cache_size > 0 else None
+
+    def mask(self, message: str) -> str:
+        if self._cached is not None:
+            return self._cached(message)
+        return self._mask(message)
+
+    def cache_info(self):
+        return self._cached.cache_info() if self._cached is not None else None
+
+    def _mask(self, message: str) -> str:
+        features = _features(message)
+        plan = self._plans.get(features)
+        if plan is None:
+            plan = self._plans[features] = self._plan(features)
+
+        if self.fused:
+            if not plan:
+                return message
+            regex, tokens = plan
+            return regex.sub(lambda m: tokens[m.lastindex], message)
+
+        result = message
+        for pattern, token in plan:
+            result = pattern.sub(token, result)
+        return result
+
+    def _plan(self, features: frozenset[str]):
+        applicable = [
+            (pattern, token)
+            for (pattern, token), needs in zip(self.masks, self.gates)
+            if needs <= features
+        ]
+        if not self.fused:
+            return applicable
+        if not applicable:
+            return ()
+        # One capturing group per alternative (the masks themselves only use
+        # non-capturing groups), so `lastindex` identifies the winning mask.
+        regex = re.compile("|".join(f"({p.pattern})" for p, _ in applicable))
+        return regex, [None] + [token for _, token in applicable]
+
+
+def _from_settings() -> MaskingEngine:
+    from src.core.config import settings
+
+    return MaskingEngine(cache_size=settings.MASK_CACHE_SIZE, fused=settings.MASK_FUSED)
+
+
+_engine = _from_settings()
+
 
 def mask_variables(message: str) -> str:
     """Replace dynamic values with placeholder tokens."""
-    result = message
-    for pattern, token in _MASKS:
-        result = pattern.sub(token, result)
-    return result
+    return _engine.mask(message)
@@ -3,15 +3,156 @@ PatternMatcher — matches incoming logs against the pattern catalog.
 
 Used during analysis to find known patterns and include their history
 in the analysis result (L2).
+
+Only labeled / promoted patterns can contribute, so each tenant's are
+compiled once into a `PatternIndex` kept in memory:
+
+- a template is a token-position matcher: same token count, every non-`<*>`
+  position equal. A template stored as `disk /dev/<*> full` therefore still
+  matches after the live Drain tree generalized further or split the id.
+- per token count, an inverted index `(position, token) -> patterns`; one
+  pass over a masked message's tokens counts fixed-position hits, and a
+  pattern matches when all its fixed positions hit. The most specific match
+  (most fixed positions) wins, like Drain's single cluster assignment.
+- the `/patterns` label, dismiss and feedback endpoints update the index in
+  place (`pattern_index.update`); a full reload every `_INDEX_TTL` seconds
+  picks up changes made by other workers and fresh history counters.
 """
 from __future__ import annotations
 
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+
 from sqlalchemy.orm import Session
 
+from src.learning.drain import WILDCARD
 from src.learning.masking import mask_variables
-from src.learning.drain import DrainTree
 from src.model.pattern import Pattern
 
+_INDEX_TTL = 300.0          # seconds before a tenant's index is rebuilt from the DB
+_ACTIVE = ("labeled", "promoted")
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledPattern:
+    pattern_id: str
+    length: int
+    fixed: tuple[tuple[int, str], ...]   # (position, token) that must match
+    result: dict                         # match_patterns() entry
+
+
+def _tokens(masked: str) -> list[str]:
+    # Same tokenization as DrainTree.add.
+    return masked.split() or ["<EMPTY>"]
+
+
+def compile_pattern(p: Pattern) -> CompiledPattern:
+    tokens = _tokens(p.template)
+    return CompiledPattern(
+        pattern_id=p.id,
+        length=len(tokens),
+        fixed=tuple((i, t) for i, t in enumerate(tokens) if t != WILDCARD),
+        result=_to_result(p),
+    )
+
+
+# ======================================================
+# Per-tenant index
+# ======================================================
+
+class _TenantIndex:
+    __slots__ = ("patterns", "by_length", "expires")
+
+    def __init__(self, patterns: dict[str, CompiledPattern], expires: float):
+        self.patterns = patterns
+        self.expires = expires
+        # length -> (position, token) -> pattern ids; length -> ids with no fixed position
+        self.by_length: dict[int, tuple[dict[tuple[int, str], list[str]], list[str]]] = {}
+        for cp in patterns.values():
+            postings, wild = self.by_length.setdefault(cp.length, ({}, []))
+            if not cp.fixed:
+                wild.append(cp.pattern_id)
+            for key in cp.fixed:
+                postings.setdefault(key, []).append(cp.pattern_id)
+
+    def match(self, masked: str) -> CompiledPattern | None:
+        tokens = _tokens(masked)
+        entry = self.by_length.get(len(tokens))
+        if entry is None:
+            return None
+        postings, wild = entry
+        hits: dict[str, int] = defaultdict(int)
+        for key in enumerate(tokens):
+            for pid in postings.get(key, ()):
+                hits[pid] += 1
+        best = None
+        for pid, n in hits.items():
+            cp = self.patterns[pid]
+            if n == len(cp.fixed) and (
+                best is None
+                or n > len(best.fixed)
+                or (n == len(best.fixed) and pid < best.pattern_id)
+            ):
+                best = cp
+        if best is None and wild:
+            best = self.patterns[min(wild)]
+        return best
+
+
+class PatternIndex:
+    """Compiled labeled / promoted patterns per tenant."""
+
+    def __init__(self, ttl: float = _INDEX_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._tenants: dict[str, _TenantIndex] = {}
+
+    def get(self, db: Session, tenant_id: str) -> _TenantIndex:
+        with self._lock:
+            index = self._tenants.get(tenant_id)
+        if index is not None and index.expires > time.monotonic():
+            return index
+        patterns = self._load(db, tenant_id)
+        index = _TenantIndex(patterns, time.monotonic() + self.ttl)
+        with self._lock:
+            self._tenants[tenant_id] = index
+        return index
+
+    def update(self, pattern: Pattern) -> None:
+        """Apply one mutated pattern (label / dismiss / feedback) to a loaded index."""
+        with self._lock:
+            index = self._tenants.get(pattern.tenant_id)
+            if index is None:
+                return   # loaded on next use
+            patterns = dict(index.patterns)
+            if pattern.status in _ACTIVE:
+                patterns[pattern.id] = compile_pattern(pattern)
+            elif patterns.pop(pattern.id, None) is None:
+                return
+            # Rebuilt copy-on-write: concurrent matchers keep the old index.
+            self._tenants[pattern.tenant_id] = _TenantIndex(patterns, index.expires)
+
+    def invalidate(self, tenant_id: str | None = None) -> None:
+        with self._lock:
+            if tenant_id is None:
+                self._tenants.clear()
+            else:
+                self._tenants.pop(tenant_id, None)
+
+    @staticmethod
+    def _load(db: Session, tenant_id: str) -> dict[str, CompiledPattern]:
+        rows = (
+            db.query(Pattern)
+            .filter(Pattern.tenant_id == tenant_id, Pattern.status.in_(_ACTIVE))
+            .all()
+        )
+        return {p.id: compile_pattern(p) for p in rows}
+
+
+pattern_index = PatternIndex()
+
 
 def match_patterns(
     *,
@@ -20,61 +161,46 @@ def match_patterns(
     messages: list[str],
 ) -> list[dict]:
     """
-    Match raw log messages against the tenant's pattern catalog.
+    Match raw log messages against the tenant's labeled / promoted patterns.
 
-    Returns a list of matched patterns with their history:
-    - labeled/promoted patterns contribute scores
-    - candidate patterns are included as reference only (score=0)
+    Returns one entry per matched pattern with its score and history.
+    The DB is only read when the tenant's index is missing or expired.
     """
-    # Build a temp Drain tree from messages to get cluster IDs
-    tree = DrainTree(depth=4, sim_threshold=0.4)
-    cluster_ids: set[str] = set()
+    if not messages:
+        return []
+    index = pattern_index.get(db, tenant_id)
+    if not index.patterns:
+        return []
 
+    matched: dict[str, dict] = {}
     for msg in messages:
-        masked = mask_variables(msg)
-        cluster = tree.add(masked)
-        cluster_ids.add(cluster.cluster_id)
+        cp = index.match(mask_variables(msg))
+        if cp is not None and cp.pattern_id not in matched:
+            matched[cp.pattern_id] = cp.result
+    return [dict(r, history=dict(r["history"])) for r in matched.values()]
 
-    if not cluster_ids:
-        return []
 
-    # Lookup patterns in DB
-    patterns = (
-        db.query(Pattern)
-        .filter(
-            Pattern.tenant_id == tenant_id,
-            Pattern.id.in_(cluster_ids),
-            Pattern.status != "dismissed",
-        )
-        .all()
-    )
+def _to_result(p: Pattern) -> dict:
+    effective_score = 0.0
+    if p.status in _ACTIVE:
+        effective_score = p.score_seed + p.score_adjust
 
-    result = []
-    for p in patterns:
-        effective_score = 0.0
-        if p.status in ("labeled", "promoted"):
-            effective_score = p.score_seed + p.score_adjust
-
-        # Compute average severity from level_dist
-        avg_severity = _avg_severity(p.level_dist or {})
-
-        result.append({
-            "pattern_id": p.id,
-            "label": p.label,
-            "display_name": p.display_name,
-            "template": p.template,
-            "score": round(effective_score, 4),
-            "status": p.status,
-            "history": {
-                "total_count": p.total_count,
-                "last_seen": p.last_seen.isoformat() if p.last_seen else None,
-                "avg_severity": avg_severity,
-                "confirm_count": p.confirm_count,
-                "dismiss_count": p.dismiss_count,
-            },
-        })
-
-    return result
+    return {
+        "pattern_id": p.id,
+        "label": p.label,
+        "display_name": p.display_name,
+        "template": p.template,
+        "score": round(effective_score, 4),
+        "status": p.status,
+        "history": {
+            "total_count": p.total_count,
+            "last_seen": p.last_seen.isoformat() if p.last_seen else None,
+            # Compute average severity from level_dist
+            "avg_severity": _avg_severity(p.level_dist or {}),
+            "confirm_count": p.confirm_count,
+            "dismiss_count": p.dismiss_count,
+        },
+    }
 
 
 def _avg_severity(level_dist: dict) -> str:
@@ -0,0 +1,123 @@
+"""
+Drain tree snapshots — warm start across restarts and deploys.
+
+Without them every restart begins with empty trees, and the first hours of
+traffic rebuild clusters whose templates drift from the stored
+`Pattern.template` until they re-converge. With `DRAIN_SNAPSHOT_DIR` set:
+
+- a tenant's tree is loaded lazily from `<dir>/<tenant>.drain` on first use
+- after mining, a tree changed since its last save is written again once
+  `DRAIN_SNAPSHOT_INTERVAL_SECONDS` have passed (on the thread that just
+  mined it — no background thread, works the same in worker processes)
+- on shutdown every changed tree is flushed
+
+Files are `DrainTree.to_bytes()` snapshots written atomically (temp file +
+rename). A corrupt or unreadable snapshot is logged and ignored.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from urllib.parse import quote
+
+from src.learning.drain import DrainTree
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    def __init__(self, directory: str | None, interval: float = 300.0):
+        self.directory = directory
+        self.interval = interval
+        self._lock = threading.Lock()
+        # tenant_id -> (tree version at last save/load, monotonic time of it)
+        self._saved: dict[str, tuple[int, float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def path(self, tenant_id: str) -> str:
+        return os.path.join(self.directory, f"{quote(tenant_id, safe='')}.drain")
+
+    def load(self, tenant_id: str) -> DrainTree | None:
+        if not self.enabled:
+            return None
+        path = self.path(tenant_id)
+        try:
+            with open(path, "rb") as f:
+                tree = DrainTree.from_bytes(f.read())
+        except FileNotFoundError:
+            tree = None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring Drain snapshot {path}: {e}")
+            tree = None
+        with self._lock:
+            self._saved[tenant_id] = (tree.version if tree else 0, time.monotonic())
+        return tree
+
+    def save(self, tenant_id: str, tree: DrainTree) -> bool:
+        if not self.enabled:
+            return False
+        # Read before serialising: an add in between only makes the next
+        # maybe_save write again. to_bytes holds the tree's lock.
+        version = tree.version
+        data = tree.to_bytes()
+        path = self.path(tenant_id)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Drain snapshot {path} failed: {e}")
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+        with self._lock:
+            self._saved[tenant_id] = (version, time.monotonic())
+        return True
+
+    def _dirty(self, tenant_id: str, tree: DrainTree) -> tuple[int, float] | None:
+        with self._lock:
+            saved = self._saved.get(tenant_id, (0, 0.0))
+        return saved if tree.version != saved[0] else None
+
+    def maybe_save(self, tenant_id: str, tree: DrainTree) -> bool:
+        """Save if the tree changed and the last save is older than the interval."""
+        if not self.enabled:
+            return False
+        saved = self._dirty(tenant_id, tree)
+        if saved is None or time.monotonic() - saved[1] < self.interval:
+            return False
+        return self.save(tenant_id, tree)
+
+    def flush(self, trees: dict[str, DrainTree]) -> int:
+        """Save every changed tree (shutdown). Returns how many were written."""
+        if not self.enabled:
+            return 0
+        return sum(
+            1 for tenant_id, tree in list(trees.items())
+            if self._dirty(tenant_id, tree) is not None and self.save(tenant_id, tree)
+        )
+
+    def forget(self, tenant_id: str) -> None:
+        with self._lock:
+            self._saved.pop(tenant_id, None)
+
+
+def _from_settings() -> SnapshotStore:
+    from src.core.config import settings
+
+    return SnapshotStore(
+        settings.DRAIN_SNAPSHOT_DIR,
+        interval=settings.DRAIN_SNAPSHOT_INTERVAL_SECONDS,
+    )
+
+
+tree_snapshots = _from_settings()
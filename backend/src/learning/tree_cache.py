@@ -0,0 +1,212 @@
+"""
+Memory-bounded cache of per-tenant Drain trees.
+
+Every tenant that ever ingested used to keep its `DrainTree` (up to
+`max_clusters` clusters with token lists and samples) for the life of the
+process. `TreeCache` bounds that:
+
+- idle eviction: trees unused for `DRAIN_TREE_IDLE_SECONDS` are dropped —
+  only with `DRAIN_SNAPSHOT_DIR` set, so a quiet tenant never loses its tree
+- memory budget: while the estimated total exceeds `DRAIN_CACHE_MAX_MB`,
+  least recently used trees are dropped (never the one just mined, nor one
+  handed out within `busy_seconds` — another ingest thread may still be
+  mining it, and changes made after the eviction flush would be lost)
+- an evicted tree that changed since its last snapshot is saved first, so
+  with `DRAIN_SNAPSHOT_DIR` set it comes back unchanged on next use; without
+  snapshots the tenant restarts with an empty tree (its patterns stay in the
+  DB, new clusters re-converge to the same templates)
+
+Sizes are `DrainTree.memory_bytes()` estimates, re-measured after mining at
+most every `measure_interval` seconds per tree. Eviction runs on the thread
+that just mined (`enforce`), like the periodic snapshots — no background
+thread, so it works the same in ingest worker processes.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from src.learning.drain import DrainTree
+from src.learning.snapshots import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    tree: DrainTree
+    last_used: float
+    bytes: int = 0
+    measured_version: int = -1
+    measured_at: float = 0.0
+
+
+class TreeCache:
+    def __init__(
+        self,
+        snapshots: SnapshotStore,
+        *,
+        max_bytes: int = 0,
+        idle_seconds: float = 0,
+        measure_interval: float = 30.0,
+        busy_seconds: float = 30.0,
+    ):
+        self.snapshots = snapshots
+        self.max_bytes = max_bytes          # 0 = no budget
+        self.idle_seconds = idle_seconds    # 0 = no idle eviction
+        self.measure_interval = measure_interval
+        self.busy_seconds = busy_seconds    # handed out this recently = possibly still being mined
+        self._lock = threading.RLock()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()  # LRU first
+        self.evictions = 0
+
+    # --------------------------------------------------
+    # Mapping-style access
+    # --------------------------------------------------
+
+    def get(self, tenant_id: str) -> DrainTree:
+        """The tenant's tree, loaded from its snapshot or created on first use."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is not None:
+                entry.last_used = now
+                self._entries.move_to_end(tenant_id)
+                return entry.tree
+        # Snapshot I/O outside the lock; a concurrent loader of the same tenant loses.
+        tree = self.snapshots.load(tenant_id) or DrainTree()
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is None:
+                entry = self._entries[tenant_id] = _Entry(tree, now)
+            entry.last_used = now
+            self._entries.move_to_end(tenant_id)
+            return entry.tree
+
+    def peek(self, tenant_id: str) -> DrainTree | None:
+        """The tenant's tree if resident — no load, no LRU update."""
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            return entry.tree if entry is not None else None
+
+    def __contains__(self, tenant_id: str) -> bool:
+        with self._lock:
+            return tenant_id in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def items(self) -> list[tuple[str, DrainTree]]:
+        with self._lock:
+            return [(t, e.tree) for t, e in self._entries.items()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # --------------------------------------------------
+    # Accounting / eviction
+    # --------------------------------------------------
+
+    def _measure(self, entry: _Entry, now: float, force: bool = False) -> int:
+        tree = entry.tree
+        if entry.measured_version == tree.version:
+            return entry.bytes
+        if not force and entry.measured_version >= 0 and now - entry.measured_at < self.measure_interval:
+            return entry.bytes
+        try:
+            entry.bytes = tree.memory_bytes()
+        except RuntimeError:  # mutated by a concurrent ingest thread — keep the old figure
+            return entry.bytes
+        entry.measured_version = tree.version
+        entry.measured_at = now
+        return entry.bytes
+
+    def evict(self, tenant_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.pop(tenant_id, None)
+        if entry is None:
+            return False
+        if self.snapshots.enabled:
+            self.snapshots.flush({tenant_id: entry.tree})
+        self.snapshots.forget(tenant_id)
+        self.evictions += 1
+        logger.info(f"Evicted Drain tree of {tenant_id} ({entry.tree.cluster_count} clusters, ~{entry.bytes} bytes)")
+        return True
+
+    def enforce(self, keep: str | None = None) -> list[str]:
+        """
+        Drop idle trees, then LRU trees while over budget. `keep` (the tenant
+        just mined) and trees handed out within `busy_seconds` are never
+        evicted, so the cache may stay over budget until they go quiet.
+        Returns the evicted tenant ids.
+        """
+        if not self.max_bytes and not self.idle_seconds:
+            return []
+        now = time.monotonic()
+        victims: list[str] = []
+        with self._lock:
+            entries = list(self._entries.items())   # LRU first
+            if self.idle_seconds:
+                for tenant_id, entry in entries:
+                    if tenant_id != keep and now - entry.last_used >= self.idle_seconds:
+                        victims.append(tenant_id)
+            if self.max_bytes:
+                total = sum(self._measure(e, now) for t, e in entries if t not in victims)
+                for tenant_id, entry in entries:
+                    if total <= self.max_bytes:
+                        break
+                    if tenant_id == keep or tenant_id in victims:
+                        continue
+                    if now - entry.last_used < self.busy_seconds:
+                        continue
+                    victims.append(tenant_id)
+                    total -= entry.bytes
+        for tenant_id in victims:
+            self.evict(tenant_id)
+        return victims
+
+    def report(self) -> dict:
+        """Per-tenant sizes (fresh measurement) for the admin endpoint."""
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.items())
+        tenants = [
+            {
+                "tenant_id": tenant_id,
+                "clusters": entry.tree.cluster_count,
+                "bytes": self._measure(entry, now, force=True),
+                "idle_seconds": round(now - entry.last_used, 1),
+                "version": entry.tree.version,
+            }
+            for tenant_id, entry in entries
+        ]
+        tenants.sort(key=lambda t: t["bytes"], reverse=True)
+        return {
+            "trees": len(tenants),
+            "bytes": sum(t["bytes"] for t in tenants),
+            "max_bytes": self.max_bytes,
+            "idle_seconds": self.idle_seconds,
+            "evictions": self.evictions,
+            "tenants": tenants,
+        }
+
+
+def _from_settings() -> TreeCache:
+    from src.core.config import settings
+    from src.learning.snapshots import tree_snapshots
+
+    # Without snapshots an idle eviction throws the tree away; only the
+    # memory budget may do that.
+    return TreeCache(
+        tree_snapshots,
+        max_bytes=settings.DRAIN_CACHE_MAX_MB * 1024 * 1024,
+        idle_seconds=settings.DRAIN_TREE_IDLE_SECONDS if tree_snapshots.enabled else 0,
+    )
+
+
+drain_trees = _from_settings()
@@ -1,7 +1,12 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from src.api.v1.logs import router as logs_router
 from src.api.v1.analysis import router as analysis_router
 from src.api.v1.ingest import router as ingest_router
@@ -12,10 +17,52 @@ from src.api.v1.test import router as test_router
 from src.api.v1.health import router as health_router
 from src.api.v1.patterns import router as patterns_router
 from src.api.v1.events import router as events_router
+from src.api.v1.admin import router as admin_router
+from src.api.v1.pagination import NEXT_CURSOR_HEADER
 from src.core.config import settings
+from src.db.async_session import async_reads
+from src.ingest.queue import ingest_queue
+from src.ingest.workers import worker_pool
+from src.learning.catalog import flush_tree_snapshots
+from src.realtime.broker import broker
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="NETSCOPE AI")
+logger = logging.getLogger(__name__)
+
+
+def _ensure_partitions() -> None:
+    from src.db.partitions import ensure_all
+    from src.db.session import engine
+
+    try:
+        with engine.begin() as conn:
+            created = ensure_all(conn, settings.DB_PARTITIONING)
+        if created:
+            logger.info(f"Created partitions: {', '.join(created)}")
+    except Exception as e:
+        logger.warning(f"Partition maintenance failed (non-fatal): {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Accept-and-enqueue ingest: workers live for the app's lifetime and
+    # drain the queue on shutdown.
+    if settings.DB_PARTITIONING:
+        _ensure_partitions()
+    if worker_pool.enabled:
+        worker_pool.start()
+    if settings.INGEST_ASYNC:
+        ingest_queue.start()
+    yield
+    if ingest_queue.running:
+        ingest_queue.stop()
+    worker_pool.stop()
+    flush_tree_snapshots()
+    broker.close()
+    await async_reads.dispose()
+
+
+app = FastAPI(title="NETSCOPE AI", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,8 +70,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # OPTIONS 포함
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # keyset pagination (src/api/v1/pagination.py)
 )
 
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    # Every pooled connection stayed busy for DB_POOL_TIMEOUT: shed the
+    # request quickly instead of queueing it behind the pool.
+    logger.warning(f"DB pool exhausted: {request.method} {request.url.path}")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database busy, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 app.include_router(logs_router)
 app.include_router(analysis_router)
 app.include_router(ingest_router)
@@ -34,4 +95,5 @@ app.include_router(auth_router)
 app.include_router(test_router)
 app.include_router(health_router)
 app.include_router(patterns_router)
-app.include_router(events_router)
\ No newline at end of file
+app.include_router(events_router)
+app.include_router(admin_router)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, DateTime, Text, Enum
+from sqlalchemy import Column, String, Float, DateTime, Text, Enum, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime, UTC
 
@@ -12,7 +12,7 @@ class AnalysisResult(Base):
     id = Column(String, primary_key=True)
 
     # 🔥 멀티테넌시 / 프로젝트 단위
-    tenant_id = Column(String, nullable=False, index=True)
+    tenant_id = Column(String, nullable=False)  # leading column of the composite indexes
     project_id = Column(String, nullable=False, index=True)
 
     # 🔥 리포트 핵심 요약
@@ -48,3 +48,14 @@ class AnalysisResult(Base):
         default=lambda: datetime.now(UTC),
         nullable=False,
     )
+
+    # 🔥 핫 쿼리: tenant(+project) 필터 + received_at 범위/정렬 (리포트 목록, 주간, 개요)
+    #    개요의 "최근 분석"은 severity/confidence 를 INCLUDE 해 인덱스만으로 응답 (PostgreSQL)
+    __table_args__ = (
+        Index("ix_analysis_results_tenant_project_received_at", "tenant_id", "project_id", "received_at"),
+        Index(
+            "ix_analysis_results_tenant_received_at", "tenant_id", "received_at",
+            postgresql_include=["severity", "confidence"],
+        ),
+        Index("ix_analysis_results_received_at", "received_at"),
+    )
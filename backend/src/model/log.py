@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Enum as SAEnum
+from sqlalchemy import Column, String, DateTime, Index, Enum as SAEnum
 from datetime import datetime, UTC
 
 from src.db.base import Base
@@ -11,7 +11,7 @@ class Log(Base):
     id = Column(String, primary_key=True)
 
     # 🔥 멀티테넌시 / 프로젝트 단위
-    tenant_id = Column(String(50), nullable=False, index=True)
+    tenant_id = Column(String(50), nullable=False)  # leading column of the composite indexes
     project_id = Column(String(100), nullable=False, index=True)
 
     # 🔥 로그 출처 (어디서 왔는지)
@@ -46,3 +46,11 @@ class Log(Base):
 
     # 선택 정보
     host = Column(String, nullable=True)
+
+    # 🔥 핫 쿼리: tenant + project 필터 + 시간 정렬/범위 (목록, 대시보드, 보고서)
+    #    received_at 단독 인덱스는 retention(`received_at < cutoff`)용
+    __table_args__ = (
+        Index("ix_logs_tenant_project_timestamp", "tenant_id", "project_id", "timestamp"),
+        Index("ix_logs_tenant_project_received_at", "tenant_id", "project_id", "received_at"),
+        Index("ix_logs_received_at", "received_at"),
+    )
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime, UTC
+
+from src.db.base import Base
+
+
+class ParserProfile(Base):
+    """Per-project parse profile: fixed format, field mapping and timestamp format."""
+    __tablename__ = "parser_profiles"
+
+    tenant_id = Column(String, primary_key=True)
+    project_id = Column(String, primary_key=True)
+
+    format = Column(String, nullable=False)                # json | kv | syslog | plain
+    fields = Column(JSONB, nullable=False, default=dict)   # {"message": "msg", "timestamp": "@timestamp", ...}
+    timestamp_format = Column(String, nullable=True)       # iso | epoch_s | epoch_ms | syslog | strptime pattern
+    origin = Column(String, nullable=False, default="learned")  # learned | declared
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+        nullable=False,
+    )
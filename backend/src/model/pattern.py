@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, Index
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY
 from datetime import datetime, UTC
 
@@ -9,7 +9,7 @@ class Pattern(Base):
     __tablename__ = "patterns"
 
     id = Column(String, primary_key=True)  # sha1 prefix (12 chars)
-    tenant_id = Column(String, nullable=False, index=True)
+    tenant_id = Column(String, nullable=False)  # leading column of the list index
 
     # Template & sample
     template = Column(Text, nullable=False)
@@ -50,6 +50,11 @@ class Pattern(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        # GET /patterns keyset order: (total_count, last_seen, id) DESC, scanned backwards.
+        Index("ix_patterns_tenant_total_count_last_seen_id", "tenant_id", "total_count", "last_seen", "id"),
+    )
+
 
 class PatternFeedback(Base):
     __tablename__ = "pattern_feedback"
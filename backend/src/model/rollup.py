@@ -0,0 +1,36 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime
+from datetime import datetime, UTC
+
+from src.db.base import Base
+
+
+class HourlyRollup(Base):
+    """Per (tenant, project, hour) counters for dashboards — maintained on write."""
+    __tablename__ = "hourly_rollups"
+
+    tenant_id = Column(String, primary_key=True)
+    project_id = Column(String, primary_key=True)
+    bucket = Column(DateTime(timezone=True), primary_key=True)   # hour start (UTC)
+
+    # logs.level 별 건수
+    logs_debug = Column(Integer, nullable=False, default=0)
+    logs_info = Column(Integer, nullable=False, default=0)
+    logs_warn = Column(Integer, nullable=False, default=0)
+    logs_error = Column(Integer, nullable=False, default=0)
+
+    # analysis_results.severity 별 건수
+    analyses_low = Column(Integer, nullable=False, default=0)
+    analyses_medium = Column(Integer, nullable=False, default=0)
+    analyses_high = Column(Integer, nullable=False, default=0)
+    analyses_critical = Column(Integer, nullable=False, default=0)
+
+    # 평균 confidence = confidence_sum / confidence_count
+    confidence_sum = Column(Float, nullable=False, default=0.0)
+    confidence_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+        nullable=False,
+    )
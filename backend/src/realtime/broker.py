@@ -1,45 +1,266 @@
-"""In-memory event broker for Server-Sent Events (single-process dev stack).
+"""Event broker for Server-Sent Events.
 
-The ingest hot path is synchronous (runs in a threadpool); the SSE endpoint is
-an async generator. Rather than bridge threads with a loop, we keep a small
-thread-safe ring buffer of recent events. Each SSE subscriber tracks the last
-event id it has seen and pulls newer ones for its tenant on a short interval.
+The ingest hot path publishes from synchronous code (threadpool / queue
+workers); the SSE endpoint consumes from an async generator. `EventBroker` is
+the interface between the two, with two backends selected by `EVENT_BROKER`:
 
-NOTE: in-memory => correct only for a single uvicorn process. For multi-worker /
-multi-instance deployments, swap this for Redis pub/sub or Postgres LISTEN/NOTIFY.
+  memory  (default) single-process. Per-tenant ring buffers, and subscribers
+          are woken through an `asyncio.Event` (set thread-safely via
+          `loop.call_soon_threadsafe`) — no polling, and a subscriber only
+          ever looks at its own tenant's newest events. Buffers of tenants
+          with no subscriber and no event for `idle_seconds` are dropped, so
+          memory follows active tenants, not every tenant ever seen.
+  redis   multi-process / multi-instance. One Redis Stream per tenant
+          (`XADD ... MAXLEN ~ N`, `XREAD BLOCK`), so an event published by
+          any uvicorn worker reaches subscribers on every worker.
+
+Event ids are opaque strings, increasing per tenant. The SSE endpoint sends
+them as `id:` lines and a reconnecting EventSource passes the last one back
+in `Last-Event-ID`, which `resume_cursor` turns into a cursor — events
+published during the gap are replayed as long as they are still buffered.
 """
 from __future__ import annotations
 
+import asyncio
 import itertools
+import json
+import logging
+import re
 import threading
+import time
 from collections import deque
 
+logger = logging.getLogger(__name__)
+
 
 class EventBroker:
-    def __init__(self, maxlen: int = 1000):
-        self._events: deque[tuple[int, dict]] = deque(maxlen=maxlen)
+    """Interface shared by the backends."""
+
+    def publish(self, event: dict) -> str:
+        """Append an event for `event["tenant_id"]`; returns its id."""
+        raise NotImplementedError
+
+    async def resume_cursor(self, tenant_id: str, last_event_id: str | None) -> str:
+        """
+        Cursor to subscribe from: `last_event_id` if it is valid and still
+        meaningful, otherwise the tenant's latest id (live only).
+        """
+        raise NotImplementedError
+
+    async def wait(self, tenant_id: str, cursor: str, timeout: float) -> list[tuple[str, dict]]:
+        """Events after `cursor` — blocks up to `timeout` seconds for the first one."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+# ======================================================
+# In-process backend
+# ======================================================
+
+class InMemoryBroker(EventBroker):
+    def __init__(self, maxlen: int = 1000, idle_seconds: float = 600):
+        self.maxlen = maxlen
+        self.idle_seconds = idle_seconds    # 0 = keep every tenant's buffer
+        self._events: dict[str, deque[tuple[int, dict]]] = {}
+        self._published_at: dict[str, float] = {}
+        self._next_prune = 0.0
+        self._waiters: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
         self._lock = threading.Lock()
         self._counter = itertools.count(1)
+        self._last = 0
 
-    def publish(self, event: dict) -> int:
-        """Append an event; returns its monotonic id."""
+    def publish(self, event: dict) -> str:
+        tenant_id = event.get("tenant_id")
+        now = time.monotonic()
         with self._lock:
             eid = next(self._counter)
-            self._events.append((eid, event))
-            return eid
+            self._last = eid
+            buf = self._events.get(tenant_id)
+            if buf is None:
+                buf = self._events[tenant_id] = deque(maxlen=self.maxlen)
+            buf.append((eid, event))
+            self._published_at[tenant_id] = now
+            if self.idle_seconds and now >= self._next_prune:
+                self._prune(now)
+            waiters = list(self._waiters.get(tenant_id, ()))
+        for loop, ev in waiters:
+            try:
+                loop.call_soon_threadsafe(ev.set)
+            except RuntimeError:  # loop already closed
+                pass
+        return str(eid)
+
+    def _prune(self, now: float) -> None:
+        """Drop idle, unsubscribed tenants' buffers. Caller holds the lock."""
+        for tenant_id, published_at in list(self._published_at.items()):
+            if now - published_at >= self.idle_seconds and tenant_id not in self._waiters:
+                del self._events[tenant_id], self._published_at[tenant_id]
+        # At most one sweep per idle period keeps publish O(1) amortised.
+        self._next_prune = now + self.idle_seconds
 
-    def latest_id(self) -> int:
+    def latest_id(self, tenant_id: str | None = None) -> int:
         with self._lock:
-            return self._events[-1][0] if self._events else 0
+            if tenant_id is None:
+                return self._last
+            buf = self._events.get(tenant_id)
+            return buf[-1][0] if buf else self._last
 
     def since(self, last_id: int, tenant_id: str) -> list[tuple[int, dict]]:
         """Events newer than last_id that belong to the given tenant."""
         with self._lock:
-            return [
-                (eid, e)
-                for (eid, e) in self._events
-                if eid > last_id and e.get("tenant_id") == tenant_id
-            ]
+            buf = self._events.get(tenant_id)
+            if not buf:
+                return []
+            # Walk back from the newest — cost is the number of new events.
+            newer = []
+            for eid, evt in reversed(buf):
+                if eid <= last_id:
+                    break
+                newer.append((eid, evt))
+        newer.reverse()
+        return newer
+
+    async def resume_cursor(self, tenant_id: str, last_event_id: str | None) -> str:
+        latest = self.latest_id(tenant_id)
+        if last_event_id and last_event_id.isdigit():
+            cursor = int(last_event_id)
+            # Ids from before a restart (counter reset) are meaningless here.
+            if cursor <= self._last:
+                return str(cursor)
+        return str(latest)
+
+    async def wait(self, tenant_id: str, cursor: str, timeout: float) -> list[tuple[str, dict]]:
+        last_id = int(cursor)
+        events = self.since(last_id, tenant_id)
+        if events:
+            return [(str(eid), evt) for eid, evt in events]
+
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.setdefault(tenant_id, set()).add(waiter)
+        try:
+            # Re-check after registering so a publish in between is not missed.
+            events = self.since(last_id, tenant_id)
+            if not events:
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), timeout)
+                except asyncio.TimeoutError:
+                    return []
+                events = self.since(last_id, tenant_id)
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(tenant_id)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._waiters[tenant_id]
+        return [(str(eid), evt) for eid, evt in events]
+
+
+# ======================================================
+# Redis Streams backend (multi-process)
+# ======================================================
+
+_STREAM_ID_RE = re.compile(r"^\d+-\d+$")
+
+
+class RedisStreamBroker(EventBroker):
+    def __init__(self, url: str, maxlen: int = 1000, prefix: str = "netscope:events:"):
+        from src.infrastructure.redis import sync_client
+
+        self.url = url
+        self.maxlen = maxlen
+        self.prefix = prefix
+        self._sync = sync_client(url)
+        self._async = None  # created lazily on the serving event loop
+
+    def _key(self, tenant_id: str) -> str:
+        return f"{self.prefix}{tenant_id}"
+
+    def publish(self, event: dict) -> str:
+        try:
+            return self._sync.xadd(
+                self._key(event.get("tenant_id")),
+                {"data": json.dumps(event, ensure_ascii=False)},
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        except Exception as e:
+            # Realtime push is best-effort — never fail ingest over it.
+            logger.warning(f"Event publish to redis failed: {e}")
+            return ""
+
+    def _client(self):
+        if self._async is None:
+            from src.infrastructure.redis import async_client
+
+            self._async = async_client(self.url)
+        return self._async
+
+    async def resume_cursor(self, tenant_id: str, last_event_id: str | None) -> str:
+        if last_event_id and _STREAM_ID_RE.match(last_event_id):
+            return last_event_id
+        try:
+            latest = await self._client().xrevrange(self._key(tenant_id), count=1)
+        except Exception as e:
+            # Auto-generated stream ids are "<ms>-<seq>", so "now" is a valid
+            # live-only cursor without asking Redis.
+            logger.warning(f"Event cursor lookup in redis failed: {e}")
+            return f"{int(time.time() * 1000)}-0"
+        return latest[0][0] if latest else "0-0"
+
+    async def wait(self, tenant_id: str, cursor: str, timeout: float) -> list[tuple[str, dict]]:
+        try:
+            reply = await self._client().xread(
+                {self._key(tenant_id): cursor},
+                block=max(1, int(timeout * 1000)),
+                count=100,
+            )
+        except Exception as e:
+            # Keep the SSE stream open (heartbeats) and retry on the next call.
+            logger.warning(f"Event read from redis failed: {e}")
+            await asyncio.sleep(timeout)
+            return []
+        events: list[tuple[str, dict]] = []
+        for _key, entries in reply or []:
+            for eid, fields in entries:
+                try:
+                    events.append((eid, json.loads(fields["data"])))
+                except (KeyError, ValueError):
+                    continue
+        return events
+
+    def close(self) -> None:
+        self._sync.close()
+
+
+def create_broker(
+    backend: str = "memory",
+    *,
+    redis_url: str | None = None,
+    maxlen: int = 1000,
+    idle_seconds: float = 600,
+) -> EventBroker:
+    if backend == "redis":
+        if not redis_url:
+            raise RuntimeError("EVENT_BROKER=redis requires REDIS_URL")
+        return RedisStreamBroker(redis_url, maxlen=maxlen)
+    if backend != "memory":
+        raise RuntimeError(f"Unknown EVENT_BROKER backend: {backend}")
+    return InMemoryBroker(maxlen=maxlen, idle_seconds=idle_seconds)
+
+
+def _from_settings() -> EventBroker:
+    from src.core.config import settings
+
+    return create_broker(
+        settings.EVENT_BROKER,
+        redis_url=settings.REDIS_URL,
+        maxlen=settings.EVENT_BUFFER_SIZE,
+        idle_seconds=settings.EVENT_BUFFER_IDLE_SECONDS,
+    )
 
 
-broker = EventBroker()
+broker = _from_settings()
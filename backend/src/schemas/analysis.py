@@ -70,3 +70,24 @@ class AnalysisResultDTO(BaseModel):
     received_at: datetime = Field(
         default_factory=lambda: datetime.now(UTC)
     )
+
+
+class AnalysisResultSummaryDTO(BaseModel):
+    """
+    분석 결과 목록용 DTO — 보고서 본문(report_sections)·조사 메모(notes) 제외.
+    본문은 단건 조회(`GET /reports/{id}`)에서만 로드
+    """
+    id: str
+    summary: str
+    severity: SeverityLevel
+    confidence: float = Field(ge=0.0, le=1.0)
+
+    suspected_causes: List[str] = Field(default_factory=list)
+    recommended_actions: List[str] = Field(default_factory=list)
+    matched_rules: List[str] = Field(default_factory=list)
+
+    investigation_status: str = Field(default="open")
+    resolution: str | None = None
+
+    strategy_used: str = Field(default="rule")
+    received_at: datetime
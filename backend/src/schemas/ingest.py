@@ -1,10 +1,30 @@
-from pydantic import BaseModel, Field
+from datetime import datetime
 from typing import List
 
+from pydantic import BaseModel, Field, model_validator
+
+
+class IngestRecord(BaseModel):
+    """A run of identical (masked) lines collapsed by the agent (`--aggregate`)."""
+    template: str = Field(..., description="Masked line (agent-side masking, informational)")
+    sample: str = Field(..., min_length=1, description="One raw line of the run")
+    count: int = Field(..., ge=1, description="Lines the record stands for")
+    first_ts: datetime
+    last_ts: datetime
+
 
 class IngestPayload(BaseModel):
     logs: List[str] = Field(
-        ...,
-        min_items=1,
+        default_factory=list,
         description="Raw log lines (stdout/stderr/system)",
-    )
\ No newline at end of file
+    )
+    records: List[IngestRecord] = Field(
+        default_factory=list,
+        description="Pre-aggregated lines; exclusive with `logs`",
+    )
+
+    @model_validator(mode="after")
+    def _one_kind(self):
+        if bool(self.logs) == bool(self.records):
+            raise ValueError("exactly one of `logs` / `records` must be a non-empty list")
+        return self
@@ -21,3 +21,30 @@ class ProjectResponse(BaseModel):
     id: str
     name: str
     created_at: datetime
+
+
+class ParserProfileRequest(BaseModel):
+    """
+    파서 프로파일 선언 요청 — 이후 배치는 포맷 감지/alias 탐색 없이 이 매핑으로 파싱
+    """
+    format: str = Field(..., description="json | kv | syslog | plain")
+    fields: dict[str, str] = Field(
+        default_factory=dict,
+        description='역할 → 키. 역할: message, level, source, timestamp, host (예: {"timestamp": "@timestamp"})',
+    )
+    timestamp_format: str | None = Field(
+        default=None,
+        description="iso | epoch_s | epoch_ms | syslog | strptime 패턴 (예: %d/%b/%Y:%H:%M:%S %z)",
+    )
+
+
+class ParserProfileResponse(BaseModel):
+    """
+    파서 프로파일 응답 DTO
+    """
+    project_id: str
+    format: str
+    fields: dict[str, str]
+    timestamp_format: str | None
+    origin: str  # learned | declared
+    updated_at: datetime
@@ -0,0 +1,174 @@
+"""netscope-agent: spool recovery / acks / disk cap, rotation-safe tailing."""
+import importlib.util
+import os
+import sys
+import threading
+from pathlib import Path
+
+_AGENT = Path(__file__).resolve().parents[1] / "netscope-agent" / "netscope-agent.py"
+
+
+def _load_agent():
+    spec = importlib.util.spec_from_file_location("netscope_agent", _AGENT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+agent = _load_agent()
+
+BODY = b"x" * 100
+RECORD = agent._RECORD.size + len(BODY)
+GO = threading.Event()   # never set: next() returns whatever is ready
+
+
+def _spool(directory, *, max_bytes=1 << 30, segment_bytes=1 << 30):
+    return agent.Spool(str(directory), max_bytes=max_bytes, segment_bytes=segment_bytes)
+
+
+def _segments(directory) -> list[str]:
+    return sorted(n for n in os.listdir(directory) if n.endswith(".spool"))
+
+
+# ======================================================
+# Spool
+# ======================================================
+
+def test_restart_resends_only_unacked_batches(tmp_path):
+    spool = _spool(tmp_path)
+    for i in range(3):
+        spool.append(b"batch-%d" % i, 10, False)
+    spool.ack(spool.next(GO))                  # persisted prefix: 1
+    spool.next(GO)                             # in flight at crash time, never acked
+    spool.close()
+
+    spool = _spool(tmp_path)
+    assert spool.pending_batches == 2
+    assert [spool.next(GO)[2] for _ in range(2)] == [b"batch-1", b"batch-2"]
+
+
+def test_torn_last_record_is_truncated(tmp_path):
+    spool = _spool(tmp_path)
+    spool.append(BODY, 1, False)
+    spool.append(BODY, 1, False)
+    spool.close()
+    seg = tmp_path / _segments(tmp_path)[0]
+    with open(seg, "ab") as f:                 # crash halfway through a third append
+        f.write(agent._RECORD.pack(len(BODY), 1, 0) + BODY[:40])
+
+    spool = _spool(tmp_path)
+    assert seg.stat().st_size == 2 * RECORD
+    assert spool.pending_batches == 2
+    spool.append(b"after", 1, False)           # goes to a fresh segment
+    assert [spool.next(GO)[2] for _ in range(3)] == [BODY, BODY, b"after"]
+
+
+def test_out_of_order_acks_advance_the_prefix_once_contiguous(tmp_path):
+    spool = _spool(tmp_path, segment_bytes=3 * RECORD)     # rolls after the third record
+    for _ in range(3):
+        spool.append(BODY, 5, False)
+    first, second, third = (spool.next(GO) for _ in range(3))
+    seg = tmp_path / _segments(tmp_path)[0]
+    ack_file = seg.with_suffix(".ack")
+
+    spool.ack(third)
+    spool.ack(second)
+    assert not ack_file.exists()               # record 0 still outstanding
+    assert spool.pending_batches == 1
+
+    spool.ack(first)
+    assert not seg.exists() and not ack_file.exists()      # fully acked, no longer written
+    assert spool.pending_batches == 0
+
+
+def test_partial_ack_prefix_is_persisted(tmp_path):
+    spool = _spool(tmp_path)
+    for _ in range(3):
+        spool.append(BODY, 5, False)
+    first, second, _ = (spool.next(GO) for _ in range(3))
+    spool.ack(second)
+    spool.ack(first)
+    ack_file = tmp_path / _segments(tmp_path)[0].replace(".spool", ".ack")
+    assert ack_file.read_text() == "2"
+    assert not ack_file.with_suffix(".ack.tmp").exists()
+
+
+def test_cap_drops_oldest_segment_and_counts_only_unsent(tmp_path):
+    spool = _spool(tmp_path, max_bytes=4 * RECORD, segment_bytes=3 * RECORD)
+    for _ in range(3):
+        spool.append(BODY, 10, False)          # segment 1 full → roll
+    in_flight = spool.next(GO)
+    spool.ack(spool.next(GO))                  # record 1 acked out of order, record 0 still sending
+    spool.append(BODY, 10, False)
+    spool.append(BODY, 10, False)              # 5 records > cap → segment 1 dropped
+
+    # Only record 2 was never handed out; record 0 is delivered by its sender.
+    assert spool.stats == {"dropped_batches": 1, "dropped_lines": 10}
+    assert spool.pending_batches == 2
+    spool.ack(in_flight)                       # late ack for a dropped segment is ignored
+    assert spool.stats == {"dropped_batches": 1, "dropped_lines": 10}
+    spool.close()
+
+    assert _spool(tmp_path).stats == {"dropped_batches": 1, "dropped_lines": 10}
+
+
+# ======================================================
+# Tailing across rotation
+# ======================================================
+
+def _drain(tailer) -> list[str]:
+    lines = []
+    while (chunk := tailer.read(1 << 16)) is not None:
+        lines += chunk[1]
+    return lines
+
+
+def test_rename_rotation_keeps_unterminated_last_line(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_bytes(b"a\nb\npartial")
+    tailer = agent.FileTailer(str(log), str(tmp_path / "offsets"))
+    assert _drain(tailer) == ["a", "b"]          # waits for the newline
+
+    log.rename(tmp_path / "app.log.1")
+    log.write_bytes(b"c\n")
+    assert _drain(tailer) == ["partial", "c"]
+    assert tailer.inode == log.stat().st_ino
+
+
+def test_copytruncate_restarts_at_zero(tmp_path):
+    log = tmp_path / "app.log"
+    log.write_bytes(b"first line\nsecond line\n")
+    tailer = agent.FileTailer(str(log), str(tmp_path / "offsets"))
+    inode = tailer.inode
+    assert _drain(tailer) == ["first line", "second line"]
+
+    with open(log, "r+b") as f:                  # same inode, rewritten from 0
+        f.truncate(0)
+        f.write(b"c\n")
+    assert log.stat().st_ino == inode
+    assert _drain(tailer) == ["c"]
+
+
+def test_rotation_while_stopped_drains_the_old_inode_first(tmp_path):
+    offsets = str(tmp_path / "offsets")
+    log = tmp_path / "app.log"
+    log.write_bytes(b"a\nb\n")
+    agent.save_offset(offsets, str(log), log.stat().st_ino, 2)   # "a" shipped, then stopped
+
+    log.rename(tmp_path / "app.log.1")
+    log.write_bytes(b"c\n")
+    tailer = agent.FileTailer(str(log), offsets)
+    assert tailer.f.name == str(tmp_path / "app.log.1")
+    assert _drain(tailer) == ["b", "c"]
+
+
+def test_legacy_offset_file_resumes_on_the_current_file(tmp_path):
+    offsets = str(tmp_path / "offsets")
+    log = tmp_path / "app.log"
+    log.write_bytes(b"a\nb\n")
+    with open(agent._offset_path(offsets, str(log)), "w") as f:
+        f.write("2")                             # pre-inode format: "<offset>"
+
+    assert agent.load_offset(offsets, str(log)) == (None, 2)
+    assert _drain(agent.FileTailer(str(log), offsets)) == ["b"]
@@ -0,0 +1,106 @@
+"""Realtime broker — push wake-up, tenant isolation and Last-Event-ID resume."""
+import asyncio
+import threading
+import time
+
+from src.api.v1.events import format_event
+from src.realtime.broker import InMemoryBroker, create_broker
+
+
+def test_publish_from_thread_wakes_waiting_subscriber():
+    broker = InMemoryBroker()
+
+    async def run():
+        cursor = await broker.resume_cursor("t1", None)
+        threading.Timer(0.05, lambda: broker.publish({"tenant_id": "t1", "n": 1})).start()
+        start = time.monotonic()
+        events = await broker.wait("t1", cursor, timeout=5.0)
+        return events, time.monotonic() - start
+
+    events, elapsed = asyncio.run(run())
+    assert [e["n"] for _, e in events] == [1]
+    assert elapsed < 1.0   # woken by the publish, not by the timeout
+
+
+def test_wait_is_tenant_scoped_and_times_out():
+    broker = InMemoryBroker()
+
+    async def run():
+        cursor = await broker.resume_cursor("t1", None)
+        broker.publish({"tenant_id": "t2", "n": 1})
+        return await broker.wait("t1", cursor, timeout=0.05)
+
+    assert asyncio.run(run()) == []
+
+
+def test_resume_from_last_event_id_replays_gap():
+    broker = InMemoryBroker(maxlen=3)
+    ids = [broker.publish({"tenant_id": "t1", "n": i}) for i in range(5)]
+    broker.publish({"tenant_id": "t2", "n": 99})
+
+    async def replay(last_event_id):
+        return await broker.wait("t1", await broker.resume_cursor("t1", last_event_id), 0.01)
+
+    # Fresh connection: live only.
+    assert asyncio.run(replay(None)) == []
+
+    # Reconnect after id[2]: events 3 and 4 are replayed, in order.
+    events = asyncio.run(replay(ids[2]))
+    assert [(eid, e["n"]) for eid, e in events] == [(ids[3], 3), (ids[4], 4)]
+
+    # Ids from a previous process (ahead of our counter) or garbage → live only.
+    assert asyncio.run(broker.resume_cursor("t1", "999999")) == ids[4]
+    assert asyncio.run(broker.resume_cursor("t1", "not-an-id")) == ids[4]
+
+
+def test_idle_unsubscribed_tenant_buffers_are_pruned(monkeypatch):
+    from src.realtime import broker as broker_module
+
+    clock = [1000.0]
+    monkeypatch.setattr(broker_module.time, "monotonic", lambda: clock[0])
+    broker = InMemoryBroker(idle_seconds=60)
+    old = broker.publish({"tenant_id": "quiet", "n": 1})
+    broker.publish({"tenant_id": "watched", "n": 1})
+    broker._waiters["watched"] = {object()}     # an open SSE connection
+
+    clock[0] += 61
+    last = broker.publish({"tenant_id": "busy", "n": 1})
+    assert set(broker._events) == {"watched", "busy"}
+    # A late reconnect of the pruned tenant resumes with nothing to replay.
+    assert asyncio.run(broker.resume_cursor("quiet", old)) == old
+    assert broker.since(int(old) - 1, "quiet") == [] and broker.latest_id("quiet") == int(last)
+
+
+def test_sse_event_carries_id_line():
+    assert format_event("7", {"type": "ingest"}) == 'id: 7\ndata: {"type": "ingest"}\n\n'
+
+
+def test_redis_broker_degrades_instead_of_raising_when_redis_is_down():
+    from src.realtime.broker import RedisStreamBroker
+
+    class _Down:
+        async def xrevrange(self, *a, **kw):
+            raise ConnectionError("redis down")
+
+        xread = xrevrange
+
+    broker = RedisStreamBroker.__new__(RedisStreamBroker)
+    broker.prefix, broker._async = "netscope:events:", _Down()
+
+    async def run():
+        cursor = await broker.resume_cursor("t1", None)
+        return cursor, await broker.wait("t1", cursor, timeout=0.01)
+
+    before = int(time.time() * 1000)
+    cursor, events = asyncio.run(run())
+    assert int(cursor.split("-")[0]) >= before and events == []     # live-only cursor, heartbeat
+
+
+def test_create_broker_validates_backend():
+    assert isinstance(create_broker("memory"), InMemoryBroker)
+    for backend, kwargs in (("redis", {}), ("kafka", {})):
+        try:
+            create_broker(backend, **kwargs)
+            assert False, "expected RuntimeError"
+        except RuntimeError:
+            pass
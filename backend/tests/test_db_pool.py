@@ -0,0 +1,82 @@
+"""Pool options, releasing connections around slow calls, 503 on pool exhaustion."""
+from datetime import datetime, UTC
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+
+from src.core.config import settings
+from src.db.async_session import AsyncReads
+from src.db.session import engine_options, release_connection
+from src.model.log import Log
+
+
+def test_engine_options_postgres_pool_and_timeouts():
+    opts = engine_options("postgresql://u:p@db/netscope")
+    assert opts["pool_size"] == settings.DB_POOL_SIZE
+    assert opts["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert opts["pool_recycle"] == settings.DB_POOL_RECYCLE
+    assert f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}" in opts["connect_args"]["options"]
+
+    async_opts = engine_options("postgresql+asyncpg://u:p@db/netscope")
+    assert async_opts["connect_args"]["server_settings"]["statement_timeout"] == str(settings.DB_STATEMENT_TIMEOUT_MS)
+
+    assert "pool_size" not in engine_options("sqlite://")
+
+
+def test_maintenance_engine_options_switch_timeouts_off():
+    opts = engine_options("postgresql://u:p@db/netscope", maintenance=True)
+    assert opts["connect_args"]["options"] == "-c statement_timeout=0 -c idle_in_transaction_session_timeout=0"
+
+
+def test_async_reads_fall_back_off_postgres():
+    assert not AsyncReads("sqlite://", enabled=True).enabled
+
+
+@pytest.fixture
+def factory():
+    engine = create_engine("sqlite://")
+    Log.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def test_release_connection_keeps_detached_rows_readable(factory):
+    with factory() as db:
+        db.add(Log(id="l1", tenant_id="t", project_id="p", source="app", source_type="agent",
+                   message="m", timestamp=datetime(2026, 3, 10, tzinfo=UTC)))
+        db.commit()
+
+        log = db.query(Log).one()
+        assert db.in_transaction()
+        release_connection(db, log)
+
+        assert not db.in_transaction()
+        assert log.message == "m"      # loaded state, no new checkout
+        assert not db.in_transaction()
+
+
+def test_release_connection_refuses_pending_changes(factory):
+    with factory() as db:
+        db.add(Log(id="l1", tenant_id="t", project_id="p", source="app", source_type="agent", message="m"))
+        with pytest.raises(RuntimeError):
+            release_connection(db)
+
+
+def test_pool_timeout_is_503_with_retry_after():
+    from src.main import app
+    from src.db.session import get_db
+
+    def _exhausted():
+        raise PoolTimeoutError("QueuePool limit of size 10 overflow 20 reached")
+        yield
+
+    app.dependency_overrides[get_db] = _exhausted
+    try:
+        resp = TestClient(app).get("/health")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
@@ -1,4 +1,4 @@
-"""GET /health smoke test."""
+"""GET /health smoke test, GET /admin/drain-trees auth."""
 from unittest.mock import MagicMock, patch
 
 from fastapi.testclient import TestClient
@@ -26,3 +26,20 @@ def test_health_returns_ok():
         assert body["db"] == "ok"
     finally:
         app.dependency_overrides.clear()
+
+
+def test_admin_drain_trees_requires_key():
+    from src.core.config import settings
+
+    client, app = _make_client()
+    try:
+        assert client.get("/admin/drain-trees").status_code == 403
+        with patch.object(settings, "ADMIN_API_KEY", "s3cret"):
+            assert client.get("/admin/drain-trees", headers={"X-Admin-Key": "nope"}).status_code == 403
+            resp = client.get("/admin/drain-trees", headers={"X-Admin-Key": "s3cret"})
+        assert resp.status_code == 200
+        body = resp.json()
+        assert body["processes"][0]["max_bytes"] == settings.DRAIN_CACHE_MAX_MB * 1024 * 1024
+        assert body["trees"] == len(body["processes"][0]["tenants"])
+    finally:
+        app.dependency_overrides.clear()
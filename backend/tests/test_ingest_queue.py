@@ -0,0 +1,137 @@
+"""Accept-and-enqueue ingest: queue coalescing, backpressure and the 202/429 API."""
+import threading
+import time
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from src.ingest.queue import IngestQueue, QueueFull
+
+_HEADERS = {"X-Tenant-ID": "t1", "X-Project-ID": "p1", "X-Agent-ID": "host-a"}
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_queue_coalesces_batches_per_tenant_project():
+    calls = []
+    gate = threading.Event()
+
+    def handler(tenant_id, project_id, agent_id, raw_logs):
+        gate.wait(5)
+        calls.append((tenant_id, project_id, agent_id, list(raw_logs)))
+
+    q = IngestQueue(max_depth=10, workers=1, coalesce_max_lines=4, handler=handler)
+    q.start()
+    try:
+        # The first batch occupies the single worker; the rest queue up behind it.
+        q.submit(tenant_id="t1", project_id="p1", agent_id="a", raw_logs=["l0"])
+        assert _wait_for(lambda: q.stats()["depth"] == 0)
+        q.submit(tenant_id="t1", project_id="p1", agent_id="a", raw_logs=["l1", "l2"])
+        q.submit(tenant_id="t2", project_id="p1", agent_id="b", raw_logs=["x1"])
+        q.submit(tenant_id="t1", project_id="p1", agent_id="c", raw_logs=["l3"])
+        q.submit(tenant_id="t1", project_id="p1", agent_id="a", raw_logs=["l4", "l5"])
+        gate.set()
+        assert _wait_for(lambda: q.stats()["processed"] == 5)
+    finally:
+        q.stop()
+
+    assert calls == [
+        ("t1", "p1", "a", ["l0"]),
+        ("t1", "p1", None, ["l1", "l2", "l3"]),   # mixed agents → None; l4/l5 exceed 4 lines
+        ("t2", "p1", "b", ["x1"]),
+        ("t1", "p1", "a", ["l4", "l5"]),
+    ]
+    stats = q.stats()
+    assert stats["pipeline_runs"] == 4
+    assert stats["failed"] == 0
+
+
+def test_queue_rejects_when_full_and_counts_failures():
+    gate = threading.Event()
+
+    def handler(*args):
+        gate.wait(5)
+        raise RuntimeError("db down")
+
+    q = IngestQueue(max_depth=1, workers=1, handler=handler)
+    q.start()
+    try:
+        q.submit(tenant_id="t1", project_id="p1", agent_id=None, raw_logs=["a"])
+        assert _wait_for(lambda: q.stats()["depth"] == 0)
+        q.submit(tenant_id="t1", project_id="p1", agent_id=None, raw_logs=["b"])
+        try:
+            q.submit(tenant_id="t1", project_id="p1", agent_id=None, raw_logs=["c"])
+            assert False, "expected QueueFull"
+        except QueueFull:
+            pass
+        assert q.stats()["rejected"] == 1
+        gate.set()
+        assert _wait_for(lambda: q.stats()["processed"] == 2)
+    finally:
+        q.stop()
+    assert q.stats()["failed"] == 2
+
+
+def test_ingest_endpoint_returns_202_then_429():
+    from src.main import app
+    from src.core.config import settings
+
+    q = IngestQueue(max_depth=1, workers=1, handler=lambda *args: None)   # never started
+    with patch.object(settings, "INGEST_ASYNC", True), \
+            patch("src.api.v1.ingest.ingest_queue", q):
+        client = TestClient(app)
+        resp = client.post("/ingest", json={"logs": ["ERROR timeout"]}, headers=_HEADERS)
+        assert resp.status_code == 202
+        assert resp.json()["status"] == "accepted"
+        assert resp.json()["batch_id"]
+
+        resp = client.post("/ingest", json={"logs": ["ERROR timeout"]}, headers=_HEADERS)
+        assert resp.status_code == 429
+        assert resp.headers["Retry-After"] == "1"
+
+
+def test_ingest_endpoint_accepts_gzip_json():
+    import gzip
+    import json
+
+    from src.main import app
+
+    seen = []
+    with patch("src.api.v1.ingest.ingest_logs", lambda **kw: seen.append(kw["raw_logs"])):
+        client = TestClient(app)
+        body = gzip.compress(json.dumps({"logs": ["ERROR timeout", "WARN slow"]}).encode())
+        resp = client.post("/ingest", content=body, headers={
+            **_HEADERS, "Content-Type": "application/json", "Content-Encoding": "gzip",
+        })
+        assert resp.status_code == 200
+        assert seen == [["ERROR timeout", "WARN slow"]]
+
+        resp = client.post("/ingest", content=b"not gzip", headers={
+            **_HEADERS, "Content-Type": "application/json", "Content-Encoding": "gzip",
+        })
+        assert resp.status_code == 400
+
+
+def test_ingest_endpoint_accepts_aggregated_records():
+    from src.main import app
+
+    seen = []
+    with patch("src.api.v1.ingest.ingest_logs", lambda **kw: seen.append((kw["raw_logs"], kw["records"]))):
+        client = TestClient(app)
+        record = {"template": "ERROR timeout <NUM>", "sample": "ERROR timeout 500", "count": 7,
+                  "first_ts": "2026-01-02T01:00:00Z", "last_ts": "2026-01-02T01:00:03Z"}
+        resp = client.post("/ingest", json={"records": [record]}, headers=_HEADERS)
+        assert resp.status_code == 200
+        [(raw_logs, records)] = seen
+        assert raw_logs == [] and records[0]["count"] == 7 and records[0]["sample"] == "ERROR timeout 500"
+
+        assert client.post("/ingest", json={"logs": ["x"], "records": [record]}, headers=_HEADERS).status_code == 422
+        assert client.post("/ingest", json={"logs": []}, headers=_HEADERS).status_code == 422
+        assert client.post("/ingest", json={"records": [{**record, "count": 0}]}, headers=_HEADERS).status_code == 422
@@ -0,0 +1,125 @@
+"""POST /ingest/stream — incremental NDJSON / gzip bulk ingest."""
+import asyncio
+import gzip
+import json
+import random
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.ingest.stream import StreamDecodeError, iter_line_chunks
+
+_HEADERS = {"X-Tenant-ID": "t1", "X-Project-ID": "p1"}
+
+
+def _collect(pieces, **kwargs):
+    async def gen():
+        for p in pieces:
+            yield p
+
+    async def run():
+        return [chunk async for chunk in iter_line_chunks(gen(), **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_line_chunks_split_across_pieces_and_multibyte_boundaries():
+    body = "첫째 줄\r\n\n{\"level\":\"ERROR\",\"message\":\"x\"}\n\"quoted record\"\nlast".encode()
+    # One byte at a time: every line and every UTF-8 sequence is split.
+    chunks = _collect([body[i:i + 1] for i in range(len(body))], chunk_lines=2)
+    assert chunks == [
+        ["첫째 줄", '{"level":"ERROR","message":"x"}'],
+        ["quoted record", "last"],
+    ]
+
+
+def test_line_chunks_gunzip_concatenated_members():
+    body = gzip.compress(b"a\nb\n") + gzip.compress(b"c\n")
+    chunks = _collect([body[:7], body[7:]], gzip=True, chunk_lines=10)
+    assert chunks == [["a", "b", "c"]]
+
+
+def test_line_chunks_reject_truncated_gzip():
+    body = gzip.compress(b"a\nb\n") + gzip.compress(b"c\n")
+    with pytest.raises(StreamDecodeError, match="truncated"):
+        _collect([body[:-5]], gzip=True, chunk_lines=10)
+
+
+def test_long_lines_are_split():
+    chunks = _collect([b"x" * 25 + b"\n"], max_line_chars=10, chunk_lines=10)
+    assert chunks == [["x" * 10, "x" * 10, "x" * 5]]
+
+
+def test_stream_endpoint_runs_pipeline_per_chunk():
+    from src.main import app
+    from src.core.config import settings
+
+    seen = []
+
+    def fake_ingest(*, db, tenant_id, project_id, agent_id, raw_logs):
+        seen.append(list(raw_logs))
+        return {
+            "lines": len(raw_logs),
+            "formats": {"json": len(raw_logs)},
+            "analysis_id": "a1" if len(seen) == 1 else None,
+            "severity": None,
+        }
+
+    records = [json.dumps({"level": "ERROR", "message": f"timeout {i}"}) for i in range(5)]
+    body = gzip.compress(("\n".join(records) + "\n").encode())
+
+    with patch.object(settings, "INGEST_STREAM_CHUNK_LINES", 2), \
+            patch("src.api.v1.ingest.ingest_logs", fake_ingest):
+        resp = TestClient(app).post(
+            "/ingest/stream",
+            content=body,
+            headers={**_HEADERS, "Content-Encoding": "gzip", "Content-Type": "application/x-ndjson"},
+        )
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [len(c) for c in seen] == [2, 2, 1]
+    assert data["lines"] == 5
+    assert data["formats"] == {"json": 5}
+    assert data["analyses_created"] == 1
+    assert [c["chunk"] for c in data["chunks"]] == [0, 1, 2]
+
+
+def test_stream_endpoint_rejects_bad_gzip():
+    from src.main import app
+
+    with patch("src.api.v1.ingest.ingest_logs") as fake:
+        resp = TestClient(app).post(
+            "/ingest/stream",
+            content=b"definitely not gzip",
+            headers={**_HEADERS, "Content-Encoding": "gzip"},
+        )
+    assert resp.status_code == 400
+    assert resp.json()["lines"] == 0
+    fake.assert_not_called()
+
+
+def test_stream_endpoint_reports_truncated_gzip_with_partial_totals():
+    from src.main import app
+    from src.core.config import settings
+
+    def fake_ingest(*, db, tenant_id, project_id, agent_id, raw_logs):
+        return {"lines": len(raw_logs), "formats": {"raw": len(raw_logs)}, "analysis_id": None, "severity": None}
+
+    rng = random.Random(3)
+    lines = [f"line {i} {rng.getrandbits(64):x}" for i in range(5000)]
+    body = gzip.compress(("\n".join(lines) + "\n").encode())
+
+    with patch.object(settings, "INGEST_STREAM_CHUNK_LINES", 500), \
+            patch("src.api.v1.ingest.ingest_logs", fake_ingest):
+        resp = TestClient(app).post(
+            "/ingest/stream",
+            content=body[: len(body) // 2],
+            headers={**_HEADERS, "Content-Encoding": "gzip"},
+        )
+
+    assert resp.status_code == 400
+    data = resp.json()
+    assert data["detail"] == "truncated gzip body"
+    assert 0 < data["lines"] < 5000
@@ -0,0 +1,56 @@
+"""CPU stage of ingest: compute_batch, hash ring, sharded process pool."""
+from src.ingest.workers import HashRing, ShardedWorkerPool, compute_batch
+
+
+def test_hash_ring_is_stable_and_moves_few_keys_on_resize():
+    keys = [f"tenant-{i}" for i in range(4000)]
+    four, five = HashRing(4), HashRing(5)
+    assert [four.node_for(k) for k in keys] == [HashRing(4).node_for(k) for k in keys]
+
+    load = [0] * 4
+    for k in keys:
+        load[four.node_for(k)] += 1
+    assert min(load) > 4000 / 4 * 0.6
+
+    moved = sum(four.node_for(k) != five.node_for(k) for k in keys)
+    assert moved < 4000 * 0.35   # ~1/5 expected, far from a full reshuffle
+
+
+def test_compute_batch_returns_deltas_and_rule_result():
+    lines = [f"2026-01-02T01:00:{i % 60:02d}Z ERROR gateway upstream timeout after 30s" for i in range(50)]
+    outcome = compute_batch("t-inline", lines)
+    assert outcome.lines == 50 and outcome.formats == {"plain": 50}
+    assert sum(d.count for d in outcome.deltas.values()) == 50
+    assert outcome.analysis and outcome.analysis["matched_rules"]
+    assert outcome.batch is None
+    assert compute_batch("t-inline", ["hello world"], keep_batch=True).batch.messages == ["hello world"]
+
+
+def test_compute_batch_weighs_aggregated_records():
+    from datetime import datetime, UTC
+
+    line = "2026-01-02T01:00:00Z ERROR gateway upstream timeout after 30s"
+    records = [{
+        "template": "<TS> ERROR gateway upstream timeout after 30s", "sample": line, "count": 50,
+        "first_ts": datetime(2026, 1, 2, 1, 0, tzinfo=UTC), "last_ts": datetime(2026, 1, 2, 1, 0, 40, tzinfo=UTC),
+    }]
+    outcome = compute_batch("t-records", [], records=records)
+    assert outcome.lines == 50 and outcome.formats == {"plain": 50}
+    assert [d.count for d in outcome.deltas.values()] == [50]
+    assert outcome.last_ts == records[0]["last_ts"]
+    assert set(outcome.analysis["matched_rules"]) == set(compute_batch("t-lines", [line] * 50).analysis["matched_rules"])
+
+
+def test_sharded_pool_keeps_each_tenant_tree_in_its_worker():
+    from src.learning import catalog
+
+    pool = ShardedWorkerPool(2)
+    try:
+        first = pool.run("t-shard", ["session expired for user id alice"])
+        second = pool.run("t-shard", ["session expired for user id bob"])
+    finally:
+        pool.stop()
+    assert [d.template for d in first.deltas.values()] == ["session expired for user id alice"]
+    # The worker's tree remembered batch one, so batch two generalizes it.
+    assert [d.template for d in second.deltas.values()] == ["session expired for user id <*>"]
+    assert "t-shard" not in catalog._drain_trees
@@ -120,3 +120,350 @@ def test_end_to_end_masking_then_drain():
 
     # All should collapse to the same cluster
     assert len(clusters) == 1
+
+
+# --------------------------------------------------
+# Catalog batching
+# --------------------------------------------------
+
+def test_aggregate_hits_folds_batch_into_deltas():
+    from src.learning.catalog import aggregate_hits
+
+    tree = DrainTree()
+    messages = [
+        "Connection refused to 10.0.0.1:5432",
+        "Connection refused to 10.0.0.2:5432",
+        "Connection refused to 10.0.0.3:5432",
+        "disk full on /var/lib/data",
+    ]
+    clusters, deltas = aggregate_hits(
+        tree, messages,
+        sources=["api", "api", "worker", "storage"],
+        levels=["ERROR", "ERROR", "WARN"],   # shorter than messages → INFO
+        hour=13,
+    )
+    assert len(clusters) == len(deltas) == 2
+    conn = next(d for d in deltas.values() if "Connection" in d.template)
+    assert conn.count == 3
+    assert conn.sample == messages[0]
+    assert conn.sources == {"api": 2, "worker": 1}
+    assert conn.level_dist == {"ERROR": 2, "WARN": 1}
+    assert conn.hourly_dist[13] == 3 and sum(conn.hourly_dist) == 3
+    disk = next(d for d in deltas.values() if d is not conn)
+    assert disk.level_dist == {"INFO": 1}
+
+
+def test_batched_upsert_is_one_statement_merging_counters_server_side():
+    from datetime import datetime, UTC
+    from sqlalchemy.dialects import postgresql
+    from src.learning.catalog import aggregate_hits, build_upsert
+
+    _, deltas = aggregate_hits(DrainTree(), ["a b c", "x y z", "a b c"])
+    sql = str(
+        build_upsert("t1", list(deltas.values()), datetime.now(UTC))
+        .compile(dialect=postgresql.dialect())
+    )
+    assert sql.count("INSERT INTO patterns") == 1
+    assert "ON CONFLICT (id) DO UPDATE" in sql
+    assert "total_count = (patterns.total_count + excluded.total_count)" in sql
+    assert "jsonb_each_text(excluded.sources)" in sql
+    assert "WHERE patterns.tenant_id = excluded.tenant_id" in sql
+    assert "(xmax = 0)" in sql
+
+
+# --------------------------------------------------
+# Indexed Drain vs. the linear-scan reference
+# --------------------------------------------------
+
+def test_indexed_drain_matches_linear_scan():
+    import random
+    from scripts.bench_drain import LegacyDrainTree
+
+    rng = random.Random(3)
+    vocab = ["a", "b", "c", "d", "<NUM>", "<IP>", "<*>"]
+    messages = [
+        " ".join(rng.choice(vocab) for _ in range(rng.randint(1, 7)))
+        for _ in range(4000)
+    ]
+    for sim in (0.3, 0.5, 0.8):
+        legacy, indexed = LegacyDrainTree(depth=2, sim_threshold=sim), DrainTree(depth=2, sim_threshold=sim)
+        assert [legacy.add(m) for m in messages] == [indexed.add(m).cluster_id for m in messages]
+
+
+def test_cluster_id_cache_follows_template_changes():
+    tree = DrainTree(depth=1, sim_threshold=0.4)
+    c = tree.add("user alice logged in")
+    first_id = c.cluster_id
+    assert tree.add("user bob logged in") is c
+    assert c.template == "user <*> logged in"
+    assert c.cluster_id != first_id
+    assert c.cluster_id == DrainTree().add("user <*> logged in").cluster_id
+
+
+def test_eviction_drops_least_used_without_reordering():
+    tree = DrainTree(depth=1, sim_threshold=0.99, max_clusters=3)
+    for msg in ["x a", "x b", "x b", "x c"]:
+        tree.add(msg)
+    tree.add("x d")  # cap reached → evicts "x a" (count 1, first of the least used)
+    assert [c.template for c in tree.all_clusters()] == ["x b", "x c", "x d"]
+
+
+# --------------------------------------------------
+# Masking engine vs. the sequential reference
+# --------------------------------------------------
+
+_MASK_CORPUS = [
+    "Auth token expired for user 550e8400-e29b-41d4-a716-446655440000",
+    "Auth token expired for user a1b2c3d4-e5f6-7890-abcd-ef1234567890",
+    "Auth token expired for user 12345678-abcd-ef12-3456-789012345678",
+    "Connection refused from 192.168.1.100:8080",
+    "Error at 2024-01-15T03:42:00Z in module",
+    "File not found: /var/log/app/error.log",
+    "Request took 3500ms, status 500",
+    "ERROR timeout on connection",
+]
+
+
+def _mask_sequential(message: str) -> str:
+    from src.learning.masking import _MASKS
+
+    for pattern, token in _MASKS:
+        message = pattern.sub(token, message)
+    return message
+
+
+def test_masking_engine_matches_sequential_reference():
+    import random
+    from src.learning.masking import MaskingEngine
+
+    rng = random.Random(11)
+    alphabet = "abcdefABCDEF0123456789xX-:./@_+=\"' ٣"
+    fragments = [
+        "550e8400-e29b-41d4-a716-446655440000", "2024-01-15 03:42:00.123+09:00",
+        "1700000000000", "fe80:0:0:0:0:0:0:1", "10.0.0.1:443", "ops@example.com",
+        "/srv/10.0.0.1/x", "eyJhbGciOiJIUzI1NiJ9", "0xdeadbeef01", "'it''s'",
+    ]
+    messages = list(_MASK_CORPUS)
+    for _ in range(3000):
+        parts = [
+            rng.choice(fragments) if rng.random() < 0.3
+            else "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+            for _ in range(rng.randint(1, 5))
+        ]
+        messages.append(rng.choice([" ", "", "/", ":"]).join(parts))
+
+    engine = MaskingEngine(cache_size=64)
+    for msg in messages:
+        assert engine.mask(msg) == _mask_sequential(msg) == mask_variables(msg), msg
+
+
+def test_fused_masking_matches_on_corpus_but_is_opt_in():
+    from src.learning.masking import MaskingEngine
+
+    fused = MaskingEngine(fused=True)
+    assert [fused.mask(m) for m in _MASK_CORPUS] == [_mask_sequential(m) for m in _MASK_CORPUS]
+    # Overlapping masks are where a single leftmost pass diverges.
+    assert fused.mask("GET /srv/10.0.0.1/x") == "GET <PATH>"
+    assert mask_variables("GET /srv/10.0.0.1/x") == "GET /srv/<IP>/x"
+
+
+def test_masking_cache_is_bounded():
+    from src.learning.masking import MaskingEngine
+
+    engine = MaskingEngine(cache_size=2)
+    for msg in ["a 1234", "b 1234", "a 1234", "c 1234", "d 1234"]:
+        engine.mask(msg)
+    info = engine.cache_info()
+    assert info.hits == 1 and info.currsize == 2
+    assert MaskingEngine().cache_info() is None
+
+
+# --------------------------------------------------
+# Drain snapshots
+# --------------------------------------------------
+
+def _mined_tree(n: int = 3000) -> tuple[DrainTree, list[str]]:
+    import random
+
+    rng = random.Random(5)
+    vocab = ["a", "b", "c", "d", "e", "<NUM>", "<IP>", "날짜"]
+    messages = [" ".join(rng.choice(vocab) for _ in range(rng.randint(1, 6))) for _ in range(n)]
+    tree = DrainTree(depth=2, sim_threshold=0.5, max_clusters=300)
+    for m in messages[: n // 2]:
+        tree.add(m)
+    return tree, messages[n // 2:]
+
+
+def test_snapshot_roundtrip_preserves_state():
+    tree, rest = _mined_tree()
+    restored = DrainTree.from_bytes(tree.to_bytes())
+    assert (restored.depth, restored.sim_threshold, restored.max_clusters) == (2, 0.5, 300)
+    assert restored._cluster_count == tree._cluster_count
+    assert [(c.cluster_id, c.count, c.sample, c.seq) for c in restored.all_clusters()] == \
+        [(c.cluster_id, c.count, c.sample, c.seq) for c in tree.all_clusters()]
+    # Continuing on the restored tree is indistinguishable from the original.
+    assert [restored.add(m).cluster_id for m in rest] == [tree.add(m).cluster_id for m in rest]
+
+
+def test_snapshot_rejects_garbage():
+    import pytest
+
+    data = DrainTree().to_bytes()
+    for bad in (b"", b"not a snapshot", data[:-3]):
+        with pytest.raises(ValueError):
+            DrainTree.from_bytes(bad)
+
+
+def test_snapshot_waits_for_a_concurrent_add(monkeypatch):
+    import threading
+
+    tree, _ = _mined_tree()
+    before = tree.cluster_count
+    adder = threading.Thread(target=tree.add, args=("brand new template shape here",))
+    dump = DrainTree._dump_node
+
+    def dump_then_race(node, ints, sid):
+        # An ingest thread of the same tenant adds a cluster mid-serialisation.
+        if not adder.is_alive() and adder.ident is None:
+            adder.start()
+            adder.join(0.2)
+        dump(node, ints, sid)
+
+    monkeypatch.setattr(DrainTree, "_dump_node", staticmethod(dump_then_race))
+    data = tree.to_bytes()
+    adder.join()
+
+    assert DrainTree.from_bytes(data).cluster_count == before
+    assert tree.cluster_count == before + 1
+
+
+def test_snapshot_store_saves_changed_trees(tmp_path):
+    from src.learning.snapshots import SnapshotStore
+
+    store = SnapshotStore(str(tmp_path), interval=0)
+    assert store.load("tenant/1") is None
+    tree, _ = _mined_tree()
+    assert store.maybe_save("tenant/1", tree)
+    assert not store.maybe_save("tenant/1", tree)          # unchanged since
+    tree.add("x y")
+    assert store.flush({"tenant/1": tree}) == 1
+    loaded = SnapshotStore(str(tmp_path)).load("tenant/1")
+    assert loaded._cluster_count == tree._cluster_count
+    assert SnapshotStore(None).load("tenant/1") is None
+
+
+# --------------------------------------------------
+# Tree cache (memory bound)
+# --------------------------------------------------
+
+def test_memory_bytes_grows_with_clusters_and_tokens_are_interned():
+    tree = DrainTree()
+    empty = tree.memory_bytes()
+    for i in range(200):
+        tree.add(f"job {i} finished with status <NUM> on worker{i}")
+    assert tree.memory_bytes() > empty + 200 * 100
+    a, b = tree.all_clusters()[:2]
+    assert a.template_tokens[0] is b.template_tokens[0]
+    restored = DrainTree.from_bytes(tree.to_bytes())
+    c, d = restored.all_clusters()[:2]
+    assert c.template_tokens[4] is d.template_tokens[4] is a.template_tokens[4]
+
+
+def test_tree_cache_evicts_idle_and_lru_and_restores_from_snapshot(tmp_path):
+    from src.learning.snapshots import SnapshotStore
+    from src.learning.tree_cache import TreeCache
+
+    cache = TreeCache(SnapshotStore(str(tmp_path), interval=3600), max_bytes=1, measure_interval=0, busy_seconds=0)
+    cache.get("t1").add("disk full on /dev/sda1")
+    cache.get("t2").add("link down on eth0")
+    # Over budget: everything but the tenant just mined goes, LRU first.
+    assert cache.enforce(keep="t2") == ["t1"]
+    assert "t1" not in cache and "t2" in cache
+    # The evicted tree was saved on the way out and comes back intact.
+    assert [c.template for c in cache.get("t1").all_clusters()] == ["disk full on /dev/sda1"]
+
+    idle = TreeCache(SnapshotStore(None), idle_seconds=0.01)
+    idle.get("t3").add("x")
+    idle.get("t4")
+    import time
+    time.sleep(0.02)
+    assert idle.enforce(keep="t4") == ["t3"]
+    assert idle.get("t3").cluster_count == 0      # no snapshots: starts over
+
+    report = cache.report()
+    assert report["trees"] == 2 and report["evictions"] == 1
+    assert {t["tenant_id"] for t in report["tenants"]} == {"t1", "t2"}
+    assert report["bytes"] == sum(t["bytes"] for t in report["tenants"]) > 0
+
+
+def test_tree_cache_keeps_trees_other_threads_are_mining(tmp_path, monkeypatch):
+    from src.learning import snapshots, tree_cache
+    from src.learning.snapshots import SnapshotStore
+    from src.learning.tree_cache import TreeCache
+
+    cache = TreeCache(SnapshotStore(str(tmp_path), interval=3600), max_bytes=1, measure_interval=0)
+    busy = cache.get("t1")                     # another ingest thread is mining this one
+    busy.add("disk full on /dev/sda1")
+    cache.get("t2").add("link down on eth0")
+    assert cache.enforce(keep="t2") == []      # over budget, but nothing is safe to drop
+    busy.add("disk full on /dev/sdb1")
+    assert cache.peek("t1") is busy
+
+    # Idle eviction is off by default without snapshots — it would throw trees away.
+    monkeypatch.setattr(snapshots, "tree_snapshots", SnapshotStore(None))
+    assert tree_cache._from_settings().idle_seconds == 0
+    monkeypatch.setattr(snapshots, "tree_snapshots", SnapshotStore(str(tmp_path)))
+    assert tree_cache._from_settings().idle_seconds > 0
+
+
+# --------------------------------------------------
+# Pattern matcher index
+# --------------------------------------------------
+
+def _pattern(pid: str, template: str, status: str = "labeled", **kw):
+    from src.model.pattern import Pattern
+
+    fields = dict(
+        tenant_id="t1", template=template, sample=template, total_count=10,
+        level_dist={"ERROR": 10}, score_seed=0.2, score_adjust=0.05,
+        confirm_count=0, dismiss_count=0, last_seen=None,
+    )
+    fields.update(kw)
+    return Pattern(id=pid, status=status, **fields)
+
+
+def test_match_patterns_uses_cached_index_and_generalized_templates():
+    from unittest.mock import MagicMock
+
+    from src.learning.matcher import PatternIndex, match_patterns, pattern_index
+
+    db = MagicMock()
+    db.query.return_value.filter.return_value.all.return_value = [
+        _pattern("p-disk", "disk full on <PATH>"),
+        _pattern("p-user", "session expired for user <*>", status="promoted"),
+        _pattern("p-any", "session expired for <*> <*>"),
+    ]
+    pattern_index.invalidate("t1")
+    try:
+        msgs = ["disk full on /dev/sda1", "session expired for user alice", "session expired for user bob", "hello"]
+        result = match_patterns(db=db, tenant_id="t1", messages=msgs)
+        # Most specific template wins; each pattern reported once.
+        assert [r["pattern_id"] for r in result] == ["p-disk", "p-user"]
+        assert result[0]["score"] == 0.25 and result[0]["history"]["avg_severity"] == "HIGH"
+
+        match_patterns(db=db, tenant_id="t1", messages=msgs)
+        assert db.query.call_count == 1          # second call served from memory
+
+        # Mutations from /patterns apply in place.
+        pattern_index.update(_pattern("p-user", "session expired for user <*>", status="dismissed"))
+        pattern_index.update(_pattern("p-new", "link <*> down", score_adjust=0.0))
+        result = match_patterns(db=db, tenant_id="t1", messages=msgs[1:] + ["link eth0 down"])
+        assert [r["pattern_id"] for r in result] == ["p-any", "p-new"]
+        assert db.query.call_count == 1
+    finally:
+        pattern_index.invalidate("t1")
+
+    expired = PatternIndex(ttl=0)
+    expired.get(db, "t1")
+    expired.get(db, "t1")
+    assert db.query.call_count == 3
@@ -9,9 +9,11 @@ def _make_client():
     from src.db.session import get_db
     from src.api.v1.dep import get_current_context
 
+    from src.analysis.rollups import COUNTERS
+
     mock_db = MagicMock()
-    # count queries return 0
-    mock_db.query.return_value.filter.return_value.scalar.return_value = 0
+    # rollup window sums return 0
+    mock_db.query.return_value.filter.return_value.one.return_value = (0,) * len(COUNTERS)
     # chained filter for AnalysisResult query
     mock_db.query.return_value.filter.return_value.order_by.return_value.first.return_value = None
 
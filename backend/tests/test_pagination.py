@@ -0,0 +1,74 @@
+"""Keyset pagination: cursor round trip and paging GET /projects/{id}/logs."""
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.api.v1.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from src.model.log import Log
+
+T0 = datetime(2026, 3, 10, 12, 0, tzinfo=UTC)
+
+
+@pytest.fixture
+def client():
+    from src.main import app
+    from src.db.session import get_db
+    from src.api.v1.dep import get_current_context
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Log.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        # 3 rows share a timestamp: the id tiebreak must neither skip nor repeat them
+        for i, minutes in enumerate([0, 1, 1, 1, 2, 5, 9]):
+            db.add(Log(
+                id=f"log-{i}", tenant_id="test-tenant", project_id="p1",
+                source="app", source_type="agent", message=f"m{i}",
+                timestamp=T0 + timedelta(minutes=minutes),
+            ))
+        db.add(Log(id="other", tenant_id="other-tenant", project_id="p1",
+                   source="app", source_type="agent", message="x", timestamp=T0))
+        db.commit()
+
+    def _db():
+        with Session() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = _db
+    app.dependency_overrides[get_current_context] = lambda: {
+        "user_id": "test-user",
+        "tenant_id": "test-tenant",
+    }
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor([T0, "log-3"])
+    assert decode_cursor(cursor, [Log.timestamp, Log.id]) == [T0, "log-3"]
+
+
+def test_logs_page_through_with_cursor(client):
+    seen, cursor = [], None
+    for _ in range(10):
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/projects/p1/logs", params=params)
+        assert resp.status_code == 200
+        seen += [row["id"] for row in resp.json()]
+        cursor = resp.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            break
+
+    assert seen == ["log-6", "log-5", "log-4", "log-3", "log-2", "log-1", "log-0"]
+
+
+def test_invalid_cursor_is_400(client):
+    assert client.get("/projects/p1/logs", params={"cursor": "not-a-cursor"}).status_code == 400
+    wrong_arity = encode_cursor(["only-one"])
+    assert client.get("/projects/p1/logs", params={"cursor": wrong_arity}).status_code == 400
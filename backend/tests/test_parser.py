@@ -108,3 +108,68 @@ def test_parse_log_lines_mixed():
     assert "kv" in formats
     assert "syslog" in formats
     assert "plain" in formats
+
+
+# --- Timestamp normalization / ParsedBatch ---
+
+def test_parse_timestamp_formats():
+    from datetime import datetime, UTC
+    from src.ingest.parser import parse_timestamp
+
+    now = datetime(2026, 3, 1, 12, 0, tzinfo=UTC)
+    expected = datetime(2026, 1, 2, 1, 1, tzinfo=UTC)
+    assert parse_timestamp("2026-01-02T01:01:00Z") == expected
+    assert parse_timestamp("2026-01-02T10:01:00+09:00") == expected
+    assert parse_timestamp("2026-01-02 01:01:00") == expected          # naive → UTC
+    assert parse_timestamp(str(int(expected.timestamp()))) == expected
+    assert parse_timestamp(str(int(expected.timestamp() * 1000))) == expected
+    assert parse_timestamp("Feb 27 08:00:00", now=now) == datetime(2026, 2, 27, 8, tzinfo=UTC)
+    # Syslog has no year: a date ahead of `now` belongs to last year.
+    assert parse_timestamp("Dec 31 23:00:00", now=now) == datetime(2025, 12, 31, 23, tzinfo=UTC)
+    assert parse_timestamp("yesterday") is None
+    assert parse_timestamp(None) is None
+
+
+def test_parse_batch_carries_structured_fields():
+    from datetime import datetime, UTC
+    from src.ingest.parser import parse_batch
+
+    received = datetime(2026, 1, 2, 2, 0, tzinfo=UTC)
+    batch = parse_batch(
+        [
+            "continuation line without a timestamp",
+            '{"level":"ERROR","message":"timeout","service":"api","ts":"2026-01-02T01:00:00Z"}',
+            "    at com.example.Handler.run(Handler.java:42)",
+            "2026-01-02T01:01:00Z ERROR gateway Request timed out after 30s",
+        ],
+        received_at=received,
+    )
+    assert len(batch) == 4
+    assert batch.sources[1] == "api"
+    assert batch.levels[3] == "ERROR"
+    assert batch.timestamps == [
+        received,                                        # nothing before it
+        datetime(2026, 1, 2, 1, 0, tzinfo=UTC),
+        datetime(2026, 1, 2, 1, 0, tzinfo=UTC),          # inherits previous line
+        datetime(2026, 1, 2, 1, 1, tzinfo=UTC),
+    ]
+    assert batch.first_ts == datetime(2026, 1, 2, 1, 0, tzinfo=UTC)
+    assert batch.last_ts == received
+
+
+def test_batch_fast_path_matches_per_line_chain():
+    from scripts.bench_parser import LegacyParser, fields, synth_batch
+    from src.ingest.parser import detect_format, parse_log_lines
+
+    legacy = LegacyParser()
+    for fmt in ("json", "kv", "syslog", "plain", "mixed"):
+        lines = synth_batch(fmt, 400)
+        # Stragglers in another format, blanks and near-misses must still fall back.
+        lines[7:7] = ["", "   ", "Oct 11 22:14:15 host app: a=1 b=2", "{not json", '{"v": NaN}', "x=1"]
+        assert detect_format(lines) == (None if fmt == "mixed" else fmt)
+        assert [fields(p) for p in parse_log_lines(lines)] == [fields(legacy.parse(l)) for l in lines]
+
+
+def test_parsed_log_is_slotted():
+    p = parse_log_line("plain message")
+    assert not hasattr(p, "__dict__")
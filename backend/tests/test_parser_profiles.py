@@ -0,0 +1,150 @@
+"""Per-project parser profiles: learning, compiled parsing, registry."""
+import json
+from datetime import datetime, UTC
+
+from src.ingest.parser import parse_batch
+from src.ingest.profiles import (
+    ProfileLearner,
+    ProfileParser,
+    ProfileRegistry,
+    ProfileSpec,
+    compile_timestamp_parser,
+    detect_timestamp_format,
+)
+
+
+def _odd_json_batch(n: int, start: int = 0) -> list[str]:
+    return [
+        json.dumps({
+            "@timestamp": f"2026-01-02T01:{(start + i) % 60:02d}:00Z",
+            "lvl": "error" if i % 3 == 0 else "info",
+            "svc": "payments",
+            "msg": f"charge {i} failed",
+            "trace": f"t{i}",
+        })
+        for i in range(n)
+    ]
+
+
+def test_learner_maps_odd_key_names():
+    learner = ProfileLearner()
+    for k in range(3):
+        learner.observe(parse_batch(_odd_json_batch(50, start=k)))
+    spec = learner.build()
+    assert spec.format == "json"
+    assert spec.fields["timestamp"] == "@timestamp"
+    assert spec.fields["level"] == "lvl"
+    assert spec.fields["message"] == "msg"
+    assert spec.fields["source"] == "svc"
+    assert spec.timestamp_format == "iso"
+
+
+def test_learner_recognises_unlisted_keys_by_value():
+    learner = ProfileLearner()
+    learner.observe(parse_batch([
+        json.dumps({"when": 1767315660 + i, "sev": "WARN", "msg": "slow"}) for i in range(10)
+    ], received_at=datetime(2026, 1, 2, 1, 5, tzinfo=UTC)))
+    spec = learner.build()
+    assert spec.fields["timestamp"] == "when"
+    assert spec.fields["level"] == "sev"
+    assert spec.timestamp_format == "epoch_s"
+
+
+def test_learner_ignores_numeric_ids_that_look_like_epochs():
+    received = datetime(2026, 1, 2, 1, 5, tzinfo=UTC)
+    learner = ProfileLearner()
+    # 3xxxxxxxx as epoch seconds is 1979-1982 — an id, not a timestamp
+    learner.observe(parse_batch([
+        json.dumps({"msg": f"payment {i} failed", "level": "error", "order_id": 312345678 + i * 7919})
+        for i in range(20)
+    ], received_at=received))
+    # near the ingest time on some lines only: not consistent enough either
+    learner.observe(parse_batch([
+        json.dumps({"msg": "retry", "level": "warn", "seq": 1767315660 if i % 2 else 312345678 + i})
+        for i in range(20)
+    ], received_at=received))
+    spec = learner.build()
+    assert "timestamp" not in spec.fields
+    assert spec.timestamp_format is None
+
+    logs, stamps = ProfileParser(spec).parse(
+        [json.dumps({"msg": "x", "level": "error", "order_id": 312345678})], now=received,
+    )
+    assert stamps == [None]
+    assert logs[0].extra["order_id"] == 312345678
+
+
+def test_learner_declines_mixed_streams():
+    learner = ProfileLearner()
+    learner.observe(parse_batch(["plain line one", '{"msg": "x"}', "a=1 b=2", "plain two"]))
+    assert learner.build() is None
+
+
+def test_profile_parses_odd_keys_the_generic_parser_misses():
+    lines = _odd_json_batch(4) + ["stray plain ERROR line"]
+    received = datetime(2026, 1, 3, tzinfo=UTC)
+    generic = parse_batch(lines, received_at=received)
+    assert generic.timestamps[0] == received       # @timestamp unknown to the alias chains
+
+    profile = ProfileParser(ProfileSpec(
+        format="json",
+        fields={"timestamp": "@timestamp", "level": "lvl", "message": "msg", "source": "svc"},
+        timestamp_format="iso",
+    ))
+    batch = parse_batch(lines, received_at=received, profile=profile)
+    assert batch.timestamps[0] == datetime(2026, 1, 2, 1, 0, tzinfo=UTC)
+    assert batch.levels[:4] == ["ERROR", "INFO", "INFO", "ERROR"]
+    assert batch.sources[0] == "payments"
+    assert batch.messages[1] == "charge 1 failed"
+    assert batch.logs[0].extra == {"trace": "t0"}
+    # The stray line falls back to the generic parser and inherits the timestamp.
+    assert batch.logs[4].format == "plain" and batch.levels[4] == "ERROR"
+    assert batch.timestamps[4] == batch.timestamps[3]
+
+
+def test_timestamp_formats_detect_and_compile():
+    assert detect_timestamp_format("1767315660") == "epoch_s"
+    assert detect_timestamp_format("1767315660000") == "epoch_ms"
+    assert detect_timestamp_format("Jan  2 01:01:00") == "syslog"
+    assert detect_timestamp_format("02/Jan/2026:10:01:00 +0900") == "%d/%b/%Y:%H:%M:%S %z"
+    assert detect_timestamp_format("soon") is None
+
+    expected = datetime(2026, 1, 2, 1, 1, tzinfo=UTC)
+    assert compile_timestamp_parser("epoch_ms")("1767315660000", None) == expected
+    assert compile_timestamp_parser("%d/%b/%Y:%H:%M:%S %z")("02/Jan/2026:10:01:00 +0900", None) == expected
+    assert compile_timestamp_parser("iso")("garbage", None) is None
+
+
+class _FakeSession:
+    def __init__(self):
+        self.rows = {}
+
+    def get(self, model, key):
+        return self.rows.get(key)
+
+    def add(self, row):
+        self.rows[(row.tenant_id, row.project_id)] = row
+
+    def commit(self):
+        pass
+
+
+def test_registry_learns_then_serves_profile():
+    db = _FakeSession()
+    registry = ProfileRegistry(learn_batches=2)
+    for k in range(2):
+        assert registry.get(db, "t1", "p1") is None
+        registry.observe(db, "t1", "p1", parse_batch(_odd_json_batch(20, start=k)))
+
+    profile = registry.get(db, "t1", "p1")
+    assert profile is not None and profile.spec.fields["timestamp"] == "@timestamp"
+    row = db.rows[("t1", "p1")]
+    assert row.origin == "learned" and row.timestamp_format == "iso"
+
+    # A declared profile replaces it; forgetting restarts learning.
+    registry.put("t1", "p1", ProfileSpec(format="kv", fields={"level": "LVL"}, origin="declared"))
+    assert registry.get(db, "t1", "p1").spec.format == "kv"
+    registry.put("t1", "p1", None)
+    db.rows.clear()
+    assert registry.get(db, "t1", "p1") is None
+    assert registry.learning_status("t1", "p1") == {"batches_seen": 0, "batches_needed": 2}
@@ -0,0 +1,63 @@
+"""Partition naming / bounds and the drop-before-cutoff selection."""
+from datetime import datetime, UTC
+
+from src.db import partitions
+
+
+class _FakeConn:
+    """Answers the pg_inherits listing; records every other statement."""
+
+    def __init__(self, names):
+        self.names = names
+        self.sql: list[str] = []
+
+    def execute(self, stmt, params=None):
+        sql = str(stmt)
+        conn = self
+
+        class _Result:
+            def all(self):
+                return [(n, 1000.0) for n in conn.names]
+
+        if "pg_inherits" not in sql:
+            self.sql.append(sql)
+        return _Result()
+
+
+def test_period_start_and_names_round_trip():
+    ts = datetime(2026, 3, 5, 17, 45, tzinfo=UTC)   # a Thursday
+    assert partitions.period_start(ts, "daily") == datetime(2026, 3, 5, tzinfo=UTC)
+    week = partitions.period_start(ts, "weekly")
+    assert week == datetime(2026, 3, 2, tzinfo=UTC)
+    name = partitions.partition_name("logs", week, "weekly")
+    assert name == "logs_w20260302"
+    assert partitions.parse_partition_name("logs", name) == (week, datetime(2026, 3, 9, tzinfo=UTC))
+    assert partitions.parse_partition_name("logs", "logs_default") is None
+    assert partitions.parse_partition_name("logs", "analysis_results_d20260302") is None
+
+
+def test_drop_only_partitions_entirely_before_cutoff():
+    conn = _FakeConn(["logs_d20260301", "logs_d20260302", "logs_d20260303", "logs_default", "logs_archive"])
+    cutoff = datetime(2026, 3, 3, 6, tzinfo=UTC)
+
+    preview = partitions.drop_partitions_before(conn, "logs", cutoff, dry_run=True)
+    assert [n for n, _ in preview] == ["logs_d20260301", "logs_d20260302"]
+    assert conn.sql == []
+
+    partitions.drop_partitions_before(conn, "logs", cutoff)
+    assert conn.sql == [
+        'ALTER TABLE "logs" DETACH PARTITION "logs_d20260301"',
+        'DROP TABLE "logs_d20260301"',
+        'ALTER TABLE "logs" DETACH PARTITION "logs_d20260302"',
+        'DROP TABLE "logs_d20260302"',
+    ]
+
+
+def test_ensure_partitions_creates_missing_periods():
+    conn = _FakeConn(["logs_d20260302"])
+    created = partitions.ensure_partitions(
+        conn, "logs", "daily",
+        since=datetime(2026, 3, 1, 12, tzinfo=UTC), until=datetime(2026, 3, 4, tzinfo=UTC),
+    )
+    assert created == ["logs_d20260301", "logs_d20260303"]
+    assert "FOR VALUES FROM ('2026-03-01T00:00:00+00:00') TO ('2026-03-02T00:00:00+00:00')" in conn.sql[0]
@@ -0,0 +1,114 @@
+"""Chunked retention: slices, per-tenant overrides, bounded dry-run, checkpoint resume."""
+import json
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.db import retention
+from src.db.retention import RetentionJob, RetentionPolicy
+from src.model.log import Log
+from src.model.rollup import HourlyRollup
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=UTC)
+LOGS = [("logs", Log, Log.received_at)]
+
+
+@pytest.fixture
+def factory():
+    engine = create_engine("sqlite://")
+    Log.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def _seed(factory, tenant_id: str, ages_days: list[float]) -> None:
+    with factory() as db:
+        for i, age in enumerate(ages_days):
+            db.add(Log(
+                id=f"{tenant_id}-{i}", tenant_id=tenant_id, project_id="p1",
+                source="app", source_type="agent", message="m",
+                received_at=NOW - timedelta(days=age),
+            ))
+        db.commit()
+
+
+def _remaining(factory) -> dict[str, int]:
+    with factory() as db:
+        counts: dict[str, int] = {}
+        for (tenant_id,) in db.query(Log.tenant_id):
+            counts[tenant_id] = counts.get(tenant_id, 0) + 1
+        return counts
+
+
+def _job(factory, policy, **kwargs) -> RetentionJob:
+    return RetentionJob(factory, policy, targets=LOGS, now=NOW, **kwargs)
+
+
+def test_deletes_in_slices_with_tenant_overrides(factory):
+    _seed(factory, "a", [1, 8, 9, 10, 11, 12])   # default 7 days: 5 expired
+    _seed(factory, "b", [1, 8, 20, 40])          # 30 days: 1 expired
+    _seed(factory, "c", [1, 2, 3])               # 2 days: 1 expired
+
+    results = _job(factory, RetentionPolicy(days=7, tenant_days={"b": 30, "c": 2}), chunk_size=2).run()
+
+    assert results["logs"].rows == 5
+    assert results["logs[b]"].rows == 1
+    assert results["logs[c]"].rows == 1
+    assert _remaining(factory) == {"a": 1, "b": 3, "c": 2}
+
+
+def test_dry_run_is_capped_and_changes_nothing(factory, monkeypatch):
+    monkeypatch.setattr(retention, "_DRY_RUN_CAP", 3)
+    _seed(factory, "a", [8, 9, 10, 11, 1])
+
+    results = _job(factory, RetentionPolicy(days=7), dry_run=True).run()
+
+    assert results["logs"].rows == 3 and results["logs"].estimated
+    assert _remaining(factory) == {"a": 5}
+
+
+def test_resumes_from_checkpoint_with_original_cutoff(factory, tmp_path):
+    path = tmp_path / "retention.json"
+    started = NOW - timedelta(hours=2)
+    path.write_text(json.dumps({"started_at": started.isoformat(), "done": {"logs[b]": 4}, "partial": {"logs": 2}}))
+    # 7 days before the original start, not before NOW: a 6.95-day-old row survives.
+    _seed(factory, "a", [6.95, 8, 9])
+    _seed(factory, "b", [40])
+
+    results = _job(factory, RetentionPolicy(days=7, tenant_days={"b": 30}), checkpoint=str(path)).run()
+
+    assert results["logs"].rows == 2 + 2          # carried over + this run
+    assert results["logs[b]"].rows == 4           # skipped, finished before
+    assert _remaining(factory) == {"a": 1, "b": 1}
+    assert not path.exists()
+
+
+def test_stale_checkpoint_is_ignored(factory, tmp_path):
+    path = tmp_path / "retention.json"
+    path.write_text(json.dumps({"started_at": (NOW - timedelta(days=3)).isoformat(), "done": {"logs": 0}}))
+    _seed(factory, "a", [8])
+
+    results = _job(factory, RetentionPolicy(days=7), checkpoint=str(path)).run()
+
+    assert results["logs"].rows == 1
+    assert _remaining(factory) == {}
+
+
+def test_rollup_buckets_follow_tenant_cutoffs():
+    engine = create_engine("sqlite://")
+    HourlyRollup.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        for tenant_id, age in [("a", timedelta(days=9)), ("a", timedelta(days=7, hours=1)),
+                               ("a", timedelta(days=7)), ("a", timedelta(days=1)), ("b", timedelta(days=9))]:
+            db.add(HourlyRollup(tenant_id=tenant_id, project_id="p1", bucket=NOW - age, logs_info=1))
+        db.commit()
+
+    targets = [("hourly_rollups", HourlyRollup, HourlyRollup.bucket)]
+    RetentionJob(factory, RetentionPolicy(days=7, tenant_days={"b": 30}), targets=targets, now=NOW).run()
+
+    with factory() as db:
+        left = sorted((r.tenant_id, NOW - r.bucket.replace(tzinfo=UTC)) for r in db.query(HourlyRollup))
+    # the hour ending at the 7-day cutoff goes; the one starting there still covers surviving rows
+    assert left == [("a", timedelta(days=1)), ("a", timedelta(days=7)), ("b", timedelta(days=9))]
@@ -0,0 +1,64 @@
+"""Hourly dashboard rollups: write-path counters, window / daily reads, rebuild."""
+from datetime import date, datetime, timedelta, UTC
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.analysis import rollups
+from src.model.rollup import HourlyRollup
+from src.schemas.enums import LogLevel, SeverityLevel
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    HourlyRollup.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+NOW = datetime(2026, 3, 4, 12, 30, tzinfo=UTC)
+
+
+def test_hour_bucket_floors_to_utc_hour():
+    assert rollups.hour_bucket(NOW) == datetime(2026, 3, 4, 12, tzinfo=UTC)
+    assert rollups.hour_bucket(datetime(2026, 3, 4, 12, 59)) == datetime(2026, 3, 4, 12, tzinfo=UTC)
+
+
+def test_window_totals_combine_finished_and_live_buckets(db):
+    levels = [LogLevel.INFO, LogLevel.ERROR, "ERROR", LogLevel.WARN]
+    rollups.record_logs(db, "t1", "p1", levels, at=NOW - timedelta(hours=5))
+    rollups.record_logs(db, "t1", "p2", [LogLevel.INFO], at=NOW)               # live bucket
+    rollups.record_logs(db, "t1", "p1", [LogLevel.ERROR], at=NOW - timedelta(hours=30))
+    rollups.record_logs(db, "t2", "p1", [LogLevel.ERROR], at=NOW)
+    rollups.record_logs(db, "t1", "p1", [LogLevel.ERROR], at=NOW - timedelta(hours=5), sign=-1)
+    db.commit()
+
+    totals = rollups.window_totals(db, "t1", hours=24, now=NOW)
+    assert sum(totals[c] for c in rollups.LEVEL_COLUMNS.values()) == 4
+    assert totals["logs_error"] == 1
+    assert rollups.window_totals(db, "t1", project_id="p2", now=NOW)["logs_info"] == 1
+    assert rollups.window_totals(db, "nobody", now=NOW)["logs_error"] == 0
+
+
+def test_daily_confidence_from_hourly_buckets(db):
+    day = datetime(2026, 3, 4, tzinfo=UTC)
+    for hours, severity, confidence in [(1, SeverityLevel.HIGH, 0.9), (23, "LOW", 0.3), (25, "CRITICAL", 1.0)]:
+        rollups.record_analysis(db, "t1", "p1", severity, confidence, at=day + timedelta(hours=hours))
+    rollups.record_analysis(db, "t1", "other", "LOW", 0.1, at=day)
+    db.commit()
+
+    points = rollups.daily_confidence(db, "t1", "p1")
+    assert points == [
+        {"date": date(2026, 3, 4), "avg_confidence": 0.6, "report_count": 2},
+        {"date": date(2026, 3, 5), "avg_confidence": 1.0, "report_count": 1},
+    ]
+    assert rollups.daily_confidence(db, "t1", "p1", start_date=date(2026, 3, 5)) == points[1:]
+    assert rollups.daily_confidence(db, "t1", "p1", end_date=date(2026, 3, 4)) == points[:1]
+
+    row = db.get(HourlyRollup, ("t1", "p1", datetime(2026, 3, 4, 1)))
+    assert (row.analyses_high, row.analyses_low, row.confidence_count) == (1, 0, 1)
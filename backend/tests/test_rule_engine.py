@@ -249,3 +249,186 @@ def test_severity_low_on_clean_logs():
         strategy=AnalysisStrategy.RULE,
     )
     assert result["severity"] == SeverityLevel.LOW
+
+
+# --------------------------------------------------
+# Compiled mode: identical RuleMatch lists
+# --------------------------------------------------
+
+def _compiled_and_reference(logs):
+    from src.analysis.rule_engine import RuleEngine
+
+    compiled = RuleEngine(default_rules(), compiled=True).run(logs)
+    reference = RuleEngine(default_rules(), compiled=False).run(logs)
+    return compiled, reference
+
+
+def test_compiled_matches_reference_on_validation_corpus():
+    from src.analysis.validation.test_cases import TEST_CASES
+
+    for case in TEST_CASES:
+        compiled, reference = _compiled_and_reference(case["logs"])
+        assert compiled == reference, case["id"]
+
+
+def test_compiled_matches_reference_on_time_windowed_rules():
+    base = datetime(2026, 1, 1, tzinfo=UTC)
+    logs = [
+        _make_log(f"ERROR: failure #{i} 404", source=f"svc-{i % 4}",
+                  ts=base + timedelta(seconds=i * 5))
+        for i in range(12)
+    ]
+    logs += [
+        _make_log("Request TIMEOUT after 30s", LogLevel.WARN, ts=base + timedelta(seconds=70)),
+        _make_log("connection refused to db:5432", LogLevel.WARN, ts=base + timedelta(seconds=75)),
+        _make_log("FATAL: panic - segfault", ts=base + timedelta(seconds=90)),
+        _make_log("container killed and restarted", LogLevel.INFO, ts=base + timedelta(seconds=95)),
+        _make_log("INFO: recovered", LogLevel.INFO, ts=base - timedelta(minutes=30)),
+    ]
+
+    compiled, reference = _compiled_and_reference(logs)
+    assert compiled == reference
+    assert {"R017", "R019", "R020", "R021", "R022", "R023", "R024"} <= {
+        m.rule_id for m in compiled
+    }
+
+
+def test_weighted_logs_score_like_the_lines_they_stand_for():
+    from dataclasses import replace
+
+    base = datetime(2026, 1, 1, tzinfo=UTC)
+    weighted = [
+        _make_log("ERROR upstream 503 timeout", source="gw", ts=base),
+        replace(_make_log("ERROR upstream 503 timeout", source="gw", ts=base + timedelta(seconds=20)), count=40),
+        replace(_make_log("connection refused to db:5432", LogLevel.WARN, ts=base + timedelta(seconds=30)), count=3),
+        _make_log("container killed and restarted", LogLevel.INFO, ts=base + timedelta(seconds=40)),
+    ]
+    expanded = [replace(log, count=1) for log in weighted for _ in range(log.count)]
+
+    compiled, reference = _compiled_and_reference(weighted)
+    assert compiled == reference == _compiled_and_reference(expanded)[0]
+    assert {"R019", "R021", "R024"} <= {m.rule_id for m in compiled}
+
+
+# --------------------------------------------------
+# KeywordMatcher: one scan == every extractor's own search
+# --------------------------------------------------
+
+def test_signal_matcher_agrees_with_individual_regexes():
+    from src.analysis.rule_engine import SIGNAL_MATCHER, SIGNAL_PATTERNS
+    from src.analysis.validation.test_cases import TEST_CASES
+
+    messages = [log.message for case in TEST_CASES for log in case["logs"]]
+    messages += [
+        "Request timed out of memory budget",   # timeout / oom overlap
+        "CPU throttle engaged, throttl",         # rate_limit vs cpu boundary
+        "MySQL deadlock on query",               # SQL needs a word boundary
+        "x504y 5044 503 upstream 401 TOKEN",     # status-code boundaries
+        "TLS handshake: Connection Refused by peer / reset by peer",
+        "\u212aILLED by supervisor, \u017fegfault",  # IGNORECASE Unicode folding
+        "",
+    ]
+
+    for msg in messages:
+        expected = {name for name, p in SIGNAL_PATTERNS.items() if p.search(msg)}
+        assert SIGNAL_MATCHER.tags(msg) == expected, msg
+
+
+def test_keyword_matcher_reports_classes_sharing_a_start_offset():
+    import re
+    from src.analysis.keyword_matcher import KeywordMatcher
+
+    matcher = KeywordMatcher({
+        "short": re.compile(r"\b(foo)\b", re.IGNORECASE),
+        "long": re.compile(r"\b(foo bar)\b", re.IGNORECASE),
+    })
+    assert matcher.tags("FOO bar") == {"short", "long"}
+    assert matcher.tags("foobar") == frozenset()
+
+
+# ---------------------------------------------------------------------------
+# Linear-time temporal detectors vs. the original nested-loop versions
+# ---------------------------------------------------------------------------
+
+def _brute_burst(timestamps, window):
+    if len(timestamps) < 2:
+        return len(timestamps)
+    best = 1
+    for i, ts in enumerate(timestamps):
+        count = 1
+        for j in range(i + 1, len(timestamps)):
+            if (timestamps[j] - ts).total_seconds() > window:
+                break
+            count += 1
+        best = max(best, count)
+    return best
+
+
+def _brute_sequence(timestamps, is_first, is_then, max_gap):
+    for i, ts in enumerate(timestamps):
+        if not is_first[i]:
+            continue
+        for j in range(i + 1, len(timestamps)):
+            if (timestamps[j] - ts).total_seconds() > max_gap:
+                break
+            if is_then[j]:
+                return True
+    return False
+
+
+def _brute_spike(timestamps, window):
+    if len(timestamps) < 3:
+        return 1.0
+    span = (timestamps[-1] - timestamps[0]).total_seconds()
+    if span <= 0:
+        return 1.0
+    recent = sum(1 for ts in timestamps if (timestamps[-1] - ts).total_seconds() <= window)
+    return (recent / window) / (len(timestamps) / span)
+
+
+def test_temporal_detectors_match_brute_force():
+    import random
+    from src.analysis import temporal
+
+    rng = random.Random(7)
+    base = datetime(2026, 1, 1, tzinfo=UTC)
+    for _ in range(300):
+        n = rng.randint(0, 40)
+        # Coarse offsets so exact-boundary deltas and duplicate timestamps occur.
+        timestamps = sorted(
+            base + timedelta(seconds=rng.choice([0, 15, 30, 60]) * rng.randint(0, 12))
+            for _ in range(n)
+        )
+        is_first = [rng.random() < 0.2 for _ in range(n)]
+        is_then = [rng.random() < 0.2 for _ in range(n)]
+        for window in (0.0, 30.0, 60.0, 300.0):
+            assert temporal.burst_count(timestamps, window) == _brute_burst(timestamps, window)
+            assert temporal.has_sequence(timestamps, is_first, is_then, window) == \
+                _brute_sequence(timestamps, is_first, is_then, window)
+        for window in (30.0, 60.0):
+            assert temporal.spike_ratio(timestamps, window) == _brute_spike(timestamps, window)
+
+
+def test_error_storm_burst_is_linear():
+    from src.analysis.rule_engine import RuleEngine
+
+    base = datetime(2026, 1, 1, tzinfo=UTC)
+    storm = [
+        _make_log("upstream returned 503", ts=base + timedelta(milliseconds=5 * i))
+        for i in range(10_000)
+    ]
+    matched = {m.rule_id for m in RuleEngine(default_rules()).run(storm)}
+    assert "R019" in matched
+
+
+def test_run_raw_uses_parsed_timestamps_and_sources():
+    from src.analysis.rule_engine import RuleEngine
+
+    lines = [
+        '{"level":"ERROR","service":"api","message":"upstream timeout","ts":"2026-01-02T01:00:00Z"}',
+        '{"level":"ERROR","service":"worker","message":"panic: worker crashed","ts":"2026-01-02T01:02:00Z"}',
+        '{"level":"ERROR","service":"db","message":"replica lagging","ts":"2026-01-02T01:03:00Z"}',
+    ]
+    matched = {m.rule_id for m in RuleEngine(default_rules()).run_raw(lines)}
+    assert "R020" in matched   # timeout → crash within 5 minutes
+    assert "R022" in matched   # ERROR from three distinct sources
@@ -11,10 +11,10 @@ import {
 } from "lucide-react";
 
 import type {
+  AnalysisResult,
   InvestigationStatus,
   InvestigationNote,
 } from "@/types/analysis";
-import type { ReportSummary } from "@/lib/api/report";
 import {
   updateInvestigation,
   addInvestigationNote,
@@ -36,13 +36,15 @@ const STATUSES: { key: InvestigationStatus; label: string; cls: string }[] = [
  * - 실제 원인(resolution)
  * - 메모 타임라인
  * - 📌 같은 룰 조합으로 과거 '해결됨' 된 사례의 실제 원인 추천
+ *
+ * `report` 는 단건 조회(fetchReport) 결과여야 한다 — 목록 응답에는 notes 가 없다.
  */
 export function InvestigationPanel({
   projectId,
   report,
 }: {
   projectId: string;
-  report: ReportSummary;
+  report: AnalysisResult;
 }) {
   const analysisId = report.id;
 
@@ -1,10 +1,11 @@
 "use client";
 
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { AnimatePresence, motion } from "framer-motion";
-import { Stethoscope, Wrench, ChevronDown, Cpu } from "lucide-react";
+import { Stethoscope, Wrench, ChevronDown, Cpu, RefreshCw } from "lucide-react";
 
-import type { ReportSummary } from "@/lib/api/report";
+import { fetchReport, type ReportSummary } from "@/lib/api/report";
+import type { AnalysisResult } from "@/types/analysis";
 import { severityConfig, asSeverity } from "@/styles/severity";
 import { InvestigationPanel } from "@/app/components/investigation/InvestigationPanel";
 
@@ -44,19 +45,39 @@ function AnalysisRow({
   projectId?: string;
 }) {
   const [open, setOpen] = useState(false);
+  // 목록은 본문·메모 없는 투영 — 펼칠 때 단건 조회로 보충
+  const [detail, setDetail] = useState<AnalysisResult | null>(null);
+  const [detailFailed, setDetailFailed] = useState(false);
   const sev = asSeverity(r.severity);
   const cfg = severityConfig[sev];
-  const sections = r.report_sections ?? [];
+  const sections = detail?.report_sections ?? [];
   const invBadge =
     r.investigation_status && r.investigation_status !== "open"
       ? INV_BADGE[r.investigation_status]
       : null;
+  const canLoadDetail = !!projectId && !!r.id;
   const hasDetail =
-    !!projectId ||
-    sections.length > 0 ||
+    canLoadDetail ||
     (r.suspected_causes?.length ?? 0) > 0 ||
     (r.recommended_actions?.length ?? 0) > 0;
 
+  useEffect(() => {
+    if (!open) {
+      // 다시 펼치면 최신 조사 상태·메모로 새로 조회
+      setDetail(null);
+      setDetailFailed(false);
+      return;
+    }
+    if (!canLoadDetail || detail || detailFailed) return;
+    let alive = true;
+    fetchReport(projectId!, r.id!)
+      .then((d) => alive && setDetail(d))
+      .catch(() => alive && setDetailFailed(true));
+    return () => {
+      alive = false;
+    };
+  }, [open, canLoadDetail, detail, detailFailed, projectId, r.id]);
+
   return (
     <motion.div
       initial={{ opacity: 0, x: -12 }}
@@ -107,6 +128,11 @@ function AnalysisRow({
             transition={{ duration: 0.25 }}
             className="border-t border-zinc-800/70"
           >
+            {canLoadDetail && !detail && !detailFailed && (
+              <p className="flex items-center gap-1.5 border-b border-zinc-800/70 px-4 py-3 text-xs text-zinc-500">
+                <RefreshCw size={12} className="animate-spin" /> 보고서 불러오는 중…
+              </p>
+            )}
             {sections.length > 0 && (
               <div className="space-y-2 border-b border-zinc-800/70 px-4 py-4">
                 {sections.map((s, i) => (
@@ -170,9 +196,9 @@ function AnalysisRow({
             </div>
 
             {/* 조사 & 해결 (프로젝트 컨텍스트에서만 편집 가능) */}
-            {projectId && r.id && (
+            {projectId && detail && (
               <div className="px-4 pb-4">
-                <InvestigationPanel projectId={projectId} report={r} />
+                <InvestigationPanel projectId={projectId} report={detail} />
               </div>
             )}
           </motion.div>
@@ -217,7 +217,7 @@ export default function ProjectPatternsTab() {
       const res = await fetchPatterns({
         limit: 100,
         status: tab === "all" ? undefined : tab,
-      }).catch(() => ({ total: 0, items: [] }));
+      }).catch(() => ({ total: 0, items: [], next_cursor: null }));
       setPatterns(res.items);
     } finally {
       setLoading(false);
@@ -28,14 +28,16 @@ export type LearnedPattern = {
 };
 
 export type PatternList = {
-  total: number;
+  total: number | null; // first page only (null when paging with a cursor)
   items: LearnedPattern[];
+  next_cursor: string | null;
 };
 
 export const fetchPatterns = async (params?: {
   status?: PatternStatus;
   limit?: number;
   offset?: number;
+  cursor?: string;
 }): Promise<PatternList> => {
   const res = await apiClient.get("/patterns", { params });
   return res.data;
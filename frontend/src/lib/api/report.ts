@@ -1,15 +1,15 @@
 import { apiClient } from "@/lib/api/client";
 import type {
+  AnalysisResult,
   Severity,
   Strategy,
-  ReportSection,
   InvestigationStatus,
-  InvestigationNote,
 } from "@/types/analysis";
 
 /* ======================
  * Report List
  * ====================== */
+/** 목록용 투영 — 보고서 본문(report_sections)·조사 메모(notes)는 fetchReport 로. */
 export type ReportSummary = {
   id?: string;
   summary: string;
@@ -18,10 +18,8 @@ export type ReportSummary = {
   suspected_causes: string[];
   recommended_actions: string[];
   matched_rules: string[];
-  report_sections?: ReportSection[];
   investigation_status?: InvestigationStatus;
   resolution?: string | null;
-  notes?: InvestigationNote[];
   strategy_used: Strategy;
   received_at: string;
 };
@@ -38,6 +36,17 @@ export const fetchReports = async (
   return res.data;
 };
 
+/* ======================
+ * Report Detail (본문 + 조사 메모)
+ * ====================== */
+export const fetchReport = async (
+  projectId: string,
+  analysisId: string
+): Promise<AnalysisResult> => {
+  const res = await apiClient.get(`/projects/${projectId}/reports/${analysisId}`);
+  return res.data;
+};
+
 /* ======================
  * Weekly Report
  * ====================== */
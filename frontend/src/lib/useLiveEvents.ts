@@ -12,6 +12,8 @@ export type LiveEvent = {
   summary?: string | null;
   confidence?: number;
   log_count?: number;
+  first_ts?: string | null;
+  last_ts?: string | null;
   at?: string;
 };
 